@@ -0,0 +1,258 @@
+###################################################################################
+#
+# TRIQS interface for the analytic continuation program OmegaMaxEnt
+#
+# Copyright (C) Simons Foundation
+#
+# TRIQS is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TRIQS is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TRIQS. If not, see <http://www.gnu.org/licenses/>.
+#
+###################################################################################
+
+# Benchmark cases built from the sum of gaussians spectra used in test/python.
+# Each case defines a statistic (fermion, boson or chi), an input type (freq or time), a structure (scalar, matrix
+# or block), the number of Matsubara frequencies or times, the output grid step and the noise level.
+
+from math import ceil, pi, cos, sin
+from itertools import product
+import numpy as np
+from scipy.integrate import trapezoid
+from triqs.gf import *
+
+beta = 50.0
+
+wmin = -10.0
+wmax = 10.0
+dw_integ = 0.002
+
+wl = -7
+wr = 7
+
+theta = pi / 6
+
+# spectra of the two diagonal elements in the eigenbasis, (centers, standard deviations, weights)
+spectra = {
+    'fermion': [([-2, 1], [1, 0.7], [1, 1]), ([-1.5, 0, 2], [0.8, 0.5, 1.2], [1, 1, 1])],
+    'boson': [([-2, 1], [1, 0.7], [1, 1]), ([-1.5, 0, 2], [0.8, 0.5, 1.2], [1, 1, 1])],
+    'chi': [([-2, 2], [1, 1], [1, 1]), ([-1.5, 0, 1.5], [0.8, 0.5, 0.8], [1, 1, 1])],
+}
+
+statistics = ['fermion', 'boson', 'chi']
+input_types = ['freq', 'time']
+structures = ['scalar', 'matrix', 'block']
+R_iw_W_values = [5, 10]
+dw_values = [0.01, 0.002]
+noise_values = [1e-5, 1e-3]
+
+W = 4
+
+eps = 1e-4
+
+
+def sum_gaussians(w, params):
+    cw, sd, wgt = params
+    v = np.zeros(np.shape(w))
+    for c, s, g in zip(cw, sd, wgt):
+        v = v + (g / s) * np.exp(-(w - c) * (w - c) / (2 * s * s))
+    return v / (np.sum(wgt) * np.sqrt(2 * pi))
+
+
+def spectral_function(w, params, statistic):
+    """
+    Spectral function A(w) of the representation (1) of the interface documentation. For bosons, A(w)/w is the sum of
+    gaussians.
+    """
+    if statistic == 'fermion':
+        return sum_gaussians(w, params)
+    return w * sum_gaussians(w, params)
+
+
+def reference_spectrum(w, params, statistic):
+    """
+    Spectrum compared with the result: A(w) for fermions and A(w)/w for bosons.
+    """
+    return sum_gaussians(w, params)
+
+
+def time_kernel(w, tau, statistic):
+    """
+    Kernel K(w,tau) such that G(tau)=-int dw K(w,tau) A(w)/w for bosons and G(tau)=-int dw K(w,tau) A(w) for fermions.
+    """
+    W_, T_ = np.meshgrid(w, tau)
+    K = np.zeros(W_.shape)
+    pos = W_ >= 0
+    neg = ~pos
+    if statistic == 'fermion':
+        K[pos] = np.exp(-W_[pos] * T_[pos]) / (1 + np.exp(-beta * W_[pos]))
+        K[neg] = np.exp(W_[neg] * (beta - T_[neg])) / (np.exp(beta * W_[neg]) + 1)
+    else:
+        small = np.abs(W_) < eps
+        pos = pos & ~small
+        neg = neg & ~small
+        K[pos] = -W_[pos] * np.exp(-W_[pos] * T_[pos]) / np.expm1(-beta * W_[pos])
+        K[neg] = W_[neg] * np.exp(W_[neg] * (beta - T_[neg])) / np.expm1(beta * W_[neg])
+        K[small] = 1 / beta
+    return K
+
+
+def scalar_data(G, params, statistic):
+    """
+    Exact data of the scalar function G defined by the spectrum params.
+    """
+    w = np.arange(wmin, wmax + dw_integ / 2, dw_integ)
+    if isinstance(G.mesh, MeshImTime):
+        tau = np.array([t.value for t in G.mesh])
+        if statistic == 'fermion':
+            A = spectral_function(w, params, statistic)
+        else:
+            A = sum_gaussians(w, params)
+        return -trapezoid(time_kernel(w, tau, statistic) * A, w, axis=1)
+    iwn = np.array([iw.value for iw in G.mesh])
+    A = spectral_function(w, params, statistic)
+    zero = np.abs(iwn) < eps
+    iwn[zero] = 1j
+    data = trapezoid(A[None, :] / (iwn[:, None] - w[None, :]), w, axis=1)
+    # for bosons, A(w)/(0-w)=-A(w)/w at the zero frequency
+    data[zero] = -trapezoid(sum_gaussians(w, params), w)
+    return data
+
+
+class BenchmarkCase:
+    """
+    Input Green function, continuation parameters and exact spectra of a benchmark case.
+    """
+
+    def __init__(self, statistic, input_type, structure, R_iw_W, dw, noise):
+        self.statistic = statistic
+        self.input_type = input_type
+        self.structure = structure
+        self.R_iw_W = R_iw_W
+        self.dw = dw
+        self.noise = noise
+        self.name = f"{statistic}_{input_type}_{structure}_R{R_iw_W}_dw{dw:g}_err{noise:g}"
+
+    def params(self):
+        return dict(statistic=self.statistic, input_type=self.input_type, structure=self.structure,
+                    R_iw_W=self.R_iw_W, dw=self.dw, noise=self.noise)
+
+    def make_scalar_gf(self):
+        triqs_stat = 'Fermion' if self.statistic == 'fermion' else 'Boson'
+        n_iwn = int(ceil(beta * W * self.R_iw_W / (2 * pi))) + 1
+        if self.input_type == 'freq':
+            return GfImFreq(target_shape=(), beta=beta, n_points=n_iwn, statistic=triqs_stat)
+        return GfImTime(target_shape=(), beta=beta, n_points=2 * n_iwn, statistic=triqs_stat)
+
+    def add_noise(self, data):
+        if self.input_type == 'freq':
+            return data + self.noise * (np.random.randn(*data.shape) + 1j * np.random.randn(*data.shape))
+        return data + self.noise * np.random.randn(*data.shape)
+
+    def make_input(self):
+        """
+        Return the input Green function and a dictionary of exact spectra on the output grid, with keys (block, l, m).
+        """
+        np.random.seed(0)
+        spectr = spectra[self.statistic]
+        w = self.output_grid()
+        G1 = self.make_scalar_gf()
+        d1 = scalar_data(G1, spectr[0], self.statistic)
+        if self.structure == 'scalar':
+            G1.data[:] = self.add_noise(d1)
+            return G1, {(None, 0, 0): reference_spectrum(w, spectr[0], self.statistic)}
+
+        d2 = scalar_data(G1, spectr[1], self.statistic)
+        R = np.array([[cos(theta), -sin(theta)], [sin(theta), cos(theta)]])
+        Gm = Gf(mesh=G1.mesh, target_shape=[2, 2])
+        Gm.data[:] = np.einsum('ik,nk,jk->nij', R, np.stack((d1, d2), axis=1), R)
+        Gm.data[:] = self.add_noise(Gm.data)
+        A = np.einsum('ik,wk,jk->ijw', R, np.stack((reference_spectrum(w, spectr[0], self.statistic),
+                                                    reference_spectrum(w, spectr[1], self.statistic)), axis=1), R)
+        ref = {}
+        for l, m in product(range(2), range(2)):
+            ref[(None if self.structure == 'matrix' else 'bl1', l, m)] = A[l, m]
+        if self.structure == 'matrix':
+            return Gm, ref
+
+        Gs = Gf(mesh=G1.mesh, target_shape=[1, 1])
+        Gs.data[:, 0, 0] = self.add_noise(d2)
+        ref[('bl2', 0, 0)] = reference_spectrum(w, spectr[1], self.statistic)
+        return BlockGf(name_list=['bl1', 'bl2'], block_list=[Gm, Gs], make_copies=False), ref
+
+    def output_grid(self):
+        Nw = int(round((wr - wl) / self.dw)) + 1
+        return self.dw * np.arange(Nw) + wl
+
+    def continuation_params(self):
+        kwa = dict(interactive_mode=False, save_figures_data=False, save_G=False,
+                   output_grid_params=[wl, self.dw, wr], name="$G_{ME}$")
+        if self.structure != 'scalar':
+            kwa.update(dict(inv_sym=True))
+        if self.statistic == 'chi':
+            kwa.update(dict(inv_sym_time=True))
+        return kwa
+
+    def spectrum(self, GR, key):
+        """
+        Resulting spectrum of the element key=(block, l, m), comparable with the exact spectrum.
+        """
+        bl, l, m = key
+        w = self.output_grid()
+        if bl is None:
+            G = GR
+        else:
+            G = GR[bl]
+        if len(G.target_shape):
+            data = G.data[:, l, m]
+        else:
+            data = G.data
+        A_me = -data.imag / pi
+        if self.statistic != 'fermion':
+            small = np.abs(w) < eps
+            A_me[~small] = A_me[~small] / w[~small]
+            A_me[small] = np.interp(w[small], w[~small], A_me[~small])
+        return A_me
+
+    def spectra(self, GR, ref):
+        """
+        Resulting spectra of all the elements in ref, with shape (number of elements, number of frequencies).
+        """
+        return np.array([self.spectrum(GR, key) for key in ref])
+
+    def int_diffA(self, GR, ref):
+        """
+        Largest integrated absolute difference between the resulting and exact spectra over all elements.
+        """
+        diff = 0
+        for key, A in ref.items():
+            diff = max(diff, self.dw * np.sum(np.absolute(self.spectrum(GR, key) - A)))
+        return diff
+
+
+def make_cases(full=False):
+    """
+    Return the list of benchmark cases. The default set varies one parameter at a time around a reference case, and
+    the full set is the cartesian product of all the parameter values.
+    """
+    if full:
+        return [BenchmarkCase(*p) for p in product(statistics, input_types, structures, R_iw_W_values, dw_values,
+                                                   noise_values)]
+    ref = ('fermion', 'freq', 'scalar', R_iw_W_values[0], dw_values[0], noise_values[0])
+    cases = [BenchmarkCase(*ref)]
+    for ind, values in enumerate([statistics, input_types, structures, R_iw_W_values, dw_values, noise_values]):
+        for v in values[1:]:
+            p = list(ref)
+            p[ind] = v
+            cases.append(BenchmarkCase(*p))
+    for stat in statistics[1:]:
+        cases.append(BenchmarkCase(stat, 'time', 'scalar', *ref[3:]))
+    return cases
@@ -0,0 +1,171 @@
+###################################################################################
+#
+# TRIQS interface for the analytic continuation program OmegaMaxEnt
+#
+# Copyright (C) Simons Foundation
+#
+# TRIQS is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TRIQS is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TRIQS. If not, see <http://www.gnu.org/licenses/>.
+#
+###################################################################################
+
+# Compare benchmark results produced by run_benchmarks.py with a baseline and flag the regressions.
+# The exit status is 1 if a regression is found.
+#
+# usage: python compare_benchmarks.py baseline.json results.json [--tol-time 0.2] [--tol-mem 0.2] [--tol-acc 0.01] [--tol-alloc 0.2]
+#                                     [--spectra baseline_dir results_dir] [--tol-equiv 1e-3]
+
+import argparse
+import json
+import os
+import sys
+
+# engine counters checked for regressions with the tolerance tol_alloc
+alloc_counters = ['armadillo_allocations', 'operator_new_calls']
+
+
+def load_results(file_name):
+    with open(file_name) as f:
+        return {r['case']: r for r in json.load(f)['results']}
+
+
+def load_import_times(file_name):
+    with open(file_name) as f:
+        return json.load(f).get('import_time', {})
+
+
+def compare_imports(baseline, results, tol_time):
+    """
+    Return the rows ('import', module, baseline value, new value, ratio, regression) comparing the import times
+    measured by run_benchmarks.py. Only the interface modules are checked for regressions: a longer import time, or
+    a module that is imported lazily in the baseline and is now imported with the interface.
+    """
+    rows = []
+    for module, r in results.items():
+        b = baseline.get(module)
+        if r is None or b is None:
+            continue
+        interface = module.startswith("OmegaMaxEnt")
+        ratio = r['time'] / b['time'] if b['time'] else None
+        rows.append(('import', module, b['time'], r['time'], ratio, interface and ratio is not None and ratio > 1 + tol_time))
+        new_lazy = [m for m in r['lazy_modules_loaded'] if m not in b['lazy_modules_loaded']]
+        if interface and new_lazy:
+            rows.append(('import', module + ' loads', b['lazy_modules_loaded'], r['lazy_modules_loaded'], None, True))
+    return rows
+
+
+def compare(baseline, results, tol_time, tol_mem, tol_acc, tol_alloc=0.2):
+    """
+    Return the list of rows (case, quantity, baseline value, new value, ratio, regression) for the cases present in
+    both baseline and results.
+    """
+    rows = []
+    for name, r in results.items():
+        if name not in baseline:
+            continue
+        b = baseline[name]
+        if not r.get('success'):
+            rows.append((name, 'success', b.get('success'), False, None, bool(b.get('success'))))
+            continue
+        if not b.get('success'):
+            continue
+        for key in ['wall_time', 'engine_cpu_time']:
+            ratio = r[key] / b[key] if b[key] else None
+            rows.append((name, key, b[key], r[key], ratio, ratio is not None and ratio > 1 + tol_time))
+        for stage, t in r['stages'].items():
+            if stage in b['stages']:
+                ratio = t / b['stages'][stage] if b['stages'][stage] else None
+                rows.append((name, 'stage:' + stage, b['stages'][stage], t, ratio, False))
+        for group, prefix in [('python_phases', 'python:'), ('engine_stages', 'engine:')]:
+            for stage, t in r.get(group, {}).items():
+                if stage in b.get(group, {}):
+                    ratio = t / b[group][stage] if b[group][stage] else None
+                    rows.append((name, prefix + stage, b[group][stage], t, ratio, False))
+        if 'python_overhead' in r and 'python_overhead' in b:
+            rows.append((name, 'python_overhead', b['python_overhead'], r['python_overhead'], None, False))
+        for key, n in r.get('engine_counters', {}).items():
+            if key in b.get('engine_counters', {}):
+                ratio = n / b['engine_counters'][key] if b['engine_counters'][key] else None
+                regression = key in alloc_counters and ratio is not None and ratio > 1 + tol_alloc
+                rows.append((name, 'count:' + key, b['engine_counters'][key], n, ratio, regression))
+        for key in ['peak_rss_python_kb', 'peak_rss_engine_kb']:
+            ratio = r[key] / b[key] if b[key] else None
+            rows.append((name, key, b[key], r[key], ratio, ratio is not None and ratio > 1 + tol_mem))
+        rows.append((name, 'int_diffA', b['int_diffA'], r['int_diffA'], None, r['int_diffA'] > b['int_diffA'] + tol_acc))
+    return rows
+
+
+def compare_spectra(baseline, results, baseline_dir, results_dir, tol_equiv):
+    """
+    Return the rows (case, 'spectra', None, difference, None, regression) comparing the spectra saved with
+    run_benchmarks.py --save-spectra for two builds. The difference is the largest integrated absolute difference
+    between the spectra of the two builds over all elements.
+    """
+    import numpy as np
+    rows = []
+    for name, r in results.items():
+        f_b = os.path.join(baseline_dir, name + ".npy")
+        f_r = os.path.join(results_dir, name + ".npy")
+        if name not in baseline or not os.path.exists(f_b) or not os.path.exists(f_r):
+            continue
+        A_b = np.load(f_b)
+        A_r = np.load(f_r)
+        if A_b.shape != A_r.shape:
+            rows.append((name, 'spectra', A_b.shape, A_r.shape, None, True))
+            continue
+        diff = r['params']['dw'] * np.abs(A_r - A_b).sum(axis=1).max()
+        rows.append((name, 'spectra', None, diff, None, diff > tol_equiv))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results with a baseline.")
+    parser.add_argument('baseline', help="baseline JSON file")
+    parser.add_argument('results', help="new JSON file")
+    parser.add_argument('--tol-time', type=float, default=0.2, help="relative increase of time considered a regression")
+    parser.add_argument('--tol-mem', type=float, default=0.2, help="relative increase of peak memory considered a regression")
+    parser.add_argument('--tol-acc', type=float, default=0.01, help="absolute increase of int_diffA considered a regression")
+    parser.add_argument('--tol-alloc', type=float, default=0.2, help="relative increase of the engine heap allocations considered a regression")
+    parser.add_argument('--all', action='store_true', help="print all the quantities, not only the regressions")
+    parser.add_argument('--spectra', nargs=2, metavar=('BASELINE_DIR', 'RESULTS_DIR'),
+                        help="directories of the spectra saved with run_benchmarks.py --save-spectra, to check that two builds give equivalent results")
+    parser.add_argument('--tol-equiv', type=float, default=1e-3, help="largest integrated absolute difference between the spectra of two builds")
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    results = load_results(args.results)
+
+    rows = compare(baseline, results, args.tol_time, args.tol_mem, args.tol_acc, args.tol_alloc)
+    rows = rows + compare_imports(load_import_times(args.baseline), load_import_times(args.results), args.tol_time)
+    if args.spectra:
+        rows = rows + compare_spectra(baseline, results, args.spectra[0], args.spectra[1], args.tol_equiv)
+
+    for name in results:
+        if name not in baseline:
+            print(f"{name}: not in baseline")
+
+    n_regr = 0
+    for name, key, b, r, ratio, regr in rows:
+        if regr:
+            n_regr = n_regr + 1
+        if regr or args.all:
+            ratio_str = f"{ratio:7.3f}" if ratio is not None else "       "
+            flag = "REGRESSION" if regr else ""
+            print(f"{name:50s} {key:25s} {str(b):>14.14s} {str(r):>14.14s} {ratio_str} {flag}")
+
+    print(f"{n_regr} regression(s) found")
+    return 1 if n_regr else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+###################################################################################
+#
+# TRIQS interface for the analytic continuation program OmegaMaxEnt
+#
+# Copyright (C) Simons Foundation
+#
+# TRIQS is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TRIQS is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TRIQS. If not, see <http://www.gnu.org/licenses/>.
+#
+###################################################################################
+
+# Run the benchmark cases defined in benchmark_cases.py and save the results in a JSON file.
+# Each case is run in a separate process so that the peak memory of each case is measured independently.
+#
+# The import time of the interface modules is also measured, each import in a new interpreter.
+#
+# usage: python run_benchmarks.py [-o results.json] [--full] [--cases pattern ...] [--repeat n] [--save-spectra dir]
+#                                 [--import-only]
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil as su
+import subprocess as sp
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+
+# modules whose import time is measured, the interface modules first, then the heavy dependencies for reference
+import_modules = ["OmegaMaxEnt_TRIQS", "OmegaMaxEnt_figures", "numpy", "triqs.gf", "h5"]
+# modules that the interface only imports when they are used
+lazy_modules = ["triqs", "h5", "matplotlib", "concurrent.futures"]
+
+
+def run_case(name, full, spectra_dir=None):
+    """
+    Run the case name in the current process and return its record. If spectra_dir is given, the resulting spectra are
+    saved in spectra_dir/name.npy, with one row per element.
+    """
+    import numpy as np
+    import OmegaMaxEnt_TRIQS as OT
+    from benchmark_cases import make_cases
+
+    case = [c for c in make_cases(full) if c.name == name][0]
+
+    record = dict(case=name, params=case.params(), stages={})
+
+    t0 = time.perf_counter()
+    G, ref = case.make_input()
+    record['stages']['input'] = time.perf_counter() - t0
+
+    work_dir = tempfile.mkdtemp(prefix="OME_bench_")
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    t0 = time.perf_counter()
+    cpu0 = resource.getrusage(resource.RUSAGE_CHILDREN)
+    engine_stats = []
+    profiler = OT.PhaseProfiler()
+    GR = OT.compute_GfReFreq(G, engine_stats=engine_stats, on_event=profiler, **case.continuation_params())
+    cpu1 = resource.getrusage(resource.RUSAGE_CHILDREN)
+    record['stages']['continuation'] = time.perf_counter() - t0
+    os.chdir(cwd)
+    su.rmtree(work_dir)
+
+    record['wall_time'] = sum(record['stages'].values())
+    record['engine_cpu_time'] = (cpu1.ru_utime - cpu0.ru_utime) + (cpu1.ru_stime - cpu0.ru_stime)
+    # ru_maxrss is in kB on Linux and in bytes on macOS
+    rss_scale = 1024 if sys.platform == 'darwin' else 1
+    record['peak_rss_python_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / rss_scale
+    record['peak_rss_engine_kb'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / rss_scale
+    record['python_phases'] = {phase: st['total'] for phase, st in profiler.stats.items()}
+    record['python_overhead'] = profiler.overhead_share()
+    record['engine_stages'] = {}
+    record['engine_counters'] = dict(svd=0, quadrature_evaluations=0, armadillo_allocations=0, operator_new_calls=0,
+                                     newton_iterations=0)
+    for st in engine_stats:
+        for stage, v in st['stages'].items():
+            record['engine_stages'][stage] = record['engine_stages'].get(stage, 0) + v['wall_time']
+        for key, n in st['counters'].items():
+            record['engine_counters'][key] = record['engine_counters'].get(key, 0) + n
+        record['engine_counters']['newton_iterations'] += sum(st['newton_iterations'])
+    record['success'] = GR is not None
+    record['int_diffA'] = case.int_diffA(GR, ref) if GR is not None else None
+    if spectra_dir and GR is not None:
+        np.save(os.path.join(spectra_dir, name + ".npy"), case.spectra(GR, ref))
+    return record
+
+
+def measure_import(module):
+    """
+    Import module in the current process and return its record: the import time in seconds and the lazy modules that
+    were imported with it.
+    """
+    t0 = time.perf_counter()
+    __import__(module)
+    t = time.perf_counter() - t0
+    return dict(time=t, lazy_modules_loaded=[m for m in lazy_modules if m in sys.modules and not module.startswith(m)])
+
+
+def import_times(repeat):
+    """
+    Return the import time of each module of import_modules, the fastest of repeat imports, each one in a new
+    interpreter, and the startup time of the interpreter itself.
+    """
+    times = {}
+    for module in ["", *import_modules]:
+        best = None
+        for r in range(repeat):
+            cmd = [sys.executable, os.path.join(bench_dir, "run_benchmarks.py"), "--run-import", module]
+            t0 = time.perf_counter()
+            proc = sp.run(cmd, stdout=sp.PIPE, stderr=sp.DEVNULL, cwd=bench_dir)
+            t_proc = time.perf_counter() - t0
+            if proc.returncode:
+                break
+            if not module:
+                record = dict(time=t_proc, lazy_modules_loaded=[])
+            else:
+                record = json.loads(proc.stdout.decode().strip().splitlines()[-1])
+            if best is None or record['time'] < best['time']:
+                best = record
+        times[module or "interpreter"] = best
+    return times
+
+
+def git_commit():
+    try:
+        return sp.check_output(["git", "rev-parse", "HEAD"], cwd=bench_dir, stderr=sp.DEVNULL).decode().strip()
+    except (OSError, sp.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the OmegaMaxEnt benchmark cases.")
+    parser.add_argument('-o', '--output', default="benchmark_results.json", help="output JSON file")
+    parser.add_argument('--full', action='store_true', help="run all the combinations of parameters")
+    parser.add_argument('--cases', nargs='*', default=[], help="run only the cases whose name contains one of these strings")
+    parser.add_argument('--repeat', type=int, default=1, help="number of runs of each case, the fastest is kept")
+    parser.add_argument('--list', action='store_true', help="list the cases and exit")
+    parser.add_argument('--save-spectra', help="directory where the resulting spectra are saved, to compare builds with compare_benchmarks.py --spectra")
+    parser.add_argument('--import-only', action='store_true', help="only measure the import times")
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    parser.add_argument('--run-import', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.save_spectra:
+        args.save_spectra = os.path.abspath(args.save_spectra)
+
+    if args.run_import is not None:
+        if args.run_import:
+            sys.stdout.write("\n" + json.dumps(measure_import(args.run_import)) + "\n")
+        return 0
+
+    if args.run_case:
+        record = run_case(args.run_case, args.full, args.save_spectra)
+        sys.stdout.write("\n" + json.dumps(record) + "\n")
+        return 0
+
+    names = []
+    if not args.import_only:
+        from benchmark_cases import make_cases
+
+        names = [c.name for c in make_cases(args.full)]
+        if args.cases:
+            names = [n for n in names if any(p in n for p in args.cases)]
+
+        if args.list:
+            print("\n".join(names))
+            return 0
+
+    # at least 5 imports of each module, since an import takes much less time than a case
+    imports = import_times(max(args.repeat, 5))
+    for module, record in imports.items():
+        if record is None:
+            print(f"import {module}: failed")
+        else:
+            lazy = ", ".join(record['lazy_modules_loaded'])
+            print(f"import {module}: {1000*record['time']:.1f} ms" + (f", also imports {lazy}" if lazy else ""))
+
+    if args.save_spectra and not os.path.exists(args.save_spectra):
+        os.makedirs(args.save_spectra)
+
+    results = []
+    for name in names:
+        best = None
+        for r in range(args.repeat):
+            cmd = [sys.executable, os.path.join(bench_dir, "run_benchmarks.py"), "--run-case", name]
+            if args.full:
+                cmd.append("--full")
+            if args.save_spectra:
+                cmd = cmd + ["--save-spectra", args.save_spectra]
+            proc = sp.run(cmd, stdout=sp.PIPE, cwd=bench_dir)
+            if proc.returncode:
+                record = dict(case=name, success=False)
+            else:
+                # the engine and the interface also print to stdout, the record is the last line
+                record = json.loads(proc.stdout.decode().strip().splitlines()[-1])
+            if best is None or (record['success'] and (not best['success'] or record['wall_time'] < best['wall_time'])):
+                best = record
+        results.append(best)
+        if best['success']:
+            print(f"{name}: {best['wall_time']:.2f} s, int_diffA={best['int_diffA']:.4f}")
+        else:
+            print(f"{name}: failed")
+
+    metadata = dict(date=datetime.now().isoformat(), host=platform.node(), platform=platform.platform(),
+                    python=platform.python_version(), commit=git_commit(), repeat=args.repeat)
+    with open(args.output, 'w') as f:
+        json.dump(dict(metadata=metadata, import_time=imports, results=results), f, indent=1)
+    print(f"results saved in {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -34,6 +34,8 @@ extern "C"
     void dgesdd_( char *JOBZ, int *M, int *N, double *A, int *LDA, double *S, double *U, int *LDU, double *VT, int *LDVT, double *WORK, int *LWORK, int *IWORK, int *INFO );
 	//computes the eigenvalues and, optionally, the left and/or right eigenvectors for SY matrices ( http://www.netlib.org/lapack/explore-html/dd/d4c/dsyev_8f_source.html )
 	void dsyev_( char *JOBZ, char *UPLO, int *N, double *A, int *LDA, double *W, double *WORK, int *LWORK, int *INFO );
+	//computes selected eigenvalues and, optionally, eigenvectors of a real symmetric matrix using the Relatively Robust Representations
+	void dsyevr_( char *JOBZ, char *RANGE, char *UPLO, int *N, double *A, int *LDA, double *VL, double *VU, int *IL, int *IU, double *ABSTOL, int *M, double *W, double *Z, int *LDZ, int *ISUPPZ, double *WORK, int *LWORK, int *IWORK, int *LIWORK, int *INFO );
 	//solves a general Gauss-Markov linear model (GLM) problem. ( http://www.netlib.org/lapack/explore-html/d3/df4/dggglm_8f_source.html )
 	void dggglm_(int *N, int *M, int *P, double *A, int *LDA, double *B, int *LDB, double *D, double *X, double *Y, double *WORK, int *LWORK, int *INFO );
 	//computes the solution to system of linear equations A * X = B, where A is a band matrix ( http://www.netlib.org/lapack/explore-html/dd/dc2/dgbsv_8f_source.html )
@@ -52,6 +54,10 @@ OmegaMaxEnt_data::OmegaMaxEnt_data(int arg_N, char *args[])
     input_params_file_name=default_input_params_file_name;
 	
 	interactive_mode=true;
+	save_run_stats=false;
+	nb_svd=0;
+	quiet_mode=false;
+	print_events=false;
 	
     if (arg_N>1)
     {
@@ -68,11 +74,29 @@ OmegaMaxEnt_data::OmegaMaxEnt_data(int arg_N, char *args[])
 				{
 					graph_2D::print_to_file=false;
 				}
+				else if (!strcmp(args[j],"-fb"))
+				{
+					graph_2D::print_to_bundle=true;
+					graph_2D::print_to_file=false;
+					graph_3D::print_to_file=false;
+				}
 				else if (!strcmp(args[j],"-ni"))
 				{
 					interactive_mode=false;
 					graph_2D::display_figures=false;
 				}
+				else if (!strcmp(args[j],"-s"))
+				{
+					save_run_stats=true;
+				}
+				else if (!strcmp(args[j],"-q"))
+				{
+					quiet_mode=true;
+				}
+				else if (!strcmp(args[j],"-e"))
+				{
+					print_events=true;
+				}
                 else
                     cout<<"invalid option: "<<args[j]<<'\n';
             }
@@ -90,11 +114,17 @@ OmegaMaxEnt_data::OmegaMaxEnt_data(int arg_N, char *args[])
 	preproc_complete=false;
 	initialize_maxent=true;
 	print_other_params=false;
+	alpha_files=false;
 	time_params_file=NULL;
 	time_other_params_file=NULL;
 	ind_alpha_vec=0;
 	rnd_gen.seed(time(NULL));
 	NAprec=5;
+	
+	cout_buf=cout.rdbuf();
+	events_out=new ostream(cout_buf);
+	// without a buffer, cout is in a failed state and operator<< returns without formatting anything
+	if (quiet_mode) cout.rdbuf(NULL);
 }
 
 OmegaMaxEnt_data::~OmegaMaxEnt_data()
@@ -105,6 +135,14 @@ OmegaMaxEnt_data::~OmegaMaxEnt_data()
 	graph_2D::figs_ind_file.close();
 	graph_3D::figs_ind_file<<'\n';
 	graph_3D::figs_ind_file.close();
+	graph_2D::close_bundle();
+	
+	if (quiet_mode)
+	{
+		cout.rdbuf(cout_buf);
+		cout.clear();
+	}
+	delete events_out;
 }
 
 int OmegaMaxEnt_data::loop_run()
@@ -127,6 +165,8 @@ int OmegaMaxEnt_data::loop_run()
 	ofstream warnings_file("warnings.txt");
 	set_stream_err2(warnings_file);
 	
+	print_event("start","\"input_params_file\": "+graph_2D::json_string(input_params_file_name.c_str()));
+	
 	if (interactive_mode)
 	{
 		cout<<OmegaMaxEnt_notice<<endl;
@@ -168,6 +208,7 @@ int OmegaMaxEnt_data::loop_run()
 		
 		graph_2D::reset_figs_ind_file();
 		graph_3D::reset_figs_ind_file();
+		graph_2D::reset_bundle();
 
 		stat(input_params_file_name.c_str(),&file_stat);
 		if (time_params_file)
@@ -208,7 +249,7 @@ int OmegaMaxEnt_data::loop_run()
 		
 		if (Ginf_finite && !eval_moments_in.size() && !G_omega_inf_in.size()) eval_moments=true;
 
-		if (!graph_2D::display_figures && !graph_2D::print_to_file)
+		if (!graph_2D::display_figures && !graph_2D::print_to_file && !graph_2D::print_to_bundle)
 		{
 			show_optimal_alpha_figs=false;
 			show_lowest_alpha_figs=false;
@@ -223,6 +264,7 @@ int OmegaMaxEnt_data::loop_run()
 			{
 				preproc_complete=preproc();
 				read_params=true;
+				if (!preproc_complete) print_event("error","\"message\": \"preprocessing failed\"");
 			}
 			
 			if (execute_maxent && preproc_complete)
@@ -298,6 +340,21 @@ int OmegaMaxEnt_data::loop_run()
 					}
 					A_opt_name+=".dat";
 					
+					A_cl_Br_name="classic_Bryan_spectral_functions";
+					P_alpha_G_name="P_alpha_G";
+					if (output_name_suffix.size())
+					{
+						if (output_name_suffix[0]!='_')
+						{
+							A_cl_Br_name+='_';
+							P_alpha_G_name+='_';
+						}
+						A_cl_Br_name+=output_name_suffix;
+						P_alpha_G_name+=output_name_suffix;
+					}
+					A_cl_Br_name+=".dat";
+					P_alpha_G_name+=".dat";
+					
 					G_re_omega_name="real_frequency_Green_function";
 					if (output_name_suffix.size())
 					{
@@ -305,6 +362,8 @@ int OmegaMaxEnt_data::loop_run()
 						G_re_omega_name+=output_name_suffix;
 					}
 					G_re_omega_name+=".dat";
+					G_re_omega_bin_name=G_re_omega_name.substr(0,G_re_omega_name.size()-4);
+					G_re_omega_bin_name+=".bin";
 					
 					G_re_t_name="real_time_Green_function";
 					if (output_name_suffix.size())
@@ -599,6 +658,7 @@ int OmegaMaxEnt_data::loop_run()
 					if (compute_P_alpha_G) log_P_alpha_G.zeros(Nalpha_max);
 					Aw_samp.zeros(Nalpha_max,Nwsamp);
 					ind_alpha_vec=0;
+					alpha_path.clear();
 					
 					lchi2_lalpha_lgth=0;
 					ind_curv=0;
@@ -652,17 +712,23 @@ int OmegaMaxEnt_data::loop_run()
 					
 					P_alpha_G.max(ind_P_alpha_G_max);
 					
-					char file_name[200];
-					mat data;
-					sprintf(file_name, output_name_format.c_str(),tem,alpha_vec(ind_P_alpha_G_max));
-					if (data.load(file_name))
-					{
-						Acl=data.col(1);
-					}
-					else
+					if (!alpha_path_spectrum(ind_P_alpha_G_max,Acl))
 						cout<<"spectral function was not saved at alpha= "<<alpha_vec(ind_P_alpha_G_max)<<endl;
 					
 					compute_Bryan_spectrum(Abr);
+					
+					string file_name_str=output_dir_fin;
+					file_name_str+=P_alpha_G_name;
+					mat save_P=join_rows(alpha_vec.rows(0,ind_alpha_vec-1),P_alpha_G.rows(0,ind_alpha_vec-1));
+					save_P.save(file_name_str, raw_ascii);
+					
+					if (Acl.n_rows)
+					{
+						file_name_str=output_dir_fin;
+						file_name_str+=A_cl_Br_name;
+						mat save_A=join_rows(w,join_rows(Acl,Abr));
+						save_A.save(file_name_str, raw_ascii);
+					}
 				}
 				
 				char alpha_output[100], alpha_output_format[]="alpha: % 1.4e,  Q: % 1.4e,  S: % 1.4e,  chi2: % 1.4e\n";
@@ -942,11 +1008,11 @@ int OmegaMaxEnt_data::loop_run()
 							CRe.zeros(NnC);
 							for (j=0; j<NnC; j++)
 							{
-								for (l=0; l<2*Nn-j; l++)
+								for (l=0; l<int(errRe.n_rows)-j; l++)
 								{
 									CRe(j)=CRe(j)+errRe(l)*errRe(l+j);
 								}
-								CRe(j)=CRe(j)/(2*Nn-j);
+								CRe(j)=CRe(j)/(errRe.n_rows-j);
 							}
 						}
 							
@@ -956,9 +1022,9 @@ int OmegaMaxEnt_data::loop_run()
 						CRe.zeros(NnC);
 						for (j=0; j<NnC; j++)
 						{
-							for (l=0; l<Nn-j; l++)
+							for (l=0; l<int(errRe.n_rows)-j; l++)
 								CRe(j)=CRe(j)+errRe(l)*errRe(l+j);
-							CRe(j)=CRe(j)/(Nn-j);
+							CRe(j)=CRe(j)/(errRe.n_rows-j);
 						}
 					}
 					
@@ -1197,26 +1263,19 @@ int OmegaMaxEnt_data::loop_run()
 						A_opt_l.reset();
 						A_opt_r.reset();
 						
-						sprintf(file_name, output_name_format.c_str(),tem,alpha_vec(ind_alpha_opt));
-						if (data.load(file_name))
-							A_opt=data.col(1);
-						else
+						if (!alpha_path_spectrum(ind_alpha_opt,A_opt))
 							cout<<"spectral function was not saved at alpha= "<<alpha_vec(ind_alpha_opt)<<endl;
 						
-						sprintf(file_name, output_name_format.c_str(),tem,alpha_vec(ind_alpha_opt_r));
-						if (data.load(file_name))
-							A_opt_r=data.col(1);
-						else
+						if (!alpha_path_spectrum(ind_alpha_opt_r,A_opt_r))
 							cout<<"spectral function was not saved at alpha= "<<alpha_vec(ind_alpha_opt_r)<<endl;
 						
-						sprintf(file_name, output_name_format.c_str(),tem,alpha_vec(ind_alpha_opt_l));
-						if (data.load(file_name))
-							A_opt_l=data.col(1);
-						else
+						if (!alpha_path_spectrum(ind_alpha_opt_l,A_opt_l))
 							cout<<"spectral function was not saved at alpha= "<<alpha_vec(ind_alpha_opt_l)<<endl;
 						
 						if (A_opt.n_rows && A_opt_l.n_rows && A_opt_r.n_rows)
 						{
+							data.zeros(Nw,2);
+							data.col(0)=w;
 							string file_name_str=output_dir_fin;
 							file_name_str+=A_opt_name;
 							remove(file_name_str.c_str());
@@ -1340,11 +1399,11 @@ int OmegaMaxEnt_data::loop_run()
 									CRe.zeros(NnC);
 									for (j=0; j<NnC; j++)
 									{
-										for (l=0; l<2*Nn-j; l++)
+										for (l=0; l<int(errRe.n_rows)-j; l++)
 										{
 											CRe(j)=CRe(j)+errRe(l)*errRe(l+j);
 										}
-										CRe(j)=CRe(j)/(2*Nn-j);
+										CRe(j)=CRe(j)/(errRe.n_rows-j);
 									}
 								}
 							}
@@ -1353,9 +1412,9 @@ int OmegaMaxEnt_data::loop_run()
 								CRe.zeros(NnC);
 								for (j=0; j<NnC; j++)
 								{
-									for (l=0; l<Nn-j; l++)
+									for (l=0; l<int(errRe.n_rows)-j; l++)
 										CRe(j)=CRe(j)+errRe(l)*errRe(l+j);
-									CRe(j)=CRe(j)/(Nn-j);
+									CRe(j)=CRe(j)/(errRe.n_rows-j);
 								}
 							}
 							
@@ -1394,14 +1453,14 @@ int OmegaMaxEnt_data::loop_run()
 								}
 								else
 								{
-									M_save.zeros(2*Nn,2);
+									M_save.zeros(errRe.n_rows,2);
 									M_save.col(0)=eigv_ind;
 									M_save.col(1)=errRe;
 								}
 							}
 							else
 							{
-								M_save.zeros(Nn,2);
+								M_save.zeros(errRe.n_rows,2);
 								M_save.col(0)=eigv_ind;
 								M_save.col(1)=errRe;
 							}
@@ -1690,6 +1749,7 @@ int OmegaMaxEnt_data::loop_run()
 					else
 					{
 						cout<<"optimal spectrum has not been found. The real frequency grid might not be adapted to the spectrum\n";
+						print_event("error","\"message\": \"optimal spectrum not found\"");
 					}
 					
 					if (alpha<=alpha_min && dlchi2_lalpha_min_av/dlchi2_lalpha_max>RMAX_dlchi2_lalpha && !alpha_min_in.size())
@@ -1714,6 +1774,8 @@ int OmegaMaxEnt_data::loop_run()
 			
 			if (interactive_mode)
 			{
+				//the outputs at the values of alpha kept are available while the user decides
+				save_alpha_path();
 				cin.clear();
 				if (!execute_maxent) cout<<"Note that \"preprocess only\", in section PREPROCESSING EXECUTION OPTIONS, is set to 'yes'. Disable that option if you want to continue with the actual calculation.\n";
 				
@@ -1730,7 +1792,7 @@ int OmegaMaxEnt_data::loop_run()
 					getline(cin,buf);
 				}
 				
-				if (!(continue_exec=='y' || continue_exec=='\n')) remove_files();
+				if (!(continue_exec=='y' || continue_exec=='\n')) save_alpha_path();
 				
 				if (execute_maxent && N_params_noise && !error_provided && !(continue_exec=='y' || continue_exec=='\n') && ind_noise<(N_params_noise-1))
 				{
@@ -1749,17 +1811,18 @@ int OmegaMaxEnt_data::loop_run()
 			{
 				ind_noise++;
 				initialize=true;
-				remove_files();
+				save_alpha_path();
 			}
 			else
 			{
-				remove_files();
+				save_alpha_path();
 			}
 		}
 		else
 		{
+			print_event("error","\"message\": \"parameters could not be loaded\"");
 			continue_exec='n';
-			remove_files();
+			save_alpha_path();
 		}
 	
 	} while (((continue_exec=='y' || continue_exec=='\n') && interactive_mode) || (!interactive_mode && N_params_noise && !error_provided && ind_noise<N_params_noise));
@@ -1809,54 +1872,174 @@ int OmegaMaxEnt_data::loop_run()
 	}
 	 */
 	
+	if (save_run_stats) save_run_statistics();
+	
+	{
+		ostringstream fields;
+		//success is the exit status of the run, 0 if the optimal spectrum was found
+		fields<<"\"success\": "<<(success==0 ? "true" : "false")<<", \"n_alpha\": "<<ind_alpha_vec;
+		print_event("finish",fields.str());
+	}
+	
 	return success;
 }
 
-void OmegaMaxEnt_data::remove_files()
+void OmegaMaxEnt_data::print_event(const char *event, const string &fields)
+{
+	if (!print_events) return;
+	*events_out<<"{\"event\": \""<<event<<'"';
+	if (fields.size()) *events_out<<", "<<fields;
+	*events_out<<'}'<<endl;
+}
+
+bool OmegaMaxEnt_data::svd_count(mat &U, vec &s, mat &V, const mat &X, const char *method)
+{
+	nb_svd++;
+	return svd(U,s,V,X,method);
+}
+
+void OmegaMaxEnt_data::save_run_statistics()
+{
+	ofstream file(run_stats_file_name.c_str(), ios::out);
+	if (!file)
+	{
+		cout<<"save_run_statistics(): cannot open file "<<run_stats_file_name<<endl;
+		return;
+	}
+	file<<setprecision(10);
+	file<<"{\n \"stages\": {";
+	map<string,stage_stats>::iterator it;
+	for (it=run_stages.begin(); it!=run_stages.end(); it++)
+	{
+		if (it!=run_stages.begin()) file<<',';
+		file<<"\n  \""<<it->first<<"\": {\"wall_time\": "<<it->second.wall_time<<", \"cpu_time\": "<<it->second.cpu_time<<", \"calls\": "<<it->second.calls<<'}';
+	}
+	file<<"\n },\n \"counters\": {\"svd\": "<<nb_svd<<", \"quadrature_evaluations\": "<<nb_quad_eval<<", \"armadillo_allocations\": "<<nb_arma_alloc<<", \"operator_new_calls\": "<<nb_new_calls<<"},\n";
+	file<<" \"alpha\": [";
+	for (int j=0; j<newton_alpha.size(); j++)
+	{
+		if (j) file<<", ";
+		file<<newton_alpha[j];
+	}
+	file<<"],\n \"newton_iterations\": [";
+	for (int j=0; j<newton_iterations.size(); j++)
+	{
+		if (j) file<<", ";
+		file<<newton_iterations[j];
+	}
+	file<<"]\n}\n";
+	file.close();
+}
+
+void OmegaMaxEnt_data::save_alpha_path()
 {
 	int j;
 	char file_name[200];
-	if (ind_alpha_vec>0 && save_spec_func)
+	bool keep;
+	
+	if (!alpha_files)
 	{
-		j=0;
-		while (alpha_vec(j)>alpha_save_max && j<ind_alpha_vec-1)
+		vector<double> alpha_kept;
+		vector<const mat*> A_kept, G_kept, err_kept, moments_kept;
+		for (j=0; j<alpha_path.size() && j<ind_alpha_vec; j++)
 		{
-			alpha=alpha_vec(j);
-			sprintf(file_name,output_name_format.c_str(),tem,alpha);
-			remove(file_name);
-			sprintf(file_name,output_G_format.c_str(),tem,alpha);
-			remove(file_name);
-			sprintf(file_name,output_error_format.c_str(),tem,alpha);
-			remove(file_name);
-			if (NM>0)
+			alpha_path_entry &entry=alpha_path[j];
+			keep=(entry.alpha<=alpha_save_max && entry.alpha>=alpha_save_min) || j==ind_alpha_vec-1;
+			if (keep && entry.A.n_rows)
 			{
-				sprintf(file_name,output_moments_format.c_str(),tem,alpha);
-				remove(file_name);
+				alpha_kept.push_back(entry.alpha);
+				A_kept.push_back(&entry.A);
+				G_kept.push_back(&entry.G);
+				err_kept.push_back(&entry.err);
+				moments_kept.push_back(&entry.moments);
 			}
-			j++;
 		}
-		while (alpha_vec(j)>=alpha_save_min && j<ind_alpha_vec-1) j++;
-		while (j<ind_alpha_vec-1)
+		save_alpha_path_file(output_name_format, alpha_kept, A_kept);
+		save_alpha_path_file(output_G_format, alpha_kept, G_kept);
+		save_alpha_path_file(output_error_format, alpha_kept, err_kept);
+		save_alpha_path_file(output_moments_format, alpha_kept, moments_kept);
+		return;
+	}
+	
+	for (j=0; j<alpha_path.size() && j<ind_alpha_vec; j++)
+	{
+		alpha_path_entry &entry=alpha_path[j];
+		keep=(entry.alpha<=alpha_save_max && entry.alpha>=alpha_save_min) || j==ind_alpha_vec-1;
+		if (keep && !entry.saved && entry.A.n_rows)
 		{
-			alpha=alpha_vec(j);
-			sprintf(file_name,output_name_format.c_str(),tem,alpha);
+			sprintf(file_name,output_name_format.c_str(),tem,entry.alpha);
+			entry.A.save(file_name,raw_ascii);
+			sprintf(file_name,output_G_format.c_str(),tem,entry.alpha);
+			entry.G.save(file_name,raw_ascii);
+			sprintf(file_name,output_error_format.c_str(),tem,entry.alpha);
+			entry.err.save(file_name,raw_ascii);
+			if (entry.moments.n_rows)
+			{
+				sprintf(file_name,output_moments_format.c_str(),tem,entry.alpha);
+				entry.moments.save(file_name,raw_ascii);
+			}
+			entry.saved=true;
+		}
+		else if (!keep && entry.saved)
+		{
+			sprintf(file_name,output_name_format.c_str(),tem,entry.alpha);
 			remove(file_name);
-			sprintf(file_name,output_G_format.c_str(),tem,alpha);
+			sprintf(file_name,output_G_format.c_str(),tem,entry.alpha);
 			remove(file_name);
-			sprintf(file_name,output_error_format.c_str(),tem,alpha);
+			sprintf(file_name,output_error_format.c_str(),tem,entry.alpha);
 			remove(file_name);
-			if (NM>0)
+			if (entry.moments.n_rows)
 			{
-				sprintf(file_name,output_moments_format.c_str(),tem,alpha);
+				sprintf(file_name,output_moments_format.c_str(),tem,entry.alpha);
 				remove(file_name);
 			}
-			j++;
+			entry.saved=false;
 		}
 	}
 }
 
+void OmegaMaxEnt_data::save_alpha_path_file(const string &format, const vector<double> &alpha_kept, const vector<const mat*> &M_kept)
+{
+	char file_name[200];
+	string path_format=format.substr(0,format.rfind("alpha%"))+"alpha_path.dat";
+	sprintf(file_name,path_format.c_str(),tem);
+	
+	int j;
+	uword N_rows=0, N_cols=0, r=0;
+	for (j=0; j<M_kept.size(); j++)
+	{
+		N_rows+=M_kept[j]->n_rows;
+		if (M_kept[j]->n_cols>N_cols) N_cols=M_kept[j]->n_cols;
+	}
+	if (!N_rows)
+	{
+		remove(file_name);
+		return;
+	}
+	
+	mat M_save=zeros<mat>(N_rows,N_cols+1);
+	for (j=0; j<M_kept.size(); j++)
+	{
+		const mat &M_j=*M_kept[j];
+		if (!M_j.n_rows) continue;
+		M_save.submat(r,0,r+M_j.n_rows-1,0).fill(alpha_kept[j]);
+		M_save.submat(r,1,r+M_j.n_rows-1,M_j.n_cols)=M_j;
+		r+=M_j.n_rows;
+	}
+	M_save.save(file_name,raw_ascii);
+}
+
+bool OmegaMaxEnt_data::alpha_path_spectrum(int j, vec &A_j)
+{
+	if (j<0 || j>=alpha_path.size() || !alpha_path[j].A.n_rows) return false;
+	A_j=alpha_path[j].A.col(1);
+	return true;
+}
+
 bool OmegaMaxEnt_data::preproc()
 {
+	stage_timer timer(run_stages["preproc"]);
+	
 	initialize_maxent=true;
 	initialize=false;
 	bool init_spectrum_exists=false, file_grid_set=false, param_grid_set=false;
@@ -2252,9 +2435,9 @@ bool OmegaMaxEnt_data::preproc()
 		mat KGj=KG_V*P;
 		mat U, V;
 		vec sK, sK2;
-		if (!svd(U,sK,V,KGj))
+		if (!svd_count(U,sK,V,KGj))
 		{
-			if (!svd(U,sK,V,KGj,"std"))
+			if (!svd_count(U,sK,V,KGj,"std"))
 			{
 				cout<<"preproc(): svd error\n";
 				return false;
@@ -2294,7 +2477,7 @@ bool OmegaMaxEnt_data::preproc()
 		NwA=Nw-2;
 		
 		if (cov_diag) NnC=Nn/2;
-		else NnC=Nn;
+		else NnC=std::min(int(Nn),int(G_V.n_rows));
 	
 //		integrate_P_A_alpha();
 		
@@ -2666,9 +2849,9 @@ bool OmegaMaxEnt_data::preproc()
 		mat KGj=KG_V*P;
 		mat U, V;
 		vec sK, sK2;
-		if (!svd(U,sK,V,KGj))
+		if (!svd_count(U,sK,V,KGj))
 		{
-			if (!svd(U,sK,V,KGj,"std"))
+			if (!svd_count(U,sK,V,KGj,"std"))
 			{
 				cout<<"preproc(): svd error\n";
 				return false;
@@ -2711,7 +2894,7 @@ bool OmegaMaxEnt_data::preproc()
 		NwA=Nw-2;
 		
 		if (cov_diag) NnC=Nn/2;
-		else NnC=Nn;
+		else NnC=std::min(int(Nn),int(G_V.n_rows));
 		
 		if (displ_adv_prep_figs)
 		{
@@ -3054,9 +3237,9 @@ bool OmegaMaxEnt_data::preproc()
 		mat KGj=KG_V*P;
 		mat U, V;
 		vec sK, sK2;
-		if (!svd(U,sK,V,KGj))
+		if (!svd_count(U,sK,V,KGj))
 		{
-			if (!svd(U,sK,V,KGj,"std"))
+			if (!svd_count(U,sK,V,KGj,"std"))
 			{
 				cout<<"preproc(): svd error\n";
 				return false;
@@ -3095,7 +3278,7 @@ bool OmegaMaxEnt_data::preproc()
 		NwA=Nw-1;
 		
 		if (cov_diag) NnC=Nn/2;
-		else NnC=Nn;
+		else NnC=std::min(int(Nn),int(G_V.n_rows));
 		
 		if (displ_adv_prep_figs)
 		{
@@ -3151,8 +3334,10 @@ bool OmegaMaxEnt_data::preproc()
 	return true;
 }
 
-void OmegaMaxEnt_data::compute_G_with_Pade(vec wP, int NP, double eta)
+void OmegaMaxEnt_data::compute_G_with_Pade(const vec &wP, int NP, double eta)
 {
+	stage_timer timer(run_stages["Pade"]);
+	
 	cout<<"computing real frequency Green function with Pade\n";
 	
 //	double tol_sv=1e-4;
@@ -3501,8 +3686,10 @@ void OmegaMaxEnt_data::compute_Re_chi_omega(vec Ap)
 }
 */
 
-void OmegaMaxEnt_data::compute_Re_G_omega(vec Ap)
+void OmegaMaxEnt_data::compute_Re_G_omega(const vec &Ap)
 {
+	stage_timer timer(run_stages["Re G (Kramers-Kronig)"]);
+	
 	double tol_dw=1e-12;
 	
 	cout<<"computing real part of the retarded Green function...\n";
@@ -3647,7 +3834,7 @@ void OmegaMaxEnt_data::compute_Re_G_omega(vec Ap)
 	}
 
 	double dw=w_dense(1)-w_dense(0);
-	if (Nw_out!=Nw_dense || fabs(w_out(0)-w_dense(0))>tol_dw*dw || fabs(w_out(Nw_out-1)-w_dense(Nw_dense-1))>tol_dw*dw)
+	if (w_out_grid.n_rows || Nw_out!=Nw_dense || fabs(w_out(0)-w_dense(0))>tol_dw*dw || fabs(w_out(Nw_out-1)-w_dense(Nw_dense-1))>tol_dw*dw)
 	{
 		coeffs.zeros(4*(Nw_dense-1));
 		spline_coeffs(w_dense.memptr(), A_dense.memptr(), Nw_dense, coeffs.memptr());
@@ -3667,15 +3854,7 @@ void OmegaMaxEnt_data::compute_Re_G_omega(vec Ap)
 		Gr_Re_w=Gr_Re_w+G_omega_inf;
 	}
 	
-	M_save.zeros(Nw_out,3);
-	M_save.col(0)=w_out;
-	M_save.col(1)=Gr_Re_w;
-	M_save.col(2)=Gi_Re_w;
-	
-	file_name_str=output_dir_fin;
-	file_name_str+=G_re_omega_name;
-	remove(file_name_str.c_str());
-	M_save.save(file_name_str,raw_ascii);
+	save_G_Re_omega();
 	
 	cout<<"real part of the retarded Green function computed\n";
 	
@@ -3754,7 +3933,30 @@ void OmegaMaxEnt_data::compute_Re_G_omega(vec Ap)
 	
 }
 
-void OmegaMaxEnt_data::set_output_frequency_grid(vec extr_w)
+void OmegaMaxEnt_data::save_G_Re_omega()
+{
+	mat M_save(Nw_out,3);
+	M_save.col(0)=w_out;
+	M_save.col(1)=Gr_Re_w;
+	M_save.col(2)=Gi_Re_w;
+	
+	string file_name_str=output_dir_fin;
+	file_name_str+=G_re_omega_name;
+	remove(file_name_str.c_str());
+	M_save.save(file_name_str,raw_ascii);
+	
+	// the complex columns are contiguous, so that G(w_out) is read without parsing and assigned in one slice
+	cx_mat G_save(Nw_out,2);
+	G_save.col(0)=cx_vec(w_out,zeros<vec>(Nw_out));
+	G_save.col(1)=cx_vec(Gr_Re_w,Gi_Re_w);
+	
+	file_name_str=output_dir_fin;
+	file_name_str+=G_re_omega_bin_name;
+	remove(file_name_str.c_str());
+	G_save.save(file_name_str,arma_binary);
+}
+
+void OmegaMaxEnt_data::set_output_frequency_grid(const vec &extr_w)
 {
 	double w_dense_min, w_dense_max, dw_dense, w_range, w_out_min, w_out_max, dw_out;
 	vec Dw=w.rows(1,Nw-1)-w.rows(0,Nw-2);
@@ -3762,8 +3964,22 @@ void OmegaMaxEnt_data::set_output_frequency_grid(vec extr_w)
 	
 	dw_dense=dw_min;
 	w_range=R_SW_G_Re_w_range*SW;
-	double w_range_tmp;
-	if (output_grid_params_in.size() && output_grid_params(0)<0 && output_grid_params(2)>0 && output_grid_params(0)>extr_w(0) && output_grid_params(2)<extr_w(1))
+	double w_range_tmp=0;
+	bool use_grid_file=false;
+	if (w_out_grid.n_rows>1)
+	{
+		use_grid_file=(w_out_grid(0)>extr_w(0) && w_out_grid(w_out_grid.n_rows-1)<extr_w(1) && all(diff(w_out_grid)>0));
+		if (!use_grid_file)
+		{
+			cout<<"set_output_frequency_grid(): invalid output real frequency grid file. The frequencies must be increasing and inside the range where the spectrum is defined.\n";
+			cout<<"Using the output real frequency grid parameters or the default output grid.\n";
+		}
+	}
+	if (use_grid_file)
+	{
+		w_range_tmp=2*max(fabs(w_out_grid(0)),fabs(w_out_grid(w_out_grid.n_rows-1)));
+	}
+	else if (output_grid_params_in.size() && output_grid_params(0)<0 && output_grid_params(2)>0 && output_grid_params(0)>extr_w(0) && output_grid_params(2)<extr_w(1))
 	{
 		w_range_tmp=-output_grid_params(0);
 		if (output_grid_params(2)+output_grid_params(1)>w_range_tmp) w_range_tmp=output_grid_params(2);
@@ -3791,7 +4007,13 @@ void OmegaMaxEnt_data::set_output_frequency_grid(vec extr_w)
 		w_range=w_dense_max-w_dense_min;
 	}
 	
-	if (output_grid_params_in.size() && output_grid_params(0)<0 && output_grid_params(2)>0 && output_grid_params(0)>extr_w(0) && output_grid_params(2)<extr_w(1))
+	if (use_grid_file)
+	{
+		// the spectrum is only evaluated at the requested frequencies, which can be non-uniform and cover part of the spectrum
+		w_out=w_out_grid;
+		Nw_out=w_out_grid.n_rows;
+	}
+	else if (output_grid_params_in.size() && output_grid_params(0)<0 && output_grid_params(2)>0 && output_grid_params(0)>extr_w(0) && output_grid_params(2)<extr_w(1))
 	{
 		w_out_min=output_grid_params(0);
 		w_out_max=output_grid_params(2);
@@ -3895,7 +4117,7 @@ void OmegaMaxEnt_data::set_output_frequency_grid(vec extr_w)
 //	cout<<"maximum frequency of the output real frequency grid: "<<w_dense_max<<endl;
 }
 
-void OmegaMaxEnt_data::compute_G_Re_omega_from_A_t(vec t, cx_vec At, cx_vec &G_Re_omega)
+void OmegaMaxEnt_data::compute_G_Re_omega_from_A_t(const vec &t, const cx_vec &At, cx_vec &G_Re_omega)
 {
 	cout<<"computing the Fourier transform of the real time Green function...\n";
 	
@@ -4112,7 +4334,7 @@ void OmegaMaxEnt_data::compute_G_Re_omega_from_A_t(vec t, cx_vec At, cx_vec &G_R
 */
 }
 
-void OmegaMaxEnt_data::Fourier_transform_spectrum(vec wFt, vec AwFt, vec &t, cx_vec &At)
+void OmegaMaxEnt_data::Fourier_transform_spectrum(const vec &wFt, vec AwFt, vec &t, cx_vec &At)
 {
 	cout<<"computing the Fourier transform of the spectrum\n";
 	
@@ -4245,7 +4467,7 @@ void OmegaMaxEnt_data::Fourier_transform_spectrum(vec wFt, vec AwFt, vec &t, cx_
 	
 }
 
-void OmegaMaxEnt_data::KK_integrate(vec w_KK, fctPtr1 Ptr, void *par[], double Rwdw, vec &G_tmp, vec tol, vec lims)
+void OmegaMaxEnt_data::KK_integrate(const vec &w_KK, fctPtr1 Ptr, void *par[], double Rwdw, vec &G_tmp, const vec &tol, const vec &lims)
 {
 	double dw;
 	double dw_min=1e-10;
@@ -4398,8 +4620,60 @@ double OmegaMaxEnt_data::KK_integ_chi(double x, void *par[])
 	return spline_val_chi_part(x, *x0, *ind_xlims, *xs, *coeffs)*x/(*w_ext-x);
 }
 
+bool OmegaMaxEnt_data::covariance_eig(vec &COV_eig, mat &V)
+{
+	if (R_cov_eig_min<=0) return eig_sym(COV_eig,V,COV);
+	
+	int N=COV.n_rows;
+	mat A=COV;
+	char JOBZ='V', RANGE='V', UPLO='U';
+	double VL=R_cov_eig_min*trace(COV), VU=2*trace(COV);
+	int IL=1, IU=N, M, INFO;
+	double ABSTOL=0;
+	vec W(N);
+	mat Z(N,N);
+	int *ISUPPZ=new int[2*N];
+	
+	int LWORK=-1, LIWORK=-1, IWORK_size;
+	double WORK_size;
+	dsyevr_(&JOBZ, &RANGE, &UPLO, &N, A.memptr(), &N, &VL, &VU, &IL, &IU, &ABSTOL, &M, W.memptr(), Z.memptr(), &N, ISUPPZ, &WORK_size, &LWORK, &IWORK_size, &LIWORK, &INFO);
+	
+	LWORK=int(WORK_size);
+	LIWORK=IWORK_size;
+	double *WORK=new double[LWORK];
+	int *IWORK=new int[LIWORK];
+	dsyevr_(&JOBZ, &RANGE, &UPLO, &N, A.memptr(), &N, &VL, &VU, &IL, &IU, &ABSTOL, &M, W.memptr(), Z.memptr(), &N, ISUPPZ, WORK, &LWORK, IWORK, &LIWORK, &INFO);
+	
+	delete [] ISUPPZ;
+	delete [] WORK;
+	delete [] IWORK;
+	
+	if (INFO!=0 || M==0) return false;
+	
+	COV_eig=W.rows(0,M-1);
+	V=Z.cols(0,M-1);
+	
+	return true;
+}
+
+mat OmegaMaxEnt_data::covariance_inverse(const mat &C)
+{
+	if (R_cov_eig_min<=0) return inv(C);
+	
+	vec C_eig;
+	mat V;
+	if (!eig_sym(C_eig,V,C)) return inv(C);
+	uvec ind_kept=find(C_eig>R_cov_eig_min*trace(C));
+	if (!ind_kept.n_elem) return inv(C);
+	mat VK=V.cols(ind_kept);
+	
+	return VK*diagmat(1.0/C_eig.elem(ind_kept))*VK.t();
+}
+
 bool OmegaMaxEnt_data::diagonalize_covariance_chi()
 {
+	stage_timer timer(run_stages["preproc: covariance diagonalization"]);
+	
 	mat VM, WM, VG, WG;
 	
 	if (NM>0)
@@ -4448,18 +4722,20 @@ bool OmegaMaxEnt_data::diagonalize_covariance_chi()
 	{
 		vec COVG_eig;
 		mat VGtmp;
-		if (!eig_sym(COVG_eig,VGtmp,COV))
+		if (!covariance_eig(COVG_eig,VGtmp))
 		{
 			cout<<"diagonalize_covariance_chi() error: diagonalization of covariance matrix failed\n";
 			return false;
 		}
-		mat PV=eye<mat>(Nn,Nn);
+		int NV=COVG_eig.n_rows;
+		if (NV<Nn) cout<<"number of covariance eigenvalues discarded: "<<Nn-NV<<endl;
+		mat PV=eye<mat>(NV,NV);
 		PV=flipud(PV);
 		COVG_eig=flipud(COVG_eig);
 		VG=VGtmp*PV;
 		vec GVtmp=VG.t()*Gchi2;
 		mat SGV=diagmat(sign(GVtmp));
-		SGV=SGV-abs(SGV)+eye<mat>(Nn,Nn);
+		SGV=SGV-abs(SGV)+eye<mat>(NV,NV);
 		VG=VG*SGV;
 		WG=diagmat(1.0/sqrt(COVG_eig));
 		if (COVG_eig.min()<=0)
@@ -4492,6 +4768,8 @@ bool OmegaMaxEnt_data::diagonalize_covariance_chi()
 
 bool OmegaMaxEnt_data::Kernel_chi()
 {
+	stage_timer timer(run_stages["preproc: kernel"]);
+	
 	dcomplex i(0,1);
 	
 	bool use_HF_exp=true;
@@ -4897,7 +5175,7 @@ bool OmegaMaxEnt_data::Kernel_chi()
 	return true;
 }
 
-double OmegaMaxEnt_data::spline_val_chi_part(double x, vec x0, uvec ind_xlims, vec xs, vec coeffs)
+double OmegaMaxEnt_data::spline_val_chi_part(double x, const vec &x0, const uvec &ind_xlims, const vec &xs, const vec &coeffs)
 {
 	if (x<0) x=-x;
 		
@@ -4959,7 +5237,7 @@ double OmegaMaxEnt_data::spline_val_chi_part(double x, vec x0, uvec ind_xlims, v
 	return sv;
 }
 
-bool OmegaMaxEnt_data::spline_val_chi_part(vec x, vec x0, uvec ind_xlims, vec xs, vec coeffs, vec &sv)
+bool OmegaMaxEnt_data::spline_val_chi_part(const vec &x, const vec &x0, const uvec &ind_xlims, const vec &xs, const vec &coeffs, vec &sv)
 {
 	int Nx=x.n_rows;
 	int Nx0=x0.n_rows;
@@ -5027,27 +5305,27 @@ bool OmegaMaxEnt_data::spline_val_chi_part(vec x, vec x0, uvec ind_xlims, vec xs
 	return true;
 }
 
-bool OmegaMaxEnt_data::sum_gaussians_chi(vec x, rowvec x0, rowvec s0, rowvec wgt, vec &F)
+bool OmegaMaxEnt_data::sum_gaussians_chi(const vec &x, const rowvec &x0, const rowvec &s0, const rowvec &wgt, vec &F)
 {
 	int Npks=x0.n_cols;
 	
 	F.zeros(x.n_rows);
 
-	double W=sum(wgt.cols(0,Npks-1)), s2;
+	double W=sum(wgt.cols(0,Npks-1)), c2;
 	
 	int j;
 	for (j=0; j<Npks; j++)
 	{
-		s2=pow(s0(j),2);
-		F=F+wgt(j)*(exp(-pow(x-x0(j),2)/(2*s2)) + exp(-pow(x+x0(j),2)/(2*s2)))/(2*s0(j));
+		c2=-0.5/(s0(j)*s0(j));
+		F+=(wgt(j)/(2*s0(j)))*(exp(square(x-x0(j))*c2) + exp(square(x+x0(j))*c2));
 	}
 	
-	F=sqrt(2*PI)*F/W;
+	F*=sqrt(2*PI)/W;
 	
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_chi_part(vec x, uvec ind_xlims, vec xs, vec F, vec &coeffs)
+bool OmegaMaxEnt_data::spline_chi_part(const vec &x, const uvec &ind_xlims, const vec &xs, const vec &F, vec &coeffs)
 {
 	int j;
 	
@@ -5226,7 +5504,7 @@ bool OmegaMaxEnt_data::spline_chi_part(vec x, uvec ind_xlims, vec xs, vec F, vec
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_matrix_chi(vec x, uvec ind_xlims, vec xs, mat &Mspl)
+bool OmegaMaxEnt_data::spline_matrix_chi(const vec &x, const uvec &ind_xlims, const vec &xs, mat &Mspl)
 {
 	int j;
 	
@@ -5240,7 +5518,7 @@ bool OmegaMaxEnt_data::spline_matrix_chi(vec x, uvec ind_xlims, vec xs, mat &Msp
 	//solve the spline in the interval [0,wr]
 	int NSc=3*Nc-1;
 	
-	mat Aspl=zeros<mat>(NSc,NSc);
+	band_matrix Aspl(NSc,3,3);
 	
 	double Dx=x(1)-x(0);
 	
@@ -5283,10 +5561,6 @@ bool OmegaMaxEnt_data::spline_matrix_chi(vec x, uvec ind_xlims, vec xs, mat &Msp
 	Aspl(3*j-2,3*j-3)=2*Dx;
 	Aspl(3*j-2,3*j-2)=1;
 	
-	mat D(NSc,NSc);
-	D.eye();
-	mat Cc=solve(Aspl,D);
-	
 	mat T=zeros<mat>(NSc,Nx);
 	for (j=0; j<Nc; j++)
 	{
@@ -5296,7 +5570,8 @@ bool OmegaMaxEnt_data::spline_matrix_chi(vec x, uvec ind_xlims, vec xs, mat &Msp
 	T(3*Nc-2,ind_xlims(0)-1)=-1/(x(ind_xlims(0)+1)-x(ind_xlims(0)-1));
 	T(3*Nc-2,ind_xlims(0)+1)=1/(x(ind_xlims(0)+1)-x(ind_xlims(0)-1));
 	
-	Cc=Cc*T;
+	mat Cc=T;
+	if (!Aspl.solve(Cc)) return false;
 	
 	mat Cc2=zeros<mat>(NSc+1,Nx);
 	
@@ -5305,7 +5580,7 @@ bool OmegaMaxEnt_data::spline_matrix_chi(vec x, uvec ind_xlims, vec xs, mat &Msp
 	
 	//solve the spline in the interval [wr,inf
 	int NSd=3*Nd-1;
-	Aspl.zeros(NSd,NSd);
+	Aspl.zeros(NSd);
 	
 	double u=1/(x(ind_xlims(0))-x0d)-1/(x(ind_xlims(0)+1)-x0d);
 	double ud=1/(x(ind_xlims(0))-x0d);
@@ -5350,9 +5625,6 @@ bool OmegaMaxEnt_data::spline_matrix_chi(vec x, uvec ind_xlims, vec xs, mat &Msp
 	Aspl(3*j+1,3*j)=pow(u,3);
 	Aspl(3*j+1,3*j+1)=pow(u,2);
 	
-	D.eye(NSd,NSd);
-	mat Cd=solve(Aspl,D);
-	
 	T.zeros(NSd,Nx);
 	T(0,ind_xlims(0)-1)=-1/(x(ind_xlims(0)+1)-x(ind_xlims(0)-1));
 	T(0,ind_xlims(0)+1)=1/(x(ind_xlims(0)+1)-x(ind_xlims(0)-1));
@@ -5364,7 +5636,8 @@ bool OmegaMaxEnt_data::spline_matrix_chi(vec x, uvec ind_xlims, vec xs, mat &Msp
 	j=Nd;
 	T(3*j-2,ind_xlims(0)+j-1)=1;
 	
-	Cd=Cd*T;
+	mat Cd=T;
+	if (!Aspl.solve(Cd)) return false;
 	
 	int NS_tot=NSc+NSd+1;
 	
@@ -5377,6 +5650,8 @@ bool OmegaMaxEnt_data::spline_matrix_chi(vec x, uvec ind_xlims, vec xs, mat &Msp
 
 bool OmegaMaxEnt_data::set_default_model_chi()
 {
+	stage_timer timer(run_stages["preproc: default model"]);
+	
 	if (def_model_file.size())
 	{
 		cout<<"default model provided\n";
@@ -5631,7 +5906,7 @@ bool OmegaMaxEnt_data::set_default_model_chi()
 	return true;
 }
 
-bool OmegaMaxEnt_data::default_model_val_chi(vec x, vec x0, vec coeffs, vec gaussians_params, vec &dm)
+bool OmegaMaxEnt_data::default_model_val_chi(const vec &x, const vec &x0, const vec &coeffs, const vec &gaussians_params, vec &dm)
 {
 	int Nx=x.n_rows;
 	int Nx0=x0.n_rows;
@@ -5780,6 +6055,8 @@ bool OmegaMaxEnt_data::truncate_chi_omega_n()
 
 bool OmegaMaxEnt_data::set_omega_grid_chi()
 {
+	stage_timer timer(run_stages["preproc: grid"]);
+	
 	if (!SW_set || !wc_exists) return false;
 	
 	int j;
@@ -5817,6 +6094,8 @@ bool OmegaMaxEnt_data::set_omega_grid_chi()
 
 bool OmegaMaxEnt_data::set_wc_chi()
 {
+	stage_timer timer(run_stages["preproc: grid"]);
+	
 	bool use_nu_grid=false;
 	
 	double dw_min;
@@ -6399,7 +6678,7 @@ bool OmegaMaxEnt_data::test_low_energy_peak_chi()
 				Gtmp=Gchi2.rows(p0(q)-1,Nfit+p0(q)-2);
 				CG=COV.submat(p0(q)-1,p0(q)-1,Nfit+p0(q)-2,Nfit+p0(q)-2);
 				
-				invCG=inv(CG);
+				invCG=covariance_inverse(CG);
 				//	invCG=inv_sympd(CG);
 				AM=(X.t())*invCG*X;
 				BM=(X.t())*invCG*Gtmp;
@@ -6620,6 +6899,8 @@ bool OmegaMaxEnt_data::test_low_energy_peak_chi()
 
 bool OmegaMaxEnt_data::compute_moments_chi_omega_n()
 {
+	stage_timer timer(run_stages["preproc: moments"]);
+	
 	int j, NC=3;
 	
 	cout<<"COMPUTING MOMENTS\n";
@@ -6660,6 +6941,12 @@ bool OmegaMaxEnt_data::compute_moments_chi_omega_n()
 	
 	if (jfitmax<jfitmin) return false;
 	
+	// inverse of the covariance of each frequency, if the errors at different frequencies are independent
+	mat invCOV_blocks;
+	COV_block_diag_inverse(1, invCOV_blocks);
+	// otherwise, Cholesky factor of the covariance of the current fit window, updated from one window to the next
+	window_cholesky LC(COV);
+	
 	vec M1v(NNfit), M3v(NNfit);
 	mat invCG, A, X, CG;
 	vec Mtmp;
@@ -6684,19 +6971,7 @@ bool OmegaMaxEnt_data::compute_moments_chi_omega_n()
 			}
 		}
 		
-		CG=COV.submat(jfit-1,jfit-1,jfit+Nfit-2,jfit+Nfit-2);
-		
-		//		if (jfit==jfitmin) cout<<CG.submat(0,0,10,10);
-		
-		//		LC=chol(CG);
-		//		invLC=inv(LC);
-		//		invCG=invLC*invLC.t();
-		
-		invCG=inv(CG);
-//		invCG=inv_sympd(CG);
-		A=trans(X)*invCG*X;
-		A=0.5*(A+A.t());
-		Mtmp=trans(X)*invCG*Gchi2.rows(jfit-1,jfit+Nfit-2);
+		fit_normal_equations(X, Gchi2, jfit-1, invCOV_blocks, LC, A, Mtmp);
 		
 		//		dposv_(&UPLO, &NA, &NRHS, A.memptr(), &NA, Mtmp.memptr(), &NA, &INFO);
 		Mtmp=solve(A,Mtmp);
@@ -6773,16 +7048,7 @@ bool OmegaMaxEnt_data::compute_moments_chi_omega_n()
 		}
 	}
 	
-	CG=COV.submat(jfit-1,jfit-1,jfit+Nfit-2,jfit+Nfit-2);
-	
-	//	LC=chol(CG);
-	//	invLC=inv(LC);
-	//	invCG=invLC*invLC.t();
-	
-	invCG=inv(CG);
-//		invCG=inv_sympd(CG);
-	A=trans(X)*invCG*X;
-	A=0.5*(A+A.t());
+	fit_normal_equations(X, Gchi2, jfit-1, invCOV_blocks, LC, A, Mtmp);
 	mat COVMtmp=inv(A);
 	COVMfit=COVMtmp.submat(0,0,0,0);
 	
@@ -7408,6 +7674,8 @@ bool OmegaMaxEnt_data::compute_moments_tau_bosons()
 
 bool OmegaMaxEnt_data::Kernel_G_bosons()
 {
+	stage_timer timer(run_stages["preproc: kernel"]);
+	
 	bool use_HF_exp=true;
 	double fg=1.7;
 	double fi=fg;
@@ -8068,7 +8336,7 @@ bool OmegaMaxEnt_data::test_low_energy_peak_bosons()
 				Gtmp=Gchi2.rows(2*p0(q)-2,2*(Nfit+p0(q))-3);
 				CG=COV.submat(2*p0(q)-2,2*p0(q)-2,2*(Nfit+p0(q))-3,2*(Nfit+p0(q))-3);
 				
-				invCG=inv(CG);
+				invCG=covariance_inverse(CG);
 				//	invCG=inv_sympd(CG);
 				AM=(X.t())*invCG*X;
 				BM=(X.t())*invCG*Gtmp;
@@ -8780,6 +9048,8 @@ void OmegaMaxEnt_data::set_Ntau_to_pow_2()
 
 bool OmegaMaxEnt_data::Fourier_transform_G_tau()
 {
+	stage_timer timer(run_stages["preproc: Fourier transform"]);
+	
 	int j, m, q;
 	dcomplex I(0,1);
 	double M1_FT, M2_FT;
@@ -9246,6 +9516,10 @@ bool OmegaMaxEnt_data::Fourier_transform_G_tau()
 			mat invCG, A, X, CG;
 			vec Mtmp;
 			
+			mat invCOV_blocks;
+			COV_block_diag_inverse(2, invCOV_blocks);
+			window_cholesky LC(COV);
+			
 			for (jfit=jfitmin; jfit<=jfitmax; jfit++)
 			{
 				Nfit=Nn_fit_max;
@@ -9263,13 +9537,7 @@ bool OmegaMaxEnt_data::Fourier_transform_G_tau()
 					}
 				}
 				
-				CG=COV.submat(2*jfit-2,2*jfit-2,2*(jfit+Nfit-1)-1,2*(jfit+Nfit-1)-1);
-				
-				invCG=inv(CG);
-				//	invCG=inv_sympd(CG);
-				A=trans(X)*invCG*X;
-				A=0.5*(A+A.t());
-				Mtmp=trans(X)*invCG*Gchi2.rows(2*jfit-2,2*(jfit+Nfit-1)-1);
+				fit_normal_equations(X, Gchi2, 2*jfit-2, invCOV_blocks, LC, A, Mtmp);
 				
 				Mtmp=solve(A,Mtmp);
 				
@@ -9430,6 +9698,10 @@ bool OmegaMaxEnt_data::Fourier_transform_G_tau()
 			mat invCG, A, X, CG;
 			vec Mtmp;
 			
+			mat invCOV_blocks;
+			COV_block_diag_inverse(1, invCOV_blocks);
+			window_cholesky LC(COV);
+			
 			for (jfit=jfitmin; jfit<=jfitmax; jfit++)
 			{
 				Nfit=Nn_fit_max;
@@ -9446,13 +9718,7 @@ bool OmegaMaxEnt_data::Fourier_transform_G_tau()
 					}
 				}
 				
-				CG=COV.submat(jfit-1,jfit-1,jfit+Nfit-2,jfit+Nfit-2);
-				
-				invCG=inv(CG);
-				//		invCG=inv_sympd(CG);
-				A=trans(X)*invCG*X;
-				A=0.5*(A+A.t());
-				Mtmp=trans(X)*invCG*Gchi2.rows(jfit-1,jfit+Nfit-2);
+				fit_normal_equations(X, Gchi2, jfit-1, invCOV_blocks, LC, A, Mtmp);
 				
 				Mtmp=solve(A,Mtmp);
 				
@@ -9787,6 +10053,8 @@ bool OmegaMaxEnt_data::compute_dG_dtau()
 
 bool OmegaMaxEnt_data::compute_moments_tau()
 {
+	stage_timer timer(run_stages["preproc: moments"]);
+	
 	cout<<"COMPUTING MOMENTS\n";
 	
 	int sgn=1;
@@ -9931,7 +10199,7 @@ bool OmegaMaxEnt_data::compute_moments_tau()
 	
 	mat U, V;
 	vec sK;
-	svd(U,sK,V,X,"std");
+	svd_count(U,sK,V,X,"std");
 	
 	p=0;
 	while (p<=np && sK(p)/sK(0)>R_sv_min) p++;
@@ -10023,20 +10291,37 @@ bool OmegaMaxEnt_data::compute_moments_tau()
 	ivec pmax_dNfit_0=linspace<ivec>(Nfitmax-1,npmin,Nfitmax-npmin);
 	ivec pmax_dNfit=pmax_dNfit_0;
 	
+	// the covariances and the data of the four fits for Nfit points are the leading blocks of those for Nfitmax points. Their Cholesky factors are extended by one row for each value of Nfit
+	vec G_e=Gtau.rows(0,Nfitmax-1)+sgn*flipud(Gtau.rows(Ntau-Nfitmax+1,Ntau));
+	mat C_e=Ctau_all.submat(0,0,Nfitmax-1,Nfitmax-1)+sgn*fliplr(Ctau_all.submat(0,Ntau-Nfitmax+1,Nfitmax-1,Ntau))+sgn*flipud(Ctau_all.submat(Ntau-Nfitmax+1,0,Ntau,Nfitmax-1))+flipud(fliplr(Ctau_all.submat(Ntau-Nfitmax+1,Ntau-Nfitmax+1,Ntau,Ntau)));
+	vec G_o=Gtau.rows(0,Nfitmax-1)-sgn*flipud(Gtau.rows(Ntau-Nfitmax+1,Ntau));
+	mat C_o=Ctau_all.submat(0,0,Nfitmax-1,Nfitmax-1)-sgn*fliplr(Ctau_all.submat(0,Ntau-Nfitmax+1,Nfitmax-1,Ntau))-sgn*flipud(Ctau_all.submat(Ntau-Nfitmax+1,0,Ntau,Nfitmax-1))+flipud(fliplr(Ctau_all.submat(Ntau-Nfitmax+1,Ntau-Nfitmax+1,Ntau,Ntau)));
+	vec G_0=Gtau.rows(0,Nfitmax-1);
+	mat C_0=Ctau_all.submat(0,0,Nfitmax-1,Nfitmax-1);
+	vec G_b=flipud(Gtau.rows(Ntau-Nfitmax+1,Ntau));
+	mat C_b=flipud(fliplr(Ctau_all.submat(Ntau-Nfitmax+1,Ntau-Nfitmax+1,Ntau,Ntau)));
+	window_cholesky LC_e(C_e), LC_o(C_o), LC_0(C_0), LC_b(C_b);
+	mat no_blocks;
+	
+	// the normal equations of the fits of degree np are the leading blocks of those of degree Nfit-1, computed once for each value of Nfit
+	mat AM_e, AM_o, AM_0, AM_b;
+	vec BM_e, BM_o, BM_0, BM_b;
 	for (Nfit=Nfitmin; Nfit<=Nfitmax; Nfit++)
 	{
 		pmax=Nfit-1;
+		X.zeros(Nfit,pmax+1);
+		for (p=0; p<=pmax; p++)
+			X.col(p)=pow(tau.rows(0,Nfit-1)/tau(Nfit-1),p);
+		
+		fit_normal_equations(X, G_e, 0, no_blocks, LC_e, AM_e, BM_e);
+		fit_normal_equations(X, G_o, 0, no_blocks, LC_o, AM_o, BM_o);
+		fit_normal_equations(X, G_0, 0, no_blocks, LC_0, AM_0, BM_0);
+		fit_normal_equations(X, G_b, 0, no_blocks, LC_b, AM_b, BM_b);
+		
 		for (np=npmin; np<=pmax; np++)
 		{
-			X.zeros(Nfit,np+1);
-			for (p=0; p<=np; p++)
-				X.col(p)=pow(tau.rows(0,Nfit-1)/tau(Nfit-1),p);
-			
-			Gchi2tmp=Gtau.rows(0,Nfit-1)+sgn*flipud(Gtau.rows(Ntau-Nfit+1,Ntau));
-			CG=Ctau_all.submat(0,0,Nfit-1,Nfit-1)+sgn*fliplr(Ctau_all.submat(0,Ntau-Nfit+1,Nfit-1,Ntau))+sgn*flipud(Ctau_all.submat(Ntau-Nfit+1,0,Ntau,Nfit-1))+flipud(fliplr(Ctau_all.submat(Ntau-Nfit+1,Ntau-Nfit+1,Ntau,Ntau)));
-			invCG=inv(CG);
-			AM=(X.t())*invCG*X;
-			BM=(X.t())*invCG*Gchi2tmp;
+			AM=AM_e.submat(0,0,np,np);
+			BM=BM_e.rows(0,np);
 	//		Mtmp=solve(AM,BM);
 			if (!solve(Mtmp,AM,BM))
 			{
@@ -10048,11 +10333,8 @@ bool OmegaMaxEnt_data::compute_moments_tau()
 			M2b(Nfit-np-1,np-npmin)=-2*Mtmp(2)/pow(tau(Nfit-1),2);
 			//	M2b(Nfit-np-1,np-npmin)=-2*Mtmp(2);
 			
-			Gchi2tmp=Gtau.rows(0,Nfit-1)-sgn*flipud(Gtau.rows(Ntau-Nfit+1,Ntau));
-			CG=Ctau_all.submat(0,0,Nfit-1,Nfit-1)-sgn*fliplr(Ctau_all.submat(0,Ntau-Nfit+1,Nfit-1,Ntau))-sgn*flipud(Ctau_all.submat(Ntau-Nfit+1,0,Ntau,Nfit-1))+flipud(fliplr(Ctau_all.submat(Ntau-Nfit+1,Ntau-Nfit+1,Ntau,Ntau)));
-			invCG=inv(CG);
-			AM=(X.t())*invCG*X;
-			BM=(X.t())*invCG*Gchi2tmp;
+			AM=AM_o.submat(0,0,np,np);
+			BM=BM_o.rows(0,np);
 	//		Mtmp=solve(AM,BM);
 			if (!solve(Mtmp,AM,BM))
 			{
@@ -10065,11 +10347,8 @@ bool OmegaMaxEnt_data::compute_moments_tau()
 			M1b(Nfit-np-1,np-npmin)=Mtmp(1)/tau(Nfit-1);
 			M3b(Nfit-np-1,np-npmin)=6*Mtmp(3)/pow(tau(Nfit-1),3);
 			
-			Gchi2tmp=Gtau.rows(0,Nfit-1);
-			CG=Ctau_all.submat(0,0,Nfit-1,Nfit-1);
-			invCG=inv(CG);
-			AM=(X.t())*invCG*X;
-			BM=(X.t())*invCG*Gchi2tmp;
+			AM=AM_0.submat(0,0,np,np);
+			BM=BM_0.rows(0,np);
 		//	Mtmp=solve(AM,BM);
 			if (!solve(Mtmp,AM,BM))
 			{
@@ -10082,12 +10361,8 @@ bool OmegaMaxEnt_data::compute_moments_tau()
 			d2G0(Nfit-np-1,np-npmin)=2*Mtmp(2)/pow(tau(Nfit-1),2);
 			d3G0(Nfit-np-1,np-npmin)=6*Mtmp(3)/pow(tau(Nfit-1),3);
 			
-			Gchi2tmp=flipud(Gtau.rows(Ntau-Nfit+1,Ntau));
-			CG=flipud(fliplr(Ctau_all.submat(Ntau-Nfit+1,Ntau-Nfit+1,Ntau,Ntau)));
-			invCG=inv(CG);
-			//	invCG=inv_sympd(CG);
-			AM=(X.t())*invCG*X;
-			BM=(X.t())*invCG*Gchi2tmp;
+			AM=AM_b.submat(0,0,np,np);
+			BM=BM_b.rows(0,np);
 	//		Mtmp=solve(AM,BM);
 			if (!solve(Mtmp,AM,BM))
 			{
@@ -10354,12 +10629,12 @@ bool OmegaMaxEnt_data::compute_moments_tau()
 		X.col(p)=pow(tau.rows(0,Nfit-1),p);
 	
 	CG=Ctau_all.submat(0,0,Nfit-1,Nfit-1)+sgn*fliplr(Ctau_all.submat(0,Ntau-Nfit+1,Nfit-1,Ntau))+sgn*flipud(Ctau_all.submat(Ntau-Nfit+1,0,Ntau,Nfit-1))+flipud(fliplr(Ctau_all.submat(Ntau-Nfit+1,Ntau-Nfit+1,Ntau,Ntau)));
-	invCG=inv(CG);
+	invCG=covariance_inverse(CG);
 	AM=(X.t())*invCG*X;
 	mat invAMp=inv(AM);
 	
 	CG=Ctau_all.submat(0,0,Nfit-1,Nfit-1)-sgn*fliplr(Ctau_all.submat(0,Ntau-Nfit+1,Nfit-1,Ntau))-sgn*flipud(Ctau_all.submat(Ntau-Nfit+1,0,Ntau,Nfit-1))+flipud(fliplr(Ctau_all.submat(Ntau-Nfit+1,Ntau-Nfit+1,Ntau,Ntau)));
-	invCG=inv(CG);
+	invCG=covariance_inverse(CG);
 	AM=(X.t())*invCG*X;
 	mat invAMn=inv(AM);
 	
@@ -11152,7 +11427,7 @@ bool OmegaMaxEnt_data::set_covar_Gtau()
 	return true;
 }
 
-bool OmegaMaxEnt_data::fit_circle_arc(vec x, vec y, vec &arc_params)
+bool OmegaMaxEnt_data::fit_circle_arc(const vec &x, const vec &y, vec &arc_params)
 {
 	bool displ_fig=false;
 	
@@ -11470,20 +11745,16 @@ bool OmegaMaxEnt_data::fit_circle_arc(vec x, vec y, vec &arc_params)
 
 void OmegaMaxEnt_data::compute_Bryan_spectrum(vec &Abr)
 {
-	int i,j;
+	int i;
 	
-	mat PA(ind_alpha_vec,Nw);
+	mat PA(ind_alpha_vec,Nw,fill::zeros);
 	
-	char file_name[200];
-	mat data;
 	vec A_tmp;
 
 	for (i=ind_alpha_vec-1; i>=0; i--)
 	{
-		sprintf(file_name, output_name_format.c_str(),tem,alpha_vec(i));
-		if (data.load(file_name))
+		if (alpha_path_spectrum(i,A_tmp))
 		{
-			A_tmp=data.col(1);
 			PA.row(ind_alpha_vec-i-1)=P_alpha_G(i)*A_tmp.t();
 		}
 		else
@@ -11498,18 +11769,22 @@ void OmegaMaxEnt_data::compute_Bryan_spectrum(vec &Abr)
 	
 	vec lalpha=flipud(log(alpha_vec.rows(0,ind_alpha_vec-1)));
 	vec coeffs(4*(ind_alpha_vec-1));
-	vec PA_alpha;
+	vec e_k(ind_alpha_vec);
 	
-	Abr.zeros(Nw);
-	for (i=imin; i<=imax; i++)
+	//the integral of the spline over log(alpha) is linear in the values, so that it is the same weighted sum of the values at all the frequencies
+	vec wgt_lalpha(ind_alpha_vec);
+	for (i=0; i<ind_alpha_vec; i++)
 	{
+		e_k.zeros();
+		e_k(i)=1;
 		coeffs(0)=0;
 		coeffs(1)=0;
-		PA_alpha=PA.col(i);
-		spline_coeffs(lalpha.memptr(), PA_alpha.memptr(), ind_alpha_vec, coeffs.memptr());
-		Abr(i)=integrate_spline(lalpha, coeffs);
+		spline_coeffs(lalpha.memptr(), e_k.memptr(), ind_alpha_vec, coeffs.memptr());
+		wgt_lalpha(i)=integrate_spline(lalpha, coeffs);
 	}
 	
+	Abr.zeros(Nw);
+	Abr.rows(imin,imax)=PA.cols(imin,imax).t()*wgt_lalpha;
 }
 
 void OmegaMaxEnt_data::normalize_P_alpha_G()
@@ -11538,7 +11813,7 @@ void OmegaMaxEnt_data::normalize_P_alpha_G()
 	P_alpha_G=flipud(P_alpha_G)/sum;
 }
 
-double OmegaMaxEnt_data::integrate_spline(vec x, vec coeffs)
+double OmegaMaxEnt_data::integrate_spline(const vec &x, const vec &coeffs)
 {
 	int N=x.n_rows;
 	double dx;
@@ -11713,202 +11988,43 @@ double OmegaMaxEnt_data::integrate_P_A_i_alpha(double alphaD_p)
 //	cout<<setw(15)<<alpha_D[0]<<setw(15)<<IPA<<IPA_gaussian<<endl;
 	
 	delete [] alpha_D;
-	
-	return IPA;
-}
-
-void OmegaMaxEnt_data::integrate_P_A_alpha()
-{
-	int i, j;
-	bool trace_integ=false;
-	
-	fctPtr1 Ptr=static_cast<fctPtr1> (&OmegaMaxEnt_data::P_A_alpha_val);
-	fctPtr PtrS=static_cast<fctPtr> (&OmegaMaxEnt_data::S_i);
-	
-	double pow_alphaD_max=5;
-	double pow_alphaD_min=-20;
-	double delta_pow_alphaD=0.1;
-	double pow_alphaD=pow_alphaD_max;
-	
-	int NalphaD=(pow_alphaD_max-pow_alphaD_min)/delta_pow_alphaD;
-	
-	pow_alphaD_vec.zeros(NalphaD);
-	integ_P_A_alpha.zeros(NalphaD);
-	vec integ_P_A_alpha_gaussian(NalphaD);
-	
-	double *alpha_D=new double[1];
-	void *par[1];
-	par[0]=alpha_D;
-	
-	double lims[2];
-	
-	double umax, umax_max, umax_min;
-	double umin=1e-100;
-	
-	double argmax=30;
-	double argmax2=40;
-	double arglogmax=2*exp(1);
-	double arg;
-	
-	double tol0=1e-10;
-	double tol1=1e-4;
-	double tol;
-	
-	double sq2=sqrt(2);
-	
-	vec lims_val={2,4,8,16};
-	int Nvals=lims_val.n_rows;
-	vec u_lims(2*Nvals+1);
-	double uv[1];
-	double parS[1];
-	double uv_init[3];
-	
-	int nbEval[1];
-	
-	alpha_D[0]=pow(10,pow_alphaD);
-	pow_alphaD_vec(0)=pow_alphaD;
-	
-	int j0, jfin;
-	
-	for (i=0; i<NalphaD; i++)
-	{
-		if (alpha_D[0]<argmax/arglogmax) umax=sqrt(argmax/alpha_D[0]);
-		else umax=sqrt(arglogmax);
-		
-		parS[0]=0;
-		while (alpha_D[0]*S_i(umax, parS)<argmax)
-		{
-			umax=2*umax;
-		}
-		umax_min=sq2;
-		while (alpha_D[0]*S_i(umax, parS)>argmax2)
-		{
-			umax_max=umax;
-			umax=umax_min+(umax-umax_min)/2;
-			while (alpha_D[0]*S_i(umax, parS)<argmax)
-			{
-				umax_min=umax;
-				umax=umax+(umax_max-umax)/2;
-			}
-		}
-		
-
-//		cout<<"umax: "<<umax<<endl;
-//		parS[0]=0;
-//		cout<<"alpha_D[0]*S_i(umax): "<<alpha_D[0]*S_i(umax, parS)<<endl;
-//		cout<<"exp(-alpha_D*S_i(umax)): "<<exp(-alpha_D[0]*S_i(umax, parS))<<endl;
-
-		lims[0]=umin;
-		lims[1]=sq2;
-		uv_init[0]=0.5*(lims[0]+lims[1])/2;
-		uv_init[1]=lims[0];
-		uv_init[2]=lims[1];
-		for (j=Nvals-1; j>=0; j--)
-		{
-			parS[0]=lims_val(j)/alpha_D[0];
-			tol=tol1*parS[0];
-			if (parS[0]<1 && find_zero(PtrS, uv_init, parS, uv, lims, tol))
-			{
-				u_lims(Nvals-j-1)=uv[0];
-				lims[0]=uv[0];
-//				cout<<setw(20)<<uv[0]<<S_i(uv[0], parS)<<endl;
-			}
-			else
-			{
-				u_lims(Nvals-j-1)=-1;
-			}
-			uv_init[0]=0.5*(lims[0]+lims[1])/2;
-			uv_init[1]=lims[0];
-			uv_init[2]=lims[1];
-		}
-		u_lims(Nvals)=sq2;
-		lims[0]=sq2;
-		lims[1]=umax;
-		uv_init[0]=0.5*(lims[0]+lims[1])/2;
-		uv_init[1]=lims[0];
-		uv_init[2]=lims[1];
-		for (j=0; j<Nvals; j++)
-		{
-			parS[0]=lims_val(j)/alpha_D[0];
-			if (find_zero(PtrS, uv_init, parS, uv, lims, tol))
-			{
-				u_lims(Nvals+j+1)=uv[0];
-				lims[0]=uv[0];
-//				cout<<setw(20)<<uv[0]<<S_i(uv[0], parS)<<endl;
-			}
-			else
-			{
-				u_lims(Nvals+j+1)=-1;
-			}
-			uv_init[0]=0.5*(lims[0]+lims[1])/2;
-			uv_init[1]=lims[0];
-			uv_init[2]=lims[1];
-		}
-/*
-		parS[0]=0;
-		for (j=0; j<=2*Nvals; j++)
-		{
-			if (u_lims(j)>0) cout<<setw(20)<<alpha_D[0]*S_i(u_lims(j), parS);
-			else
-				cout<<setw(20)<<-1;
-		}
-		cout<<endl;
-*/
-		if (u_lims(Nvals+1)>0)
-		{
-			tol=tol0;
-			lims[0]=u_lims(Nvals);
-			lims[1]=u_lims(Nvals+1);
-			nbEval[0]=0;
-			integ_P_A_alpha[i]=quadInteg1D(Ptr, lims, tol, nbEval, par);
-			tol=tol0*integ_P_A_alpha[i];
-			j0=0;
-			while (j0<Nvals && u_lims(j0)<0) j0++;
-			lims[0]=umin;
-			lims[1]=u_lims(j0);
-			nbEval[0]=0;
-			integ_P_A_alpha[i]=integ_P_A_alpha[i]+quadInteg1D(Ptr, lims, tol, nbEval, par);
-			for (j=j0; j<Nvals; j++)
-			{
-				lims[0]=u_lims(j);
-				lims[1]=u_lims(j+1);
-				nbEval[0]=0;
-				integ_P_A_alpha[i]=integ_P_A_alpha[i]+quadInteg1D(Ptr, lims, tol, nbEval, par);
-			}
-			jfin=2*Nvals;
-			while (jfin>Nvals+1 && u_lims(jfin)<0) jfin--;
-			lims[0]=u_lims(jfin);
-			lims[1]=umax;
-			nbEval[0]=0;
-			integ_P_A_alpha[i]=integ_P_A_alpha[i]+quadInteg1D(Ptr, lims, tol, nbEval, par);
-			for (j=jfin; j>Nvals+1; j--)
-			{
-				lims[0]=u_lims(j-1);
-				lims[1]=u_lims(j);
-				nbEval[0]=0;
-				integ_P_A_alpha[i]=integ_P_A_alpha[i]+quadInteg1D(Ptr, lims, tol, nbEval, par);
-			}
-		}
-		else
-		{
-			tol=tol0;
-			lims[0]=umin;
-			lims[1]=u_lims(Nvals);
-			nbEval[0]=0;
-			integ_P_A_alpha[i]=integ_P_A_alpha[i]+quadInteg1D(Ptr, lims, tol, nbEval, par);
-			lims[0]=u_lims(Nvals);
-			lims[1]=umax;
-			nbEval[0]=0;
-			integ_P_A_alpha[i]=integ_P_A_alpha[i]+quadInteg1D(Ptr, lims, tol, nbEval, par);
-		}
-		integ_P_A_alpha_gaussian(i)=sqrt(PI/alpha_D[0]);
-//		cout<<setw(15)<<alpha_D[0]<<setw(15)<<integ_P_A_alpha[i]<<setw(15)<<integrate_P_A_i_alpha(alpha_D[0])<<integ_P_A_alpha_gaussian(i)<<endl;
+	
+	return IPA;
+}
 
-		pow_alphaD=pow_alphaD-delta_pow_alphaD;
-		alpha_D[0]=pow(10,pow_alphaD);
-		pow_alphaD_vec(i)=pow_alphaD;
+void OmegaMaxEnt_data::integrate_P_A_alpha()
+{
+	stage_timer timer(run_stages["P(alpha|G) integration"]);
+	
+	int i;
+	bool trace_integ=false;
+	
+	double pow_alphaD_max=5;
+	double pow_alphaD_min=-20;
+	double delta_pow_alphaD=0.1;
+	
+	int NalphaD=round((pow_alphaD_max-pow_alphaD_min)/delta_pow_alphaD)+1;
+	
+	pow_alphaD_vec=linspace<vec>(pow_alphaD_min,pow_alphaD_max,NalphaD);
+	integ_P_A_alpha.zeros(NalphaD);
+	vec integ_P_A_alpha_gaussian(NalphaD);
+	
+	double alpha_D;
+	
+	for (i=0; i<NalphaD; i++)
+	{
+		alpha_D=pow(10,pow_alphaD_vec(i));
+		integ_P_A_alpha(i)=integrate_P_A_i_alpha(alpha_D);
+		integ_P_A_alpha_gaussian(i)=sqrt(PI/alpha_D);
 	}
 	
+	//cubic spline of log(integral) versus log10(alpha*D), used by P_A_i_alpha_table()
+	vec l_integ=log(integ_P_A_alpha);
+	coeffs_l_integ_P_A_alpha.zeros(4*(NalphaD-1));
+	coeffs_l_integ_P_A_alpha(0)=(l_integ(1)-l_integ(0))/delta_pow_alphaD;
+	coeffs_l_integ_P_A_alpha(1)=(l_integ(NalphaD-1)-l_integ(NalphaD-2))/delta_pow_alphaD;
+	spline_coeffs(pow_alphaD_vec.memptr(), l_integ.memptr(), NalphaD, coeffs_l_integ_P_A_alpha.memptr());
+	
 	if (trace_integ)
 	{
 		vec l_I_P_A_alpha=log10(integ_P_A_alpha);
@@ -11920,10 +12036,8 @@ void OmegaMaxEnt_data::integrate_P_A_alpha()
 		char lgd_ex[]="exact";
 		char lgd_gauss[]="gaussian";
 		double xlims[]={pow_alphaD_min-0.01*(pow_alphaD_max-pow_alphaD_min),pow_alphaD_max+0.01*(pow_alphaD_max-pow_alphaD_min)};
-		//	g1.add_data(pow_alphaD_vec.memptr(),integ_P_A_alpha.memptr(),NalphaD);
 		g1.add_data(pow_alphaD_vec.memptr(),l_I_P_A_alpha.memptr(),NalphaD);
 		g1.add_to_legend(lgd_ex);
-		//	g1.add_data(pow_alphaD_vec.memptr(),integ_P_A_alpha_gaussian.memptr(),NalphaD);
 		g1.add_data(pow_alphaD_vec.memptr(),l_I_P_A_alpha_gaussian.memptr(),NalphaD);
 		g1.add_to_legend(lgd_gauss);
 		g1.set_axes_labels(xl,yl);
@@ -11933,6 +12047,26 @@ void OmegaMaxEnt_data::integrate_P_A_alpha()
 	}
 }
 
+double OmegaMaxEnt_data::P_A_i_alpha_table(double alphaD_p)
+{
+	if (!integ_P_A_alpha.n_rows) integrate_P_A_alpha();
+	
+	int NalphaD=pow_alphaD_vec.n_rows;
+	double x=log10(alphaD_p);
+	
+	//below the table, the integral is computed directly
+	if (x<pow_alphaD_vec(0)) return integrate_P_A_i_alpha(alphaD_p);
+	//above the table, the integral is given by the gaussian approximation sqrt(PI/alphaD), continuous with the table
+	if (x>=pow_alphaD_vec(NalphaD-1)) return integ_P_A_alpha(NalphaD-1)*sqrt(pow(10,pow_alphaD_vec(NalphaD-1))/alphaD_p);
+	
+	const double *x_int=pow_alphaD_vec.memptr()+1;
+	int l=std::upper_bound(x_int, x_int+NalphaD-2, x)-x_int;
+	double Dx=x-pow_alphaD_vec(l);
+	const double *c=coeffs_l_integ_P_A_alpha.memptr()+4*l;
+	
+	return exp(((c[0]*Dx+c[1])*Dx+c[2])*Dx+c[3]);
+}
+
 double OmegaMaxEnt_data::P_A_alpha_val(double u, void*par[])
 {
 	double *alpha_D=reinterpret_cast<double*>(par[0]);
@@ -11950,8 +12084,10 @@ double OmegaMaxEnt_data::S_i(double u, double c[])
 
 void OmegaMaxEnt_data::minimize()
 {
+	stage_timer timer(run_stages["minimize"]);
+	
 	double tol_int_dA2=1e-2;
-	char alpha_output[100], file_name[200];
+	char alpha_output[100];
 	char alpha_output_format[]="%d \t alpha: % 1.4e,  Q: % 1.4e,  S: % 1.4e,  chi2: % 1.4e\n";
 	double mean_int_dA_prec, mean_int_dA_prec2, A1min, chi2prec, Q, S;
 	mat chi2, P, KGMj, U, V, mean_int_dA, M_save;
@@ -11962,7 +12098,6 @@ void OmegaMaxEnt_data::minimize()
 	
 	mat Pw, zAz, SD;
 	vec c1w, c2w, grSw, Awt, Pdw, Lw, ASw, IPA(NwA), Dw;
-	double alphaD_max_IPA=1e5;
 	
 	int Nalpha_min=200;
 	
@@ -11989,9 +12124,9 @@ void OmegaMaxEnt_data::minimize()
 	}
 	*/
 	
-	if (!svd(U,sK,V,KG_V))
+	if (!svd_count(U,sK,V,KG_V))
 	{
-		if (!svd(U,sK,V,KG_V,"std"))
+		if (!svd_count(U,sK,V,KG_V,"std"))
 		{
 			cout<<"minimize(): svd error\n";
 			return;
@@ -12054,9 +12189,9 @@ void OmegaMaxEnt_data::minimize()
 		
 		KGMj=KGM*P;
 		
-		if (!svd(U,sK,V,KGMj))
+		if (!svd_count(U,sK,V,KGMj))
 		{
-			if (!svd(U,sK,V,KGMj,"std"))
+			if (!svd_count(U,sK,V,KGMj,"std"))
 			{
 				cout<<"minimize(): svd error\n";
 				return;
@@ -12122,9 +12257,9 @@ void OmegaMaxEnt_data::minimize()
 			}
 			*/
 			
-			if (!svd(U,sK,V,KGMj))
+			if (!svd_count(U,sK,V,KGMj))
 			{
-				if (!svd(U,sK,V,KGMj,"std"))
+				if (!svd_count(U,sK,V,KGMj,"std"))
 				{
 					cout<<"minimize(): svd error\n";
 					return;
@@ -12198,6 +12333,8 @@ void OmegaMaxEnt_data::minimize()
 			
 			iter_dA++;
 		}
+		newton_alpha.push_back(alpha);
+		newton_iterations.push_back(iter_dA);
 
 		if (mean_int_dA(0)>tol_int_dA2)
 		{
@@ -12240,11 +12377,20 @@ void OmegaMaxEnt_data::minimize()
 			S_vec(ind_alpha_vec)=-sum(A % dwS % logA)/(2*PI);
 			Aw_samp.row(ind_alpha_vec)=trans(A(w_sample_ind));
 			
-			if (print_alpha)
+			if ((print_alpha && !quiet_mode) || print_events)
 			{
 				Q=chi2(0)-alpha*S_vec(ind_alpha_vec);
-				sprintf(alpha_output,alpha_output_format,ind_alpha,alpha,Q,S_vec(ind_alpha_vec),chi2(0));
-				cout<<alpha_output;
+				if (print_alpha && !quiet_mode)
+				{
+					sprintf(alpha_output,alpha_output_format,ind_alpha,alpha,Q,S_vec(ind_alpha_vec),chi2(0));
+					cout<<alpha_output;
+				}
+				if (print_events)
+				{
+					ostringstream fields;
+					fields<<setprecision(10)<<"\"index\": "<<ind_alpha<<", \"alpha\": "<<alpha<<", \"Q\": "<<Q<<", \"S\": "<<S_vec(ind_alpha_vec)<<", \"chi2\": "<<chi2(0);
+					print_event("alpha",fields.str());
+				}
 			}
 			
 			if (compute_P_alpha_G)
@@ -12273,7 +12419,7 @@ void OmegaMaxEnt_data::minimize()
 //				Pw=diagmat(Pdw);
 //				KGMj=KGMw*Pw;
 				
-				if (!svd(U,sK,V,KGMj,"std"))
+				if (!svd_count(U,sK,V,KGMj,"std"))
 				{
 					cout<<"minimize(): svd error\n";
 					return;
@@ -12290,15 +12436,13 @@ void OmegaMaxEnt_data::minimize()
 				sK2.rows(0,sK.n_rows-1)=pow(sK,2);
 				Lw=sK2+1;
  
-//				for (i=0; i<NwA; i++)
-//				{
-//					if (alpha*Dw(i)/2>alphaD_max_IPA) IPA(i)=sqrt(2*PI/alpha);
-//					else IPA(i)=sqrt(Dw(i))*integrate_P_A_i_alpha(alpha*Dw(i)/2);
-//				}
+				//normalization of the entropic prior at each frequency, which reduces to sqrt(2*PI/alpha) when alpha*Dw(i) is large
+				for (i=0; i<NwA; i++)
+					IPA(i)=sqrt(Dw(i))*P_A_i_alpha_table(alpha*Dw(i)/2);
 				
-				log_P_alpha_G(ind_alpha_vec)=-chi2(0)/2+(alpha/2)*(S-SD(0))-sum(log(Lw))/2;
+//				log_P_alpha_G(ind_alpha_vec)=-chi2(0)/2+(alpha/2)*(S-SD(0))-sum(log(Lw))/2;
 //				log_P_alpha_G(ind_alpha_vec)=-chi2(0)/2-sum(log(Lw))/2;
-//				log_P_alpha_G(ind_alpha_vec)=-chi2(0)/2+(alpha/2)*(S-SD(0))-sum(log(Lw))/2 + (NwA/2)*(log(PI)-log(alpha/2))-sum(log(IPA));
+				log_P_alpha_G(ind_alpha_vec)=-chi2(0)/2+(alpha/2)*(S-SD(0))-sum(log(Lw))/2 + (NwA/2.0)*(log(PI)-log(alpha/2))-sum(log(IPA));
 				
 			//	log_P_alpha_G(ind_alpha_vec)=-chi2(0)/2-(alpha/4)*zAz(0)-sum(log(Lw))/2;
 			//	log_P_alpha_G(ind_alpha_vec)=-chi2(0)/2+ (alpha/2)*(S-SD(0)) +sum(log(exp(1)*AS/default_model))/2-sum(log(Lw))/2;
@@ -12342,14 +12486,18 @@ void OmegaMaxEnt_data::minimize()
 			
 			if (save_spec_func)
 			{
+				if (alpha_path.size()<=ind_alpha_vec) alpha_path.resize(ind_alpha_vec+1);
+				alpha_path_entry &entry=alpha_path[ind_alpha_vec];
+				entry.alpha=alpha;
+				entry.saved=false;
+				
 				M_save.zeros(Nw,2);
 				M_save.col(0)=w;
 				if (!boson || col_Gi>0)
 					M_save.submat(1,1,Nw-2,1)=A;
 				else
 					M_save.submat(0,1,Nw-2,1)=A;
-				sprintf(file_name,output_name_format.c_str(),tem,alpha);
-				M_save.save(file_name,raw_ascii);
+				entry.A=M_save;
 				
 				if (!boson || col_Gi>0)
 				{
@@ -12365,8 +12513,7 @@ void OmegaMaxEnt_data::minimize()
 					M_save.col(0)=wn;
 					M_save.col(1)=G_out;
 				}
-				sprintf(file_name,output_G_format.c_str(),tem,alpha);
-				M_save.save(file_name,raw_ascii);
+				entry.G=M_save;
 				
 				if (!boson || col_Gi>0)
 				{
@@ -12379,27 +12526,24 @@ void OmegaMaxEnt_data::minimize()
 					}
 					else
 					{
-						M_save.zeros(2*Nn,2);
+						M_save.zeros(errRe.n_rows,2);
 						M_save.col(0)=eigv_ind;
 						M_save.col(1)=errRe;
 					}
 				}
 				else
 				{
-					M_save.zeros(Nn,2);
+					M_save.zeros(errRe.n_rows,2);
 					M_save.col(0)=eigv_ind;
 					M_save.col(1)=errRe;
 				}
-				sprintf(file_name,output_error_format.c_str(),tem,alpha);
-				M_save.save(file_name,raw_ascii);
+				entry.err=M_save;
 				
 				if (NM>0)
 				{
-					sprintf(file_name,output_moments_format.c_str(),tem,alpha);
-					M_save.zeros(NM,2);
-					M_save.col(0)=M;
-					M_save.col(1)=M_out;
-					M_save.save(file_name,raw_ascii);
+					entry.moments.zeros(NM,2);
+					entry.moments.col(0)=M;
+					entry.moments.col(1)=M_out;
 				}
 			}
 			
@@ -12565,7 +12709,7 @@ void OmegaMaxEnt_data::minimize_increase_alpha()
 	double diff_chi2_min=1.0e-3;
 	double pow_alpha_step_max=pow_alpha_step_init;
 	
-	char alpha_output[100], file_name[200];
+	char alpha_output[100];
 	char alpha_output_format[]="%d \t alpha: % 1.4e,  Q: % 1.4e,  S: % 1.4e,  chi2: % 1.4e\n";
 	double mean_int_dA_prec, mean_int_dA_prec2, A1min, chi2prec, Q, S;
 	mat chi2, P, KGMj, U, V, mean_int_dA, M_save;
@@ -12590,7 +12734,7 @@ void OmegaMaxEnt_data::minimize_increase_alpha()
 	double rADchange=realmin;
 	vec Achange=rADchange*default_model;
 	
-	svd(U,sK,V,KG_V);
+	svd_count(U,sK,V,KG_V);
 	sK2.zeros();
 	sK2.rows(0,sK.n_rows-1)=pow(sK,2);
 	double alpha_c2_max=sK2.max()*rc2H;
@@ -12641,7 +12785,7 @@ void OmegaMaxEnt_data::minimize_increase_alpha()
 		P=diagmat(Pd);
 		
 		KGMj=KGM*P;
-		svd(U,sK,V,KGMj);
+		svd_count(U,sK,V,KGMj);
 		
 		B2=V.t()*(P*B);
 		sK2.zeros();
@@ -12684,7 +12828,7 @@ void OmegaMaxEnt_data::minimize_increase_alpha()
 			P=diagmat(Pd);
 			
 			KGMj=KGM*P;
-			svd(U,sK,V,KGMj);
+			svd_count(U,sK,V,KGMj);
 			
 			B2=V.t()*(P*B);
 			sK2.zeros();
@@ -12751,11 +12895,20 @@ void OmegaMaxEnt_data::minimize_increase_alpha()
 			S_vec(ind_alpha_vec)=-sum(A % dwS % logA)/(2*PI);
 			Aw_samp.row(ind_alpha_vec)=trans(A(w_sample_ind));
 			
-			if (print_alpha)
+			if ((print_alpha && !quiet_mode) || print_events)
 			{
 				Q=chi2(0)-alpha*S_vec(ind_alpha_vec);
-				sprintf(alpha_output,alpha_output_format,ind_alpha,alpha,Q,S_vec(ind_alpha_vec),chi2(0));
-				cout<<alpha_output;
+				if (print_alpha && !quiet_mode)
+				{
+					sprintf(alpha_output,alpha_output_format,ind_alpha,alpha,Q,S_vec(ind_alpha_vec),chi2(0));
+					cout<<alpha_output;
+				}
+				if (print_events)
+				{
+					ostringstream fields;
+					fields<<setprecision(10)<<"\"index\": "<<ind_alpha<<", \"alpha\": "<<alpha<<", \"Q\": "<<Q<<", \"S\": "<<S_vec(ind_alpha_vec)<<", \"chi2\": "<<chi2(0);
+					print_event("alpha",fields.str());
+				}
 			}
 			
 			G_out=K*A;
@@ -12794,6 +12947,10 @@ void OmegaMaxEnt_data::minimize_increase_alpha()
 			
 			if (save_spec_func)
 			{
+				if (alpha_path.size()<=ind_alpha_vec) alpha_path.resize(ind_alpha_vec+1);
+				alpha_path_entry &entry=alpha_path[ind_alpha_vec];
+				entry.alpha=alpha;
+				entry.saved=false;
 				
 				M_save.zeros(Nw,2);
 				M_save.col(0)=w;
@@ -12801,8 +12958,7 @@ void OmegaMaxEnt_data::minimize_increase_alpha()
 					M_save.submat(1,1,Nw-2,1)=A;
 				else
 					M_save.submat(0,1,Nw-2,1)=A;
-				sprintf(file_name,output_name_format.c_str(),tem,alpha);
-				M_save.save(file_name,raw_ascii);
+				entry.A=M_save;
 				
 				
 				if (!boson || col_Gi>0)
@@ -12819,8 +12975,7 @@ void OmegaMaxEnt_data::minimize_increase_alpha()
 					M_save.col(0)=wn;
 					M_save.col(1)=G_out;
 				}
-				sprintf(file_name,output_G_format.c_str(),tem,alpha);
-				M_save.save(file_name,raw_ascii);
+				entry.G=M_save;
 				
 				if (!boson || col_Gi>0)
 				{
@@ -12833,27 +12988,24 @@ void OmegaMaxEnt_data::minimize_increase_alpha()
 					}
 					else
 					{
-						M_save.zeros(2*Nn,2);
+						M_save.zeros(errRe.n_rows,2);
 						M_save.col(0)=eigv_ind;
 						M_save.col(1)=errRe;
 					}
 				}
 				else
 				{
-					M_save.zeros(Nn,2);
+					M_save.zeros(errRe.n_rows,2);
 					M_save.col(0)=eigv_ind;
 					M_save.col(1)=errRe;
 				}
-				sprintf(file_name,output_error_format.c_str(),tem,alpha);
-				M_save.save(file_name,raw_ascii);
+				entry.err=M_save;
 				
 				if (NM>0)
 				{
-					sprintf(file_name,output_moments_format.c_str(),tem,alpha);
-					M_save.zeros(NM,2);
-					M_save.col(0)=M;
-					M_save.col(1)=M_out;
-					M_save.save(file_name,raw_ascii);
+					entry.moments.zeros(NM,2);
+					entry.moments.col(0)=M;
+					entry.moments.col(1)=M_out;
 				}
 			}
 			
@@ -13000,6 +13152,8 @@ void OmegaMaxEnt_data::minimize_increase_alpha()
 
 bool OmegaMaxEnt_data::diagonalize_covariance()
 {
+	stage_timer timer(run_stages["preproc: covariance diagonalization"]);
+	
 	mat VM, WM, VG, WG;
 	
 	if (NM>0)
@@ -13091,19 +13245,21 @@ bool OmegaMaxEnt_data::diagonalize_covariance()
 	{
 		vec COVG_eig;
 		mat VGtmp;
-		if (!eig_sym(COVG_eig,VGtmp,COV))
+		if (!covariance_eig(COVG_eig,VGtmp))
 		{
 			cout<<"diagonalize_covariance() error: diagonalization of covariance matrix failed\n";
 			return false;
 		}
 //		cout<<"COVG_eig:\n"<<COVG_eig<<endl;
-		mat PV=eye<mat>(2*Nn,2*Nn);
+		int NV=COVG_eig.n_rows;
+		if (NV<2*Nn) cout<<"number of covariance eigenvalues discarded: "<<2*Nn-NV<<endl;
+		mat PV=eye<mat>(NV,NV);
 		PV=flipud(PV);
 		COVG_eig=flipud(COVG_eig);
 		VG=VGtmp*PV;
 		vec GVtmp=VG.t()*Gchi2;
 		mat SGV=diagmat(sign(GVtmp));
-		SGV=SGV-abs(SGV)+eye<mat>(2*Nn,2*Nn);
+		SGV=SGV-abs(SGV)+eye<mat>(NV,NV);
 		VG=VG*SGV;
 		WG=diagmat(1.0/sqrt(COVG_eig));
 		if (COVG_eig.min()<=0)
@@ -13136,6 +13292,8 @@ bool OmegaMaxEnt_data::diagonalize_covariance()
 
 bool OmegaMaxEnt_data::Kernel_G_fermions_grid_transf_omega()
 {
+	stage_timer timer(run_stages["preproc: kernel"]);
+	
 	bool use_HF_exp=true;
 	double fg=1.7;
 	int pngmax=100;
@@ -14164,6 +14322,8 @@ bool OmegaMaxEnt_data::Kernel_G_fermions_grid_transf_2()
 
 bool OmegaMaxEnt_data::Kernel_G_fermions_Riemann_integ()
 {
+	stage_timer timer(run_stages["preproc: kernel"]);
+	
 //	cout<<"defining kernel matrix...\n";
 	
 	int i,j;
@@ -14366,6 +14526,8 @@ bool OmegaMaxEnt_data::Kernel_G_fermions_Riemann_integ()
 
 bool OmegaMaxEnt_data::Kernel_G_fermions_grid_transf()
 {
+	stage_timer timer(run_stages["preproc: kernel"]);
+	
 	bool use_HF_exp=true;
 	double fg=1.7;
 	int pngmax=100;
@@ -15864,7 +16026,7 @@ double OmegaMaxEnt_data::spline_val_G_part(double x, vec &x0, uvec &ind_xlims, v
 	return sv;
 }
 
-bool OmegaMaxEnt_data::spline_val_G_part_grid_transf(vec x, vec x0, uvec ind_xlims, vec xs, vec coeffs, vec &sv)
+bool OmegaMaxEnt_data::spline_val_G_part_grid_transf(const vec &x, const vec &x0, const uvec &ind_xlims, const vec &xs, const vec &coeffs, vec &sv)
 {
 	int Nx=x.n_rows;
 	int Nx0=x0.n_rows;
@@ -15944,7 +16106,7 @@ bool OmegaMaxEnt_data::spline_val_G_part_grid_transf(vec x, vec x0, uvec ind_xli
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_val_G_part_grid_transf_1(vec x, vec x0, uvec ind_xlims, vec xs, vec coeffs, vec &sv)
+bool OmegaMaxEnt_data::spline_val_G_part_grid_transf_1(const vec &x, const vec &x0, const uvec &ind_xlims, const vec &xs, const vec &coeffs, vec &sv)
 {
 	int Nx=x.n_rows;
 	int Nx0=x0.n_rows;
@@ -16024,7 +16186,7 @@ bool OmegaMaxEnt_data::spline_val_G_part_grid_transf_1(vec x, vec x0, uvec ind_x
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_val_G_part(vec x, vec x0, uvec ind_xlims, vec xs, vec coeffs, vec &sv)
+bool OmegaMaxEnt_data::spline_val_G_part(const vec &x, const vec &x0, const uvec &ind_xlims, const vec &xs, const vec &coeffs, vec &sv)
 {
 	int Nx=x.n_rows;
 	int Nx0=x0.n_rows;
@@ -16101,7 +16263,7 @@ bool OmegaMaxEnt_data::spline_val_G_part(vec x, vec x0, uvec ind_xlims, vec xs,
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_G_omega_u(vec x, uvec ind_xlims, vec xs, vec F, vec &coeffs)
+bool OmegaMaxEnt_data::spline_G_omega_u(const vec &x, const uvec &ind_xlims, const vec &xs, const vec &F, vec &coeffs)
 {
 	int Nx=x.n_rows;
 	
@@ -16288,7 +16450,7 @@ bool OmegaMaxEnt_data::spline_G_omega_u(vec x, uvec ind_xlims, vec xs, vec F, ve
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_G_part(vec x, uvec ind_xlims, vec xs, vec F, vec &coeffs)
+bool OmegaMaxEnt_data::spline_G_part(const vec &x, const uvec &ind_xlims, const vec &xs, const vec &F, vec &coeffs)
 {
 	int Nx=x.n_rows;
 	
@@ -16568,7 +16730,7 @@ bool OmegaMaxEnt_data::spline_G_part(vec x, uvec ind_xlims, vec xs, vec F, vec &
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_val_grid_transf(vec x, vec x0, vec coeffs, vec &s)
+bool OmegaMaxEnt_data::spline_val_grid_transf(const vec &x, const vec &x0, const vec &coeffs, vec &s)
 {
 	int Nx=x.n_rows;
 	int Nx0=x0.n_rows;
@@ -16629,17 +16791,17 @@ bool OmegaMaxEnt_data::spline_val_grid_transf(vec x, vec x0, vec coeffs, vec &s)
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_matrix_grid_transf(vec w0, mat &M)
+bool OmegaMaxEnt_data::spline_matrix_grid_transf(const vec &w0, mat &M)
 {
 	int N=w0.n_rows;
 	vec D=1.0/(w0.rows(1,N-1)-w0.rows(0,N-2));
 	
 	int Nint=N-1;
 	
-	mat B=zeros<mat>(3*Nint-1,3*Nint-1);
+	band_matrix B(3*Nint-1,3,3);
 	//vec vTl(3*Nint-1), vTr(3*Nint-1);
 	mat Ps=zeros<mat>(3*Nint-1, N);
-	mat Pg=zeros<mat>(4*Nint,4*Nint-1);
+	sp_mat Pg(4*Nint,4*Nint-1);
 	
 	//double N1p5=pow(1.0*Nint,1.5), N0p5=pow(1.0*Nint,0.5), Nm0p5=pow(1.0*Nint,-0.5);
 	
@@ -16723,13 +16885,12 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf(vec w0, mat &M)
 //	mat Tl=diagmat(vTl);
 //	mat Tr=diagmat(vTr);
 	
-	mat IB=eye(3*Nint-1,3*Nint-1);
-	mat invB=solve(B,IB);
+	if (!B.solve(Ps)) return false;
 	
-	mat IA=eye(N,N);
-	mat PA=IA.submat(0,0,N-2,N-1);
+	mat PA=zeros<mat>(N-1,N);
+	PA.diag().ones();
 	
-	mat Lg=join_vert(invB*Ps,PA);
+	mat Lg=join_vert(Ps,PA);
 	
 //	mat Lg=join_vert(Tr*invB*Tl*Ps,PA);
 	
@@ -16738,7 +16899,7 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf(vec w0, mat &M)
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part_2(vec x, uvec ind_xlims, vec xs, mat &M)
+bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part_2(const vec &x, const uvec &ind_xlims, const vec &xs, mat &M)
 {
 	int Nx=x.n_rows;
 	
@@ -16755,9 +16916,9 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part_2(vec x, uvec ind_xlims,
 	vec RDg=((x.rows(2,ind_xlims(0))-x0g)/(x.rows(0,ind_xlims(0)-2)-x0g))%((x.rows(1,ind_xlims(0)-1)-x.rows(0,ind_xlims(0)-2))/(x.rows(2,ind_xlims(0))-x.rows(1,ind_xlims(0)-1)));
 	
 	int NCg=3*Ng-1;
-	mat B=zeros<mat>(NCg,NCg);
+	band_matrix B(NCg,3,3);
 	mat Ps=zeros<mat>(NCg, Nx);
-	mat Pg=zeros<mat>(4*Ng,4*Ng-1);
+	sp_mat Pg(4*Ng,4*Ng-1);
 	
 	B(0,0)=1;
 	B(0,1)=1;
@@ -16818,13 +16979,12 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part_2(vec x, uvec ind_xlims,
 	Pg(4*j+2,3*j+1)=1;
 	Pg(4*j+3,NCg+j)=1;
 	
-	mat IB=eye(NCg,NCg);
-	mat invB=solve(B,IB);
+	if (!B.solve(Ps)) return false;
 	
-	mat IA=eye(Nx,Nx);
-	mat PA=IA.submat(0,0,Ng-1,Nx-1);
+	mat PA=zeros<mat>(Ng,Nx);
+	PA.diag().ones();
 	
-	mat Lg=join_vert(invB*Ps,PA);
+	mat Lg=join_vert(Ps,PA);
 	
 	mat Mg=Pg*Lg;
 	
@@ -16835,7 +16995,7 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part_2(vec x, uvec ind_xlims,
 	
 	int NCc=3*Nc-1;
 	
-	B.zeros(NCc,NCc);
+	B.zeros(NCc);
 	Ps.zeros(NCc, Nx);
 	Pg.zeros(4*Nc,4*Nc);
 	
@@ -16900,12 +17060,12 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part_2(vec x, uvec ind_xlims,
 	Pg(4*j+2,3*j+1)=1;
 	Pg(4*j+3,NCc+j+1)=1;
 	
-	IB.eye(NCc,NCc);
-	invB=solve(B,IB);
+	if (!B.solve(Ps)) return false;
 	
-	PA=IA.submat(Ng-1,0,ind_xlims(1)-1,Nx-1);
+	PA.zeros(Nc+1,Nx);
+	PA.diag(Ng-1).ones();
 	
-	Lg=join_vert(invB*Ps,PA);
+	Lg=join_vert(Ps,PA);
 	
 	mat Mc=Pg*Lg;
 	
@@ -16917,7 +17077,7 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part_2(vec x, uvec ind_xlims,
 	
 	vec RDd=((x.rows(ind_xlims(1)+2,Nx-1)-x0d)/(x.rows(ind_xlims(1),Nx-3)-x0d))%((x.rows(ind_xlims(1),Nx-3)-x.rows(ind_xlims(1)+1,Nx-2))/(x.rows(ind_xlims(1)+1,Nx-2)-x.rows(ind_xlims(1)+2,Nx-1)));
 	
-	B.zeros(NCd,NCd);
+	B.zeros(NCd);
 	Ps.zeros(NCd, Nx);
 	Pg.zeros(4*Nd,4*Nd);
 	
@@ -16980,12 +17140,12 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part_2(vec x, uvec ind_xlims,
 	Pg(4*j+2,3*j+1)=1;
 	Pg(4*j+3,NCd+j+1)=1;
 	
-	IB.eye(NCd,NCd);
-	invB=solve(B,IB);
+	if (!B.solve(Ps)) return false;
 	
-	PA=IA.submat(ind_xlims(1)-1,0,Nx-2,Nx-1);
+	PA.zeros(Nd+1,Nx);
+	PA.diag(ind_xlims(1)-1).ones();
 	
-	Lg=join_vert(invB*Ps,PA);
+	Lg=join_vert(Ps,PA);
 	
 	mat Md=Pg*Lg;
 	
@@ -17052,12 +17212,12 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part_2(vec x, uvec ind_xlims,
 	Pg(4*j+1,3*j+1)=1;
 	Pg(4*j+3,NCd+j)=1;
 	 
-	IB.eye(NCd,NCd);
-	invB=solve(B,IB);
+	if (!B.solve(Ps)) return false;
 	
-	PA=IA.submat(ind_xlims(1)+1,0,Nx-1,Nx-1);
+	PA.zeros(Nd,Nx);
+	PA.diag(ind_xlims(1)+1).ones();
 	
-	Lg=join_vert(invB*Ps,PA);
+	Lg=join_vert(Ps,PA);
 	
 	mat Md=Pg*Lg;
 	*/
@@ -17068,7 +17228,88 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part_2(vec x, uvec ind_xlims,
 	return true;
 }
 
-void OmegaMaxEnt_data::convert_matrix_to_band_format(mat M, mat &Mbf, int KL, int KU)
+bool band_matrix::solve(mat &X)
+{
+	int NRHS=X.n_cols;
+	int LDAB=AB.n_rows;
+	int INFO;
+	int *IPIV=new int[N];
+	
+	dgbsv_(&N, &KL, &KU, &NRHS, AB.memptr(), &LDAB, IPIV, X.memptr(), &N, &INFO );
+	
+	delete [] IPIV;
+	
+	return (INFO==0);
+}
+
+bool window_cholesky::set(int r0_, int r1_)
+{
+	int n=r1-r0+1, j;
+	
+	//a new factorization is cheaper if the window does not move forward or moves by more than half its size
+	if (n<=0 || r0_<r0 || r1_<r1 || r0_>r1 || 2*((r0_-r0)+(r1_-r1))>n)
+	{
+		r0=r0_;
+		r1=r1_;
+		if (!chol(L,C.submat(r0,r0,r1,r1),"lower"))
+		{
+			r1=r0-1;
+			return false;
+		}
+		return true;
+	}
+	
+	vec x;
+	double r, c, s;
+	int k;
+	//removal of the first row and column: the block C(2:n,2:n) is L(2:n,2:n)*L(2:n,2:n)^T+x*x^T, with x=L(2:n,1)
+	for (; r0<r0_; r0++)
+	{
+		x=L.col(0).rows(1,n-1);
+		L=L.submat(1,1,n-1,n-1);
+		n--;
+		for (k=0; k<n; k++)
+		{
+			r=sqrt(L(k,k)*L(k,k)+x(k)*x(k));
+			c=r/L(k,k);
+			s=x(k)/L(k,k);
+			L(k,k)=r;
+			if (k<n-1)
+			{
+				L.col(k).rows(k+1,n-1)=(L.col(k).rows(k+1,n-1)+s*x.rows(k+1,n-1))/c;
+				x.rows(k+1,n-1)=c*x.rows(k+1,n-1)-s*L.col(k).rows(k+1,n-1);
+			}
+		}
+	}
+	
+	//addition of a row and a column: L(n+1,1:n)=(L^-1*C(1:n,n+1))^T
+	vec y;
+	double d;
+	for (j=r1+1; j<=r1_; j++)
+	{
+		y=solve(trimatl(L),C.col(j).rows(r0,j-1));
+		d=C(j,j)-dot(y,y);
+		if (d<=0)
+		{
+			r1=r0-1;
+			return false;
+		}
+		L.resize(n+1,n+1);
+		L.row(n).cols(0,n-1)=y.t();
+		L(n,n)=sqrt(d);
+		n++;
+	}
+	r1=r1_;
+	
+	return true;
+}
+
+void window_cholesky::solve_L(mat &X) const
+{
+	X=solve(trimatl(L),X);
+}
+
+void OmegaMaxEnt_data::convert_matrix_to_band_format(const mat &M, mat &Mbf, int KL, int KU)
 {
 	int N=M.n_rows;
 	int ind_d;
@@ -17083,7 +17324,7 @@ void OmegaMaxEnt_data::convert_matrix_to_band_format(mat M, mat &Mbf, int KL, in
 	}
 }
 
-bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part(vec x, uvec ind_xlims, vec xs, mat &M)
+bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part(const vec &x, const uvec &ind_xlims, const vec &xs, mat &M)
 {
 	int Nx=x.n_rows;
 	
@@ -17100,9 +17341,9 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part(vec x, uvec ind_xlims, v
 	vec RDg=((x.rows(2,ind_xlims(0))-x0g)/(x.rows(0,ind_xlims(0)-2)-x0g))%((x.rows(1,ind_xlims(0)-1)-x.rows(0,ind_xlims(0)-2))/(x.rows(2,ind_xlims(0))-x.rows(1,ind_xlims(0)-1)));
 	
 	int NCg=3*Ng-1;
-	mat B=zeros<mat>(NCg,NCg);
+	band_matrix B(NCg,3,3);
 	mat Ps=zeros<mat>(NCg, Nx);
-	mat Pg=zeros<mat>(4*Ng,4*Ng-1);
+	sp_mat Pg(4*Ng,4*Ng-1);
 	
 	B(0,0)=1;
 	B(0,1)=1;
@@ -17163,32 +17404,12 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part(vec x, uvec ind_xlims, v
 	Pg(4*j+2,3*j+1)=1;
 	Pg(4*j+3,NCg+j)=1;
 	
-	mat IB=eye(NCg,NCg);
-	
-/*
-	int N=NCg;
-	int INFO;
-	int *IPIV=new int[N];
-	int KD=3;
-	
-	mat invB=IB;
-	int Nbf=3*KD+1;
-	mat Bbf(Nbf,N);
-	convert_matrix_to_band_format(B, Bbf, KD, KD);
-
-	dgbsv_(&N, &KD, &KD, &N, Bbf.memptr(), &Nbf, IPIV, invB.memptr(), &N, &INFO );
-	
-	delete [] IPIV;
-*/
+	if (!B.solve(Ps)) return false;
 	
-//	mat invB2=solve(B,IB);
-//	cout<<"max(|invB-invB2|): "<<max(max(abs(invB-invB2)))<<endl;
-	mat invB=solve(B,IB);
+	mat PA=zeros<mat>(Ng,Nx);
+	PA.diag().ones();
 	
-	mat IA=eye(Nx,Nx);
-	mat PA=IA.submat(0,0,Ng-1,Nx-1);
-	
-	mat Lg=join_vert(invB*Ps,PA);
+	mat Lg=join_vert(Ps,PA);
 	
 	mat Mg=Pg*Lg;
 	
@@ -17199,7 +17420,7 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part(vec x, uvec ind_xlims, v
 	
 	int NCc=3*Nc-1;
 	
-	B.zeros(NCc,NCc);
+	B.zeros(NCc);
 	Ps.zeros(NCc, Nx);
 	Pg.zeros(4*Nc,4*Nc);
 	
@@ -17264,26 +17485,12 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part(vec x, uvec ind_xlims, v
 	Pg(4*j+2,3*j+1)=1;
 	Pg(4*j+3,NCc+j+1)=1;
 	
-	IB.eye(NCc,NCc);
-/*
-	N=NCc;
-	IPIV=new int[N];
-	invB=IB;
-	
-	Bbf.zeros(Nbf,N);
-	convert_matrix_to_band_format(B, Bbf, KD, KD);
-	
-	dgbsv_(&N, &KD, &KD, &N, Bbf.memptr(), &Nbf, IPIV, invB.memptr(), &N, &INFO );
+	if (!B.solve(Ps)) return false;
 	
-	delete [] IPIV;
-*/
-//	mat invB2=solve(B,IB);
-//	cout<<"max(|invB-invB2|): "<<max(max(abs(invB-invB2)))<<endl;
-	invB=solve(B,IB);
+	PA.zeros(Nc+1,Nx);
+	PA.diag(Ng-1).ones();
 	
-	PA=IA.submat(Ng-1,0,ind_xlims(1)-1,Nx-1);
-	
-	Lg=join_vert(invB*Ps,PA);
+	Lg=join_vert(Ps,PA);
 	
 	mat Mc=Pg*Lg;
 	
@@ -17295,7 +17502,7 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part(vec x, uvec ind_xlims, v
 	
 	double fdAd=((x(ind_xlims(1))-x0d)/(x(ind_xlims(1)+1)-x0d))*((x(ind_xlims(1))-x(ind_xlims(1)+1))/(x(ind_xlims(1)+1)-x(ind_xlims(1)-1)));
 	
-	B.zeros(NCd,NCd);
+	B.zeros(NCd);
 	Ps.zeros(NCd, Nx);
 	Pg.zeros(4*Nd,4*Nd-1);
 	
@@ -17359,26 +17566,12 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part(vec x, uvec ind_xlims, v
 	Pg(4*j+1,3*j+1)=1;
 	Pg(4*j+3,NCd+j)=1;
 	
-	IB.eye(NCd,NCd);
-/*
-	N=NCd;
-	IPIV=new int[N];
-	invB=IB;
-	
-	Bbf.zeros(Nbf,N);
-	convert_matrix_to_band_format(B, Bbf, KD, KD);
-	
-	dgbsv_(&N, &KD, &KD, &N, Bbf.memptr(), &Nbf, IPIV, invB.memptr(), &N, &INFO );
-	
-	delete [] IPIV;
-*/
-//	mat invB2=solve(B,IB);
-//	cout<<"max(|invB-invB2|): "<<max(max(abs(invB-invB2)))<<endl;
-	invB=solve(B,IB);
+	if (!B.solve(Ps)) return false;
 	
-	PA=IA.submat(ind_xlims(1)+1,0,Nx-1,Nx-1);
+	PA.zeros(Nd,Nx);
+	PA.diag(ind_xlims(1)+1).ones();
 	
-	Lg=join_vert(invB*Ps,PA);
+	Lg=join_vert(Ps,PA);
 	
 	mat Md=Pg*Lg;
 	
@@ -17388,7 +17581,7 @@ bool OmegaMaxEnt_data::spline_matrix_grid_transf_G_part(vec x, uvec ind_xlims, v
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &Mspl)
+bool OmegaMaxEnt_data::spline_matrix_G_part(const vec &x, const uvec &ind_xlims, const vec &xs, mat &Mspl)
 {
 	int Nx=x.n_rows;
 	
@@ -17402,7 +17595,7 @@ bool OmegaMaxEnt_data::spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &
 	
 	//	 solve the spline in the interval -inf,wl]
 	int NSg=3*Ng-1;
-	mat Aspl=zeros<mat>(NSg,NSg);
+	band_matrix Aspl(NSg,3,3);
 	
 	// Dg=zeros(NSg,1);
 	// Dg(1)=S(1);
@@ -17455,11 +17648,6 @@ bool OmegaMaxEnt_data::spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &
 	//Dg(3*j-1)=(S(j+1)-S(j-1))/(x(j+1)-x(j-1));
 	//Cg=Ag\Dg;
 	
-	mat D(NSg,NSg);
-	D.eye();
-	
-	mat Cg=solve(Aspl,D);
-	
 	mat T(NSg,Nx);
 	T.zeros();
 	T(0,0)=1;
@@ -17471,11 +17659,12 @@ bool OmegaMaxEnt_data::spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &
 	T(3*Ng-2,Ng-2)=-1/(x(Ng)-x(Ng-2));
 	T(3*Ng-2,Ng)=1/(x(Ng)-x(Ng-2));
 	
-	Cg=Cg*T;
+	mat Cg=T;
+	if (!Aspl.solve(Cg)) return false;
 	
 	//solve the spline in the interval [wl,wr]
 	int NSc=3*Nc-1;
-	Aspl.zeros(NSc,NSc);
+	Aspl.zeros(NSc);
 	
 	//Dc=zeros(NSc,1);
 	//Dc(1)=S(Ng+1)-(x(Ng+1)-x(Ng))*(S(Ng+1)-S(Ng-1))/(x(Ng+1)-x(Ng-1))-S(Ng);
@@ -17529,9 +17718,6 @@ bool OmegaMaxEnt_data::spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &
 	
 	//Cc=A\Dc;
 	
-	D.eye(NSc,NSc);
-	mat Cc=solve(Aspl,D);
-	
 	T.zeros(NSc,Nx);
 	T(0,Ng-2)=(x(Ng)-x(Ng-1))/(x(Ng)-x(Ng-2));
 	T(0,Ng-1)=-1;
@@ -17546,7 +17732,8 @@ bool OmegaMaxEnt_data::spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &
 	T(3*Nc-2,ind_xlims(1)-1)=-1/(x(ind_xlims(1)+1)-x(ind_xlims(1)-1));
 	T(3*Nc-2,ind_xlims(1)+1)=1/(x(ind_xlims(1)+1)-x(ind_xlims(1)-1));
 	
-	Cc=Cc*T;
+	mat Cc=T;
+	if (!Aspl.solve(Cc)) return false;
 	
 	mat Cc2(NSc+1,Nx);
 	Cc2.zeros();
@@ -17558,7 +17745,7 @@ bool OmegaMaxEnt_data::spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &
 	
 	//solve the spline in the interval [wr,inf
 	int NSd=3*Nd-1;
-	Aspl.zeros(NSd,NSd);
+	Aspl.zeros(NSd);
 	//Dd=zeros(NSd,1);
 	
 	u=1/(x(ind_xlims(1))-x0d)-1/(x(ind_xlims(1)+1)-x0d);
@@ -17610,9 +17797,6 @@ bool OmegaMaxEnt_data::spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &
 	
 	//Cd=A\Dd;
 	
-	D.eye(NSd,NSd);
-	mat Cd=solve(Aspl,D);
-	
 	T.zeros(NSd,Nx);
 	T(0,ind_xlims(1)-1)=-1/(x(ind_xlims(1)+1)-x(ind_xlims(1)-1));
 	T(0,ind_xlims(1)+1)=1/(x(ind_xlims(1)+1)-x(ind_xlims(1)-1));
@@ -17624,7 +17808,8 @@ bool OmegaMaxEnt_data::spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &
 	j=Nd;
 	T(3*j-2,ind_xlims(1)+j-1)=1;
 	
-	Cd=Cd*T;
+	mat Cd=T;
+	if (!Aspl.solve(Cd)) return false;
 	
 	int NS_tot=NSg+NSc+NSd+1;
 	
@@ -17638,6 +17823,8 @@ bool OmegaMaxEnt_data::spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &
 
 bool OmegaMaxEnt_data::set_default_model()
 {
+	stage_timer timer(run_stages["preproc: default model"]);
+	
 	if (def_model_file.size())
 	{
 		cout<<"default model provided\n";
@@ -18051,7 +18238,7 @@ bool OmegaMaxEnt_data::set_default_model()
 	return true;
 }
 
-bool OmegaMaxEnt_data::general_normal(vec x, double x0, double s0, double p, vec &F)
+bool OmegaMaxEnt_data::general_normal(const vec &x, double x0, double s0, double p, vec &F)
 {
 	if (p<=0 || s0<=0)
 	{
@@ -18062,30 +18249,13 @@ bool OmegaMaxEnt_data::general_normal(vec x, double x0, double s0, double p, vec
 		return false;
 	}
 	
-	F=2*PI*p*exp(-pow(abs((x-x0)/s0),p))/(2*s0*tgamma(1.0/p));
+	//the integral of exp(-|x/s0|^p) is 2*s0*Gamma(1+1/p)
+	F=exp(-pow(abs(x-x0)/s0,p))*(PI/(s0*tgamma(1.0+1.0/p)));
 	
 	return true;
 }
 
-double OmegaMaxEnt_data::general_normal_val(double x, void *par[])
-{
-	double *x0=reinterpret_cast<double*>(par[0]);
-	double *s0=reinterpret_cast<double*>(par[1]);
-	double *p=reinterpret_cast<double*>(par[2]);
-	
-	if (p[0]<=0 || s0[0]<=0)
-	{
-		if (p[0]<0)
-			cout<<"general_normal(): power must be greater than 0\n";
-		else
-			cout<<"general_normal(): width must be greater than 0\n";
-		return false;
-	}
-	
-	return 2*PI*p[0]*exp(-pow(abs((x-x0[0])/s0[0]),p[0]))/(2*s0[0]*tgamma(1.0/p[0]));
-}
-
-bool OmegaMaxEnt_data::sum_gaussians(vec x, rowvec x0, rowvec s0, rowvec wgt, vec &F)
+bool OmegaMaxEnt_data::sum_gaussians(const vec &x, const rowvec &x0, const rowvec &s0, const rowvec &wgt, vec &F)
 {
 	int Nx=x.n_rows;
 	int Np=x0.n_cols;
@@ -18102,16 +18272,16 @@ bool OmegaMaxEnt_data::sum_gaussians(vec x, rowvec x0, rowvec s0, rowvec wgt, ve
 
 	for (int j=0; j<Np; j++)
 	{
-		F=F+wgt(j)*exp(-pow(x-x0(j),2)/(2*pow(s0(j),2)))/s0(j);
+		F+=(wgt(j)/s0(j))*exp(square(x-x0(j))*(-0.5/(s0(j)*s0(j))));
 		wgtTot=wgtTot+wgt(j);
 	}
 
-	F=sqrt(2.0*PI)*F/wgtTot;
+	F*=sqrt(2.0*PI)/wgtTot;
 	
 	return true;
 }
 
-bool OmegaMaxEnt_data::default_model_val_G(vec x, vec x0, vec coeffs, vec gaussians_params, vec &dm)
+bool OmegaMaxEnt_data::default_model_val_G(const vec &x, const vec &x0, const vec &coeffs, const vec &gaussians_params, vec &dm)
 {
 	int Nx=x.n_rows;
 	int Nx0=x0.n_rows;
@@ -18160,7 +18330,7 @@ bool OmegaMaxEnt_data::default_model_val_G(vec x, vec x0, vec coeffs, vec gaussi
 	return true;
 }
 
-bool OmegaMaxEnt_data::spline_val(vec x, vec x0, vec coeffs, vec &s)
+bool OmegaMaxEnt_data::spline_val(const vec &x, const vec &x0, const vec &coeffs, vec &s)
 {
 	double tol_dx=1e-6;
 	
@@ -18177,71 +18347,35 @@ bool OmegaMaxEnt_data::spline_val(vec x, vec x0, vec coeffs, vec &s)
 
 	s.zeros(Nx);
 	
-	double a, b, c, d, Dx;
+	const double *x0_int=x0.memptr()+1;
+	double Dx;
 
 	int j, l;
 	for (j=0; j<Nx; j++)
 	{
 		if (x(j)>=x0(0) && x(j)<x0(Nx0-1))
 		{
-			l=0;
-			while ( x(j)>=x0(l+1) && l<Ns-1) l++;
-			a=coeffs(4*l);
-			b=coeffs(4*l+1);
-			c=coeffs(4*l+2);
-			d=coeffs(4*l+3);
-			
-			Dx=x(j)-x0(l);
-			s(j)=a*pow(Dx,3)+b*pow(Dx,2)+c*Dx+d;
+			//index of the interval containing x(j), by bisection in the interior points of x0
+			l=std::upper_bound(x0_int, x0_int+Ns-1, x(j))-x0_int;
 		}
 		else if (x(j)==x0(Nx0-1))
 		{
 			if (coeffs.n_rows>Nc)
 			{
 				s(j)=coeffs[Nc];
+				continue;
 			}
-			else
-			{
-				l=Ns-1;
-				a=coeffs(4*l);
-				b=coeffs(4*l+1);
-				c=coeffs(4*l+2);
-				d=coeffs(4*l+3);
-				
-				Dx=x(j)-x0(l);
-				s(j)=a*pow(Dx,3)+b*pow(Dx,2)+c*Dx+d;
-			}
+			l=Ns-1;
 		}
 		else if (fabs(x(j)-x0(0))<tol_dx*(x0(1)-x0(0)))
-		{
 			l=0;
-			a=coeffs(4*l);
-			b=coeffs(4*l+1);
-			c=coeffs(4*l+2);
-			d=coeffs(4*l+3);
-			
-			Dx=x(j)-x0(l);
-			s(j)=a*pow(Dx,3)+b*pow(Dx,2)+c*Dx+d;
-		}
 		else if (fabs(x(j)-x0(Nx0-1))<tol_dx*(x0(Nx0-1)-x0(Nx0-2)))
-		{
 			l=Ns-1;
-			a=coeffs(4*l);
-			b=coeffs(4*l+1);
-			c=coeffs(4*l+2);
-			d=coeffs(4*l+3);
-			
-			Dx=x(j)-x0(l);
-			s(j)=a*pow(Dx,3)+b*pow(Dx,2)+c*Dx+d;
-		}
-/*
 		else
-		{
-			cout<<"spline_val() warning: x="<<x(j)<<" outside the boundaries of the spline\n";
-		//	cout<<"spline_val(): the provided position vector has a value outside the boundaries of the spline.\n";
-		//	return false;
-		}
-*/
+			continue;
+		
+		Dx=x(j)-x0(l);
+		s(j)=((coeffs(4*l)*Dx+coeffs(4*l+1))*Dx+coeffs(4*l+2))*Dx+coeffs(4*l+3);
 	}
 	
 	return true;
@@ -18361,7 +18495,7 @@ void OmegaMaxEnt_data::spline_matrix(double *x0, int N0, mat &MS)
 //!upon entry, coeffs[0] and coeffs[1] must contain the derivatives of V(x) at x0[0] and x[N0-1],
 //!upon exit, the form of coeffs is {a_0, b_0, c_0, d_0, ... a_(N0-2), b_(N0-2), c_(N0-2), d_(N0-2)}.
 //!the spline values are given by S_i(x)=a_i(x-x0[i])^3+b_i(x-x0[i])^2+c_i(x-x0[i])+d_i
-void OmegaMaxEnt_data::spline_coeffs(double *x0, double *V, int N0, double *coeffs)
+void OmegaMaxEnt_data::spline_coeffs(const double *x0, const double *V, int N0, double *coeffs)
 {
 	int j;
 	
@@ -18581,6 +18715,8 @@ bool OmegaMaxEnt_data::truncate_G_omega_n()
 
 bool OmegaMaxEnt_data::set_omega_grid()
 {
+	stage_timer timer(run_stages["preproc: grid"]);
+	
 	if (!SC_set || !SW_set)
 	{
 		cout<<"set_omega_grid() error: SW or SC undefined\n";
@@ -18829,6 +18965,8 @@ double OmegaMaxEnt_data::diff_gaussian(double x, double par[])
 
 bool OmegaMaxEnt_data::set_wc()
 {
+	stage_timer timer(run_stages["preproc: grid"]);
+	
 	cout<<"definition of real frequency grid...\n";
 	
 	bool use_nu_grid=false;
@@ -19313,7 +19451,7 @@ bool OmegaMaxEnt_data::non_uniform_frequency_grid(rowvec w_steps, rowvec wlims,
 }
 */
 
-bool OmegaMaxEnt_data::non_uniform_frequency_grid(rowvec w_steps, rowvec wlims, double w0, vec R, vec &grid)
+bool OmegaMaxEnt_data::non_uniform_frequency_grid(const rowvec &w_steps, const rowvec &wlims, double w0, const vec &R, vec &grid)
 {
 	bool ordered=true, grid_set=true;
 	
@@ -19346,7 +19484,7 @@ bool OmegaMaxEnt_data::non_uniform_frequency_grid(rowvec w_steps, rowvec wlims,
 		int max_grid_size=ceil((wlims(Nlims-1)-wlims(0))/w_steps.min());
 		int j0, k, l, Nm, Np;
 		double dwtmp;
-		double *D=new double[Ndw];
+		double *invD=new double[Ndw];
 		double *wc_j=new double[Ndw];
 		int kmax, kmin;
 		
@@ -19361,7 +19499,7 @@ bool OmegaMaxEnt_data::non_uniform_frequency_grid(rowvec w_steps, rowvec wlims,
 			
 			for (j=0; j<Ndw-1; j++)
 			{
-				D[j]=(wlims(j+2)-wlims(j))/(RW*RWD);
+				invD[j]=(RW*RWD)/(wlims(j+2)-wlims(j));
 				wc_j[j]=wlims(j+1)+(wlims(j+2)-2*wlims(j+1)+wlims(j))/(2*RW);
 			}
 			
@@ -19376,7 +19514,7 @@ bool OmegaMaxEnt_data::non_uniform_frequency_grid(rowvec w_steps, rowvec wlims,
 					dwtmp=w_steps(kmax);
 					for (k=kmax-1; k>=kmin; k--)
 					{
-						dwtmp+=(w_steps(k)-w_steps(k+1))/(exp((wp(l)-wc_j[k])/D[k])+1.0);
+						dwtmp+=(w_steps(k)-w_steps(k+1))/(exp((wp(l)-wc_j[k])*invD[k])+1.0);
 					}
 					wp(l+1)=wp(l)+dwtmp;
 					l=l+1;
@@ -19398,7 +19536,7 @@ bool OmegaMaxEnt_data::non_uniform_frequency_grid(rowvec w_steps, rowvec wlims,
 					dwtmp=w_steps(kmax);
 					for (k=kmax-1; k>=kmin; k--)
 					{
-						dwtmp+=(w_steps(k)-w_steps(k+1))/(exp((wm(l)-wc_j[k])/D[k])+1.0);
+						dwtmp+=(w_steps(k)-w_steps(k+1))/(exp((wm(l)-wc_j[k])*invD[k])+1.0);
 					}
 					wm(l+1)=wm(l)-dwtmp;
 					l=l+1;
@@ -19418,7 +19556,7 @@ bool OmegaMaxEnt_data::non_uniform_frequency_grid(rowvec w_steps, rowvec wlims,
 			
 			for (j=0; j<Ndw-1; j++)
 			{
-				D[j]=(wlims(j+2)-wlims(j))/(RW*RWD);
+				invD[j]=(RW*RWD)/(wlims(j+2)-wlims(j));
 				wc_j[j]=wlims(j+1)+(wlims(j+2)-2*wlims(j+1)+wlims(j))/(2*RW);
 			}
 			
@@ -19433,7 +19571,7 @@ bool OmegaMaxEnt_data::non_uniform_frequency_grid(rowvec w_steps, rowvec wlims,
 					dwtmp=w_steps(kmax);
 					for (k=kmax-1; k>=kmin; k--)
 					{
-						dwtmp+=(w_steps(k)-w_steps(k+1))/(exp((wp(l)-wc_j[k])/D[k])+1.0);
+						dwtmp+=(w_steps(k)-w_steps(k+1))/(exp((wp(l)-wc_j[k])*invD[k])+1.0);
 					}
 					wp(l+1)=wp(l)+dwtmp;
 					l=l+1;
@@ -19459,7 +19597,7 @@ bool OmegaMaxEnt_data::non_uniform_frequency_grid(rowvec w_steps, rowvec wlims,
 					dwtmp=w_steps(kmax);
 					for (k=kmax-1; k>=kmin; k--)
 					{
-						dwtmp+=(w_steps(k)-w_steps(k+1))/(exp((wm(l)-wc_j[k])/D[k])+1.0);
+						dwtmp+=(w_steps(k)-w_steps(k+1))/(exp((wm(l)-wc_j[k])*invD[k])+1.0);
 					}
 					wm(l+1)=wm(l)-dwtmp;
 					l=l+1;
@@ -19473,6 +19611,9 @@ bool OmegaMaxEnt_data::non_uniform_frequency_grid(rowvec w_steps, rowvec wlims,
 			cout<<"grid origin is outside grid boundaries\n";
 			grid_set=false;
 		}
+		
+		delete [] invD;
+		delete [] wc_j;
 	}
 	else
 	{
@@ -19945,7 +20086,7 @@ bool OmegaMaxEnt_data::test_low_energy_peak_fermions()
 				Gtmp=Gchi2.rows(2*p0(q)-2,2*(Nfit+p0(q))-3);
 				CG=COV.submat(2*p0(q)-2,2*p0(q)-2,2*(Nfit+p0(q))-3,2*(Nfit+p0(q))-3);
 				
-				invCG=inv(CG);
+				invCG=covariance_inverse(CG);
 				//	invCG=inv_sympd(CG);
 				AM=(X.t())*invCG*X;
 				BM=(X.t())*invCG*Gtmp;
@@ -20674,6 +20815,8 @@ bool OmegaMaxEnt_data::test_low_energy_peak_fermions()
 
 bool OmegaMaxEnt_data::compute_moments_omega_n_2()
 {
+	stage_timer timer(run_stages["preproc: moments"]);
+	
 	int j, NC=3;
 	bool sol_found;
 	
@@ -20738,6 +20881,12 @@ bool OmegaMaxEnt_data::compute_moments_omega_n_2()
 	
 	if (jfitmax<jfitmin) return false;
 	
+	// inverse of the covariance of each frequency, if the errors at different frequencies are independent
+	mat invCOV_blocks;
+	COV_block_diag_inverse(2, invCOV_blocks);
+	// otherwise, Cholesky factor of the covariance of the current fit window, updated from one window to the next
+	window_cholesky LC(COV);
+	
 	//	mat LC, invLC;
 	for (jfit=jfitmin; jfit<=jfitmax; jfit++)
 	{
@@ -20763,19 +20912,7 @@ bool OmegaMaxEnt_data::compute_moments_omega_n_2()
 			}
 		}
 		
-		CG=COV.submat(2*jfit-2,2*jfit-2,2*(jfit+Nfit-1)-1,2*(jfit+Nfit-1)-1);
-		
-		//		if (jfit==jfitmin) cout<<CG.submat(0,0,10,10);
-		
-		//		LC=chol(CG);
-		//		invLC=inv(LC);
-		//		invCG=invLC*invLC.t();
-		
-		invCG=inv(CG);
-		//	invCG=inv_sympd(CG);
-		A=trans(X)*invCG*X;
-		A=0.5*(A+A.t());
-		Mtmp=trans(X)*invCG*Gchi2.rows(2*jfit-2,2*(jfit+Nfit-1)-1);
+		fit_normal_equations(X, Gchi2, 2*jfit-2, invCOV_blocks, LC, A, Mtmp);
 		
 		//		dposv_(&UPLO, &NA, &NRHS, A.memptr(), &NA, Mtmp.memptr(), &NA, &INFO);
 		Mtmp=solve(A,Mtmp);
@@ -20937,16 +21074,7 @@ bool OmegaMaxEnt_data::compute_moments_omega_n_2()
 		}
 	}
 	
-	CG=COV.submat(2*jfit-2,2*jfit-2,2*(jfit+Nfit-1)-1,2*(jfit+Nfit-1)-1);
-	
-	//	LC=chol(CG);
-	//	invLC=inv(LC);
-	//	invCG=invLC*invLC.t();
-	
-	invCG=inv(CG);
-	//	invCG=inv_sympd(CG);
-	A=trans(X)*invCG*X;
-	A=0.5*(A+A.t());
+	fit_normal_equations(X, Gchi2, 2*jfit-2, invCOV_blocks, LC, A, Mtmp);
 	mat COVMtmp=inv(A);
 	COVMfit=COVMtmp.submat(0,0,3,3);
 	
@@ -21346,8 +21474,72 @@ bool OmegaMaxEnt_data::compute_moments_omega_n_2()
 	return true;
 }
 
+bool OmegaMaxEnt_data::COV_block_diag_inverse(int bs, mat &invCOV_blocks)
+{
+	int N=COV.n_rows, j, k;
+	
+	invCOV_blocks.reset();
+	if (N%bs) return false;
+	
+	for (j=0; j<N; j++)
+	{
+		k=j-j%bs;
+		if (k>0 && any(COV.col(j).rows(0,k-1))) return false;
+		if (k+bs<N && any(COV.col(j).rows(k+bs,N-1))) return false;
+	}
+	
+	mat invCOV_tmp(bs,N), invCb;
+	for (k=0; k<N; k+=bs)
+	{
+		if (R_cov_eig_min>0)
+			invCb=covariance_inverse(COV.submat(k,k,k+bs-1,k+bs-1));
+		else if (!inv(invCb,COV.submat(k,k,k+bs-1,k+bs-1)))
+			return false;
+		invCOV_tmp.cols(k,k+bs-1)=invCb;
+	}
+	invCOV_blocks=invCOV_tmp;
+	
+	return true;
+}
+
+void OmegaMaxEnt_data::fit_normal_equations(const mat &X, const vec &Y, int r0, const mat &invCOV_blocks, window_cholesky &LC, mat &A, vec &B)
+{
+	int r1=r0+X.n_rows-1;
+	
+	if (invCOV_blocks.n_elem)
+	{
+		int bs=invCOV_blocks.n_rows, k;
+		mat WX(X.n_rows,X.n_cols);
+		vec WY(X.n_rows);
+		for (k=0; k<X.n_rows; k+=bs)
+		{
+			WX.rows(k,k+bs-1)=invCOV_blocks.cols(r0+k,r0+k+bs-1)*X.rows(k,k+bs-1);
+			WY.rows(k,k+bs-1)=invCOV_blocks.cols(r0+k,r0+k+bs-1)*Y.rows(r0+k,r0+k+bs-1);
+		}
+		A=trans(X)*WX;
+		B=trans(X)*WY;
+	}
+	else if (R_cov_eig_min<=0 && LC.set(r0,r1))
+	{
+		mat LX=X, LY=Y.rows(r0,r1);
+		LC.solve_L(LX);
+		LC.solve_L(LY);
+		A=trans(LX)*LX;
+		B=trans(LX)*LY;
+	}
+	else
+	{
+		mat invCG=covariance_inverse(LC.matrix().submat(r0,r0,r1,r1));
+		A=trans(X)*invCG*X;
+		B=trans(X)*invCG*Y.rows(r0,r1);
+	}
+	A=0.5*(A+A.t());
+}
+
 bool OmegaMaxEnt_data::compute_moments_omega_n()
 {
+	stage_timer timer(run_stages["preproc: moments"]);
+	
 	int j, NC=3;
 	bool sol_found;
 	
@@ -21403,6 +21595,12 @@ bool OmegaMaxEnt_data::compute_moments_omega_n()
 	
 	if (jfitmax<jfitmin) return false;
 	
+	// inverse of the covariance of each frequency, if the errors at different frequencies are independent
+	mat invCOV_blocks;
+	COV_block_diag_inverse(2, invCOV_blocks);
+	// otherwise, Cholesky factor of the covariance of the current fit window, updated from one window to the next
+	window_cholesky LC(COV);
+	
 //	mat LC, invLC;
 	for (jfit=jfitmin; jfit<=jfitmax; jfit++)
 	{
@@ -21421,19 +21619,7 @@ bool OmegaMaxEnt_data::compute_moments_omega_n()
 			}
 		}
 		
-		CG=COV.submat(2*jfit-2,2*jfit-2,2*(jfit+Nfit-1)-1,2*(jfit+Nfit-1)-1);
-
-//		if (jfit==jfitmin) cout<<CG.submat(0,0,10,10);
-	
-//		LC=chol(CG);
-//		invLC=inv(LC);
-//		invCG=invLC*invLC.t();
-		
-		invCG=inv(CG);
-		//	invCG=inv_sympd(CG);
-		A=trans(X)*invCG*X;
-		A=0.5*(A+A.t());
-		Mtmp=trans(X)*invCG*Gchi2.rows(2*jfit-2,2*(jfit+Nfit-1)-1);
+		fit_normal_equations(X, Gchi2, 2*jfit-2, invCOV_blocks, LC, A, Mtmp);
 		
 		//		dposv_(&UPLO, &NA, &NRHS, A.memptr(), &NA, Mtmp.memptr(), &NA, &INFO);
 		Mtmp=solve(A,Mtmp);
@@ -21567,16 +21753,7 @@ bool OmegaMaxEnt_data::compute_moments_omega_n()
 		}
 	}
 	
-	CG=COV.submat(2*jfit-2,2*jfit-2,2*(jfit+Nfit-1)-1,2*(jfit+Nfit-1)-1);
-
-//	LC=chol(CG);
-//	invLC=inv(LC);
-//	invCG=invLC*invLC.t();
-	
-	invCG=inv(CG);
-	//	invCG=inv_sympd(CG);
-	A=trans(X)*invCG*X;
-	A=0.5*(A+A.t());
+	fit_normal_equations(X, Gchi2, 2*jfit-2, invCOV_blocks, LC, A, Mtmp);
 	mat COVMtmp=inv(A);
 	COVMfit=COVMtmp.submat(0,0,3,3);
 	
@@ -22664,7 +22841,7 @@ bool OmegaMaxEnt_data::set_G_omega_n_fermions()
 	return true;
 }
 
-void OmegaMaxEnt_data::plot(graph_2D &g, vec x, vec y, char *xl, char *yl, char *attr)
+void OmegaMaxEnt_data::plot(graph_2D &g, const vec &x, const vec &y, char *xl, char *yl, char *attr)
 {
 	double eps=1e-6;
 	double xlims[2], ylims[2];
@@ -22743,7 +22920,7 @@ void OmegaMaxEnt_data::plot(graph_2D &g, vec x, vec y, char *xl, char *yl, char
 	g.curve_plot();
 }
 
-bool OmegaMaxEnt_data::load_data_file(mat &data_array, string file_name)
+bool OmegaMaxEnt_data::load_data_file(mat &data_array, const string &file_name)
 {
 	string complete_file_name(input_dir);
 	complete_file_name+=file_name;
@@ -22780,6 +22957,7 @@ void OmegaMaxEnt_data::init_params()
 	displ_prep_figs=false;
 	displ_adv_prep_figs=false;
 	print_other_params=false;
+	alpha_files=false;
 	print_alpha=false;
 	show_optimal_alpha_figs=true;
 	show_lowest_alpha_figs=true;
@@ -23441,6 +23619,23 @@ bool OmegaMaxEnt_data::load_input_params()
 				else
 					output_grid_params.reset();
 			}
+			else if (str.compare(0,Grid_params[OUTPUT_GRID_FILE].size(),Grid_params[OUTPUT_GRID_FILE])==0)
+			{
+				str=str.substr(Grid_params[OUTPUT_GRID_FILE].size());
+				remove_spaces_ends(str);
+				output_grid_file_in=str;
+				w_out_grid.reset();
+				if (output_grid_file_in.size())
+				{
+					cout<<Grid_params[OUTPUT_GRID_FILE]<<" "<<output_grid_file_in<<endl;
+					mat grid_out_data;
+					if (load_data_file(grid_out_data, output_grid_file_in))
+					{
+						cout<<Grid_params[OUTPUT_GRID_FILE].substr(0,Grid_params[OUTPUT_GRID_FILE].size()-1)<<" loaded\n";
+						w_out_grid=grid_out_data.col(0);
+					}
+				}
+			}
 			else if (str.compare(0,Preproc_comp_params[EVAL_MOMENTS].size(),Preproc_comp_params[EVAL_MOMENTS])==0)
 			{
 				str=str.substr(Preproc_comp_params[EVAL_MOMENTS].size());
@@ -23687,6 +23882,17 @@ bool OmegaMaxEnt_data::load_input_params()
 					}
 				}
 			}
+			else if (str.compare(0,Output_files_params[ALPHA_FILES].size(),Output_files_params[ALPHA_FILES])==0)
+			{
+				str=str.substr(Output_files_params[ALPHA_FILES].size());
+				remove_spaces_ends(str);
+				alpha_files=false;
+				if (str.size())
+				{
+					cout<<Output_files_params[ALPHA_FILES]<<" "<<str<<endl;
+					if (str.compare("yes")==0) alpha_files=true;
+				}
+			}
 			else if (str.compare(0,Optim_comp_params[ALPHA_INIT].size(),Optim_comp_params[ALPHA_INIT])==0)
 			{
 				str=str.substr(Optim_comp_params[ALPHA_INIT].size());
@@ -23732,6 +23938,20 @@ bool OmegaMaxEnt_data::load_input_params()
 					cout<<Optim_comp_params[ALPHA_OPT_MIN]<<" "<<str<<endl;
 				}
 			}
+			else if (str.compare(0,Optim_comp_params[CLASSIC_BRYAN].size(),Optim_comp_params[CLASSIC_BRYAN])==0)
+			{
+				str=str.substr(Optim_comp_params[CLASSIC_BRYAN].size());
+				remove_spaces_ends(str);
+				//log_P_alpha_G is allocated when the minimization is initialized
+				if (compute_P_alpha_G_in.compare(str))	initialize_maxent=true;
+				compute_P_alpha_G_in=str;
+				compute_P_alpha_G=false;
+				if (compute_P_alpha_G_in.size())
+				{
+					cout<<Optim_comp_params[CLASSIC_BRYAN]<<" "<<compute_P_alpha_G_in<<endl;
+					if (compute_P_alpha_G_in.compare("yes")==0) compute_P_alpha_G=true;
+				}
+			}
 			else if (str.compare(0,Optim_exec_params[N_ALPHA].size(),Optim_exec_params[N_ALPHA])==0)
 			{
 				str=str.substr(Optim_exec_params[N_ALPHA].size());
@@ -24392,6 +24612,14 @@ bool OmegaMaxEnt_data::load_other_params()
 					cout<<Other_params_fl[R_SV_MIN]<<" "<<R_sv_min<<endl;
 				j++;
 			}
+			else if (str.compare(0,Other_params_fl[R_COV_EIG_MIN].size(),Other_params_fl[R_COV_EIG_MIN])==0)
+			{
+				str=str.substr(Other_params_fl[R_COV_EIG_MIN].size());
+				R_cov_eig_min=stod(str);
+				if (R_cov_eig_min!=Other_params_fl_default_values[R_COV_EIG_MIN] || print_other_params)
+					cout<<Other_params_fl[R_COV_EIG_MIN]<<" "<<R_cov_eig_min<<endl;
+				j++;
+			}
 			
             getline(file,str);
         }
@@ -34,6 +34,9 @@
 #include <stdlib.h>
 #include <string.h>
 #include <ctime>
+#include <chrono>
+#include <sstream>
+#include <algorithm>
 #include "graph_2D.h"
 #include "graph_3D.h"
 #include "generique.h"
@@ -84,7 +87,7 @@ static map<Intput_files_params_name, string> Input_files_params( {
 	{NOISE_PARAMS, "added noise relative error (s1 s2 ...) (default: 0):"}} );
 
 
-enum Grig_params_name {CUTOFF_WN, SPECTR_FUNC_WIDTH, SPECTR_FUNC_CENTER, W_ORIGIN, STEP_W, GRID_W_FILE, NON_UNIFORM_GRID, USE_GRID_PARAMS, PARAM_GRID_PARAMS,OUTPUT_GRID_PARAMS};
+enum Grig_params_name {CUTOFF_WN, SPECTR_FUNC_WIDTH, SPECTR_FUNC_CENTER, W_ORIGIN, STEP_W, GRID_W_FILE, NON_UNIFORM_GRID, USE_GRID_PARAMS, PARAM_GRID_PARAMS,OUTPUT_GRID_PARAMS,OUTPUT_GRID_FILE};
 
 static map<Grig_params_name, string> Grid_params( {
 	{CUTOFF_WN, "Matsubara frequency cutoff (in energy units, k_B=1):"},
@@ -96,7 +99,8 @@ static map<Grig_params_name, string> Grid_params( {
 	{NON_UNIFORM_GRID,"use non uniform grid in main spectral range (yes/[no]):"},
 	{USE_GRID_PARAMS, "use parameterized real frequency grid (yes/[no]):"},
 	{PARAM_GRID_PARAMS, "grid parameters (w_0 dw_0 w_1 dw_1 ... w_{N-1} dw_{N-1} w_N):"},
-	{OUTPUT_GRID_PARAMS,"output real frequency grid parameters (w_min dw w_max):"}} );
+	{OUTPUT_GRID_PARAMS,"output real frequency grid parameters (w_min dw w_max):"},
+	{OUTPUT_GRID_FILE,"output real frequency grid file:"}} );
 
 
 enum Preproc_comp_params_name {EVAL_MOMENTS, MAX_M, DEFAULT_MODEL_CENTER, DEFAULT_MODEL_WIDTH, DEFAULT_MODEL_SHAPE, DEFAULT_MODEL_FILE, INIT_SPECTR_FUNC_FILE,COMPUTE_PADE,N_PADE,ETA_PADE};
@@ -124,23 +128,25 @@ static map<Preproc_exec_params_name, string> Preproc_exec_params( {
 	{PRINT_OTHER_PARAMS, "print other parameters (yes/[no]):"} } );
 
 
-enum Output_files_params_name {OUTPUT_DIR, OUTPUT_NAME_SUFFIX, ALPHA_SAVE_MAX, ALPHA_SAVE_MIN, W_SAMPLE};
+enum Output_files_params_name {OUTPUT_DIR, OUTPUT_NAME_SUFFIX, ALPHA_SAVE_MAX, ALPHA_SAVE_MIN, W_SAMPLE, ALPHA_FILES};
 
 static map<Output_files_params_name, string> Output_files_params( {
 	{OUTPUT_DIR, "output directory:"},
 	{OUTPUT_NAME_SUFFIX, "output file names suffix:"},
 	{ALPHA_SAVE_MAX, "maximum alpha for which results are saved:"},
 	{ALPHA_SAVE_MIN, "minimum alpha for which results are saved:"},
-	{W_SAMPLE, "spectral function sample frequencies (w_1 w_2 ... w_N):"} } );
+	{W_SAMPLE, "spectral function sample frequencies (w_1 w_2 ... w_N):"},
+	{ALPHA_FILES, "one output file per value of alpha (yes/[no]):"} } );
 
 
-enum Optim_comp_params_name {ALPHA_INIT, ALPHA_MIN, ALPHA_OPT_MAX, ALPHA_OPT_MIN};
+enum Optim_comp_params_name {ALPHA_INIT, ALPHA_MIN, ALPHA_OPT_MAX, ALPHA_OPT_MIN, CLASSIC_BRYAN};
 
 static map<Optim_comp_params_name, string> Optim_comp_params( {
 	{ALPHA_INIT, "initial value of alpha:"},
 	{ALPHA_MIN, "minimum value of alpha:"},
 	{ALPHA_OPT_MAX, "maximum optimal alpha:"},
-	{ALPHA_OPT_MIN, "minimum optimal alpha:"} } );
+	{ALPHA_OPT_MIN, "minimum optimal alpha:"},
+	{CLASSIC_BRYAN, "compute classic and Bryan spectra (yes/[no]):"} } );
 
 enum Optim_exec_params_name {N_ALPHA, INITIALIZE_MAXENT, INITIALIZE_PREPROC, INTERACTIVE_MODE};
 
@@ -188,7 +194,7 @@ static map<Other_params_int_name, int> Other_params_int_default_values( {
     {NW_SAMP,11},
 	{NSMOOTH_ERRG,0} } );
 
-enum Other_params_fl_name {F_SW_STD_OMEGA, F_W_RANGE, RMIN_SW_DW, TOL_TEM, TOL_GINF, TOL_NORM, TOL_M1, TOL_M2, TOL_M3, DEFAULT_ERROR_G, ERR_NORM, DEFAULT_ERROR_M, TOL_MEAN_C1,TOL_STD_C1, TOL_RDW, RMIN_DW_DW, RDW_MAX, RW_GRID, RWD_GRID,  MIN_DEF_M, F_ALPHA_INIT, R_WIDTH_ASMIN, F_SMIN, R_CHI2_MIN, TOL_INT_DA, R_C2_H, POW_ALPHA_STEP_INIT, POW_ALPHA_STEP_MIN, CHI2_ALPHA_SMOOTH_RANGE, F_SCALE_LALPHA_LCHI2, FN_FIT_TAU_W, STD_NORM_PEAK_MAX, VAR_M2_PEAK_MAX, PEAK_WEIGHT_MIN, RMAX_DLCHI2_LALPHA, F_ALPHA_MIN, SAVE_ALPHA_RANGE, R_PEAK_WIDTH_DW, R_WNCUTOFF_WR, R_DW_DW, R_SW_WR, R_WMAX_WR_MIN,WGT_MIN_SM,R_SW_G_RE_W_RANGE,R_DW_MIN_DW_DENSE, R_WKK_SW, R_SV_MIN};
+enum Other_params_fl_name {F_SW_STD_OMEGA, F_W_RANGE, RMIN_SW_DW, TOL_TEM, TOL_GINF, TOL_NORM, TOL_M1, TOL_M2, TOL_M3, DEFAULT_ERROR_G, ERR_NORM, DEFAULT_ERROR_M, TOL_MEAN_C1,TOL_STD_C1, TOL_RDW, RMIN_DW_DW, RDW_MAX, RW_GRID, RWD_GRID,  MIN_DEF_M, F_ALPHA_INIT, R_WIDTH_ASMIN, F_SMIN, R_CHI2_MIN, TOL_INT_DA, R_C2_H, POW_ALPHA_STEP_INIT, POW_ALPHA_STEP_MIN, CHI2_ALPHA_SMOOTH_RANGE, F_SCALE_LALPHA_LCHI2, FN_FIT_TAU_W, STD_NORM_PEAK_MAX, VAR_M2_PEAK_MAX, PEAK_WEIGHT_MIN, RMAX_DLCHI2_LALPHA, F_ALPHA_MIN, SAVE_ALPHA_RANGE, R_PEAK_WIDTH_DW, R_WNCUTOFF_WR, R_DW_DW, R_SW_WR, R_WMAX_WR_MIN,WGT_MIN_SM,R_SW_G_RE_W_RANGE,R_DW_MIN_DW_DENSE, R_WKK_SW, R_SV_MIN, R_COV_EIG_MIN};
 
 static map<Other_params_fl_name, string> Other_params_fl( {
 	{F_SW_STD_OMEGA, "f_SW_std_omega, ratio of main spectral range and standard deviation of spectrum:"},
@@ -237,7 +243,8 @@ static map<Other_params_fl_name, string> Other_params_fl( {
 	{R_SW_G_RE_W_RANGE, "R_SW_G_Re_w_range, ratio of total frequency range and main spectral region for the real part of G:"},
 	{R_DW_MIN_DW_DENSE,"R_dw_min_dw_dense, default ratio of the minimal step in the computation grid and the step in the output grid:"},
 	{R_WKK_SW,"R_wKK_SW, frequency region around zero where Re[G] is computed with Kramers-Kronig, divided by the spectral function width:"},
-	{R_SV_MIN,"R_sv_min, minimum ratio of matrix singular values in the moments computation in tau:"}} );
+	{R_SV_MIN,"R_sv_min, minimum ratio of matrix singular values in the moments computation in tau:"},
+	{R_COV_EIG_MIN,"R_cov_eig_min, covariance eigenvalues smaller than R_cov_eig_min times the trace are discarded (0: none):"}} );
 
 static map<Other_params_fl_name, double> Other_params_fl_default_values( {
 	{F_SW_STD_OMEGA,3},
@@ -286,7 +293,8 @@ static map<Other_params_fl_name, double> Other_params_fl_default_values( {
 	{R_SW_G_RE_W_RANGE,10},
 	{R_DW_MIN_DW_DENSE,5},
 	{R_WKK_SW,0.01},
-	{R_SV_MIN,1e-10}} );
+	{R_SV_MIN,1e-10},
+	{R_COV_EIG_MIN,0}} );
 
 static const char *OmegaMaxEnt_notice=R"(
 OmegaMaxEnt Copyright (C) 2015 Dominic Bergeron (dominic.bergeron@usherbrooke.ca)
@@ -296,6 +304,81 @@ the GNU General Public License, of which you should have received a copy
 along with the program, or see <http://www.gnu.org/licenses/>.
 )";
 
+//RUN STATISTICS
+
+static string run_stats_file_name("OmegaMaxEnt_run_stats.json");
+
+//accumulated wall time, CPU time and number of calls of a stage of the computation
+struct stage_stats
+{
+	double wall_time=0, cpu_time=0;
+	int calls=0;
+};
+
+//adds the wall and CPU time elapsed between its construction and destruction to a stage_stats
+class stage_timer
+{
+public:
+	stage_timer(stage_stats &st): stats(st), wall_start(chrono::steady_clock::now()), cpu_start(clock()) {}
+	~stage_timer()
+	{
+		stats.wall_time+=chrono::duration<double>(chrono::steady_clock::now()-wall_start).count();
+		stats.cpu_time+=double(clock()-cpu_start)/CLOCKS_PER_SEC;
+		stats.calls++;
+	}
+private:
+	stage_stats &stats;
+	chrono::steady_clock::time_point wall_start;
+	clock_t cpu_start;
+};
+
+//BAND MATRICES
+
+//square matrix with KL sub-diagonals and KU super-diagonals, stored in the band format of LAPACK's dgbsv, with KL additional rows for the LU factorization. Used to solve the spline systems without forming dense matrices.
+class band_matrix
+{
+public:
+	band_matrix(int N_, int KL_, int KU_): N(N_), KL(KL_), KU(KU_), AB(2*KL_+KU_+1,N_,fill::zeros) {}
+	//set the size to N_ and all the elements to zero
+	void zeros(int N_) {N=N_; AB.zeros(2*KL+KU+1,N);}
+	//element (i,j), with -KL<=j-i<=KU
+	double &operator()(int i, int j) {return AB(KL+KU+i-j,j);}
+	//replace X by the solution of A*X=X, where A is this matrix. A is overwritten by its LU factorization. Returns false if A is singular.
+	bool solve(mat &X);
+private:
+	int N, KL, KU;
+	mat AB;
+};
+
+//CHOLESKY FACTOR OF A WINDOW
+
+//lower Cholesky factor of the diagonal block C.submat(r0,r0,r1,r1) of a symmetric positive definite matrix C. When the window moves forward, the rows removed at its start are taken out of the factor with rank-one updates and the rows added at its end are appended with a triangular solve, in O(n^2) operations per row instead of O(n^3) for a new factorization. Used by the moment fits on sliding and growing windows.
+class window_cholesky
+{
+public:
+	window_cholesky(const mat &C_): C(C_), r0(0), r1(-1) {}
+	//the matrix C
+	const mat &matrix() const {return C;}
+	//set the window to rows r0_ to r1_ of C and update the factor. Returns false if that block is not positive definite.
+	bool set(int r0_, int r1_);
+	//replace X by L^-1*X, where L is the factor of the current window
+	void solve_L(mat &X) const;
+private:
+	const mat &C;
+	int r0, r1;
+	mat L;
+};
+
+//ALPHA PATH
+
+//outputs of the minimization at one value of alpha (spectrum, back-continued G, errors and moments, in the format of the output files), kept in memory until the end of the run. saved is true if they are in the output files.
+struct alpha_path_entry
+{
+	double alpha=0;
+	mat A, G, err, moments;
+	bool saved=false;
+};
+
 extern "C++"
 {
 	class OmegaMaxEnt_data: public generique
@@ -319,7 +402,7 @@ extern "C++"
 		// load internal computation parameters from file OmegaMaxEnt_other_params.dat, which contains the default values at initialization
         bool load_other_params();
 		// load data files. Used to load all arrays.
-		bool load_data_file(mat &data_array, string file_name);
+		bool load_data_file(mat &data_array, const string &file_name);
 		// main preprocessing routine
 		bool preproc();
 		// define a fermionic Green function
@@ -336,6 +419,10 @@ extern "C++"
 		bool set_moments_fermions();
 		// set the moments in the bosonic case
 		bool set_moments_bosons();
+		// if COV is block diagonal with blocks of size bs, store the inverses of the blocks side by side in invCOV_blocks (bs x COV.n_rows) and return true. Used by the moment fits
+		bool COV_block_diag_inverse(int bs, mat &invCOV_blocks);
+		// normal equations A=X^T C^-1 X and B=X^T C^-1 Y of the least squares fit of Y.rows(r0,r0+X.n_rows-1), where C is the corresponding diagonal block of LC.matrix(). Only the blocks in invCOV_blocks are used if it is not empty. Otherwise, if R_cov_eig_min=0, C^-1 is applied with the factor LC, updated from the previous window
+		void fit_normal_equations(const mat &X, const vec &Y, int r0, const mat &invCOV_blocks, window_cholesky &LC, mat &A, vec &B);
 		// extract the moments from the Matsubara frequency Green function. Associated with parameter "evaluate moments" in section COMPUTATION OPTIONS of file OmegaMaxEnt_input_params.dat, but also called automatically if not enough information is provided to define the real frequency grid.
 		bool compute_moments_omega_n();
 		// extract the moments from a Matsubara frequency Green function which has a frequency-independant part
@@ -387,9 +474,9 @@ extern "C++"
 		// define the default model. Even correlation function case.
 		bool set_default_model_chi();
 		// compute values of the default model by interpolation or using gaussian tails for a user-defined default model.
-		bool default_model_val_G(vec x, vec x0, vec coeffs, vec gaussians_params, vec &dm);
+		bool default_model_val_G(const vec &x, const vec &x0, const vec &coeffs, const vec &gaussians_params, vec &dm);
 		// compute values of the default model by interpolation or using gaussian tails for a user-defined default model. Even correlation function case.
-		bool default_model_val_chi(vec x, vec x0, vec coeffs, vec gaussians_params, vec &dm);
+		bool default_model_val_chi(const vec &x, const vec &x0, const vec &coeffs, const vec &gaussians_params, vec &dm);
 		// compute the discrete version of the kernel in the spectral representation for fermions, using a cubic spline model for the spectrum. In that version, a piecewise linear transformation is applied to the grids in the low and high frequency regions to make them uniform and improve the conditioning of the matrix to be inverted. See appendix E in https://journals.aps.org/pre/abstract/10.1103/PhysRevE.94.023303 for some details. The calculation with the grid transformation is unpublished however.
 		bool Kernel_G_fermions_grid_transf();
 		// version of Kernel_G_fermions_grid_transf() for the case of a uniform grid in the main spectral region. Not currently used.
@@ -408,58 +495,60 @@ extern "C++"
 		bool diagonalize_covariance();
 		// diagonalize the covariance matrix. Even correlation function case.
 		bool diagonalize_covariance_chi();
+		// eigenvalues, in increasing order, and eigenvectors of the data covariance matrix COV. If R_cov_eig_min>0, only the eigenvalues larger than R_cov_eig_min*trace(COV) and their eigenvectors are computed. If R_cov_eig_min=0, full diagonalization with eig_sym(), as without the parameter. Used by diagonalize_covariance() and diagonalize_covariance_chi().
+		bool covariance_eig(vec &COV_eig, mat &V);
+		// inverse of a block C of the data covariance matrix used in the moment fits. If R_cov_eig_min>0, pseudo-inverse restricted to the eigenvalues of C larger than R_cov_eig_min*trace(C), consistent with covariance_eig().
+		mat covariance_inverse(const mat &C);
 		// compute the Fourier transform of imaginary time data.
 		bool Fourier_transform_G_tau();
 		// generate the non-uniform frequency grid in the main spectral region. Called by set_grid_from_params() and set_grid_from_params_chi().
-		bool non_uniform_frequency_grid(rowvec w_steps, rowvec wlims, double w0, vec R, vec &grid);
+		bool non_uniform_frequency_grid(const rowvec &w_steps, const rowvec &wlims, double w0, const vec &R, vec &grid);
 		
 		// define a function as a sum of gaussians
-		bool sum_gaussians(vec x, rowvec x0, rowvec s0, rowvec wgt, vec &F);
+		bool sum_gaussians(const vec &x, const rowvec &x0, const rowvec &s0, const rowvec &wgt, vec &F);
 		// define an even function as a sum of gaussians
-		bool sum_gaussians_chi(vec x, rowvec x0, rowvec s0, rowvec wgt, vec &F);
+		bool sum_gaussians_chi(const vec &x, const rowvec &x0, const rowvec &s0, const rowvec &wgt, vec &F);
 		// compute the values of a general normal distribution at vector x
-		bool general_normal(vec x, double x0, double s0, double p, vec &F);
-		// compute a single value of a general normal distribution
-		double general_normal_val(double x, void *par[]);
+		bool general_normal(const vec &x, double x0, double s0, double p, vec &F);
 		
 		// compute the spline coefficients for a function V defined at points x0
-		void spline_coeffs(double *x0, double *V, int N0, double *coeffs);
+		void spline_coeffs(const double *x0, const double *V, int N0, double *coeffs);
 		//
 		void spline_matrix(double *x0, int N0, mat &MS);
 		// obtain a value of the spline computed with spline_coeffs()
-		bool spline_val(vec x, vec x0, vec coeffs, vec &s);
+		bool spline_val(const vec &x, const vec &x0, const vec &coeffs, vec &s);
 		// compute the coefficients of a hybrid spline cubic in frequency at low frequency and cubic in u=1/(w-w_{0,s}) at high frequency (w_{0,s} defines the cutoff, s=left/right). Used by set_default_model() if a default model previously created by this software is reused by the user.
-		bool spline_G_part(vec x, uvec ind_xlims, vec xs, vec F, vec &coeffs);
+		bool spline_G_part(const vec &x, const uvec &ind_xlims, const vec &xs, const vec &F, vec &coeffs);
 		// compute values of the spline defined by spline_G_part. Used by set_default_model().
-		bool spline_val_G_part(vec x, vec x0, uvec ind_xlims, vec xs, vec coeffs, vec &sv);
+		bool spline_val_G_part(const vec &x, const vec &x0, const uvec &ind_xlims, const vec &xs, const vec &coeffs, vec &sv);
 		// compute a single value of the spline defined by spline_G_part.
 		double spline_val_G_part(double x, vec &x0, uvec &ind_xlims, vec &xs, vec &coeffs);
 		// compute values of the spline defined by spline_G_part. Used during tests only.
-		bool spline_G_omega_u(vec x, uvec ind_xlims, vec xs, vec F, vec &coeffs);
+		bool spline_G_omega_u(const vec &x, const uvec &ind_xlims, const vec &xs, const vec &F, vec &coeffs);
 		// define the hybrid spline matrix. Used by kernel_G_fermions() and kernel_G_bosons().
-		bool spline_matrix_G_part(vec x, uvec ind_xlims, vec xs, mat &M);
+		bool spline_matrix_G_part(const vec &x, const uvec &ind_xlims, const vec &xs, mat &M);
 		// define the hybrid spline matrix. Used by Kernel_G_fermions_grid_transf_omega().
-		bool spline_matrix_grid_transf(vec w0, mat &M);
+		bool spline_matrix_grid_transf(const vec &w0, mat &M);
 		// define the hybrid spline matrix. Used by Kernel_G_fermions_grid_transf().
-		bool spline_matrix_grid_transf_G_part(vec x, uvec ind_xlims, vec xs, mat &M);
+		bool spline_matrix_grid_transf_G_part(const vec &x, const uvec &ind_xlims, const vec &xs, mat &M);
 		//convert a matrix to LAPACK band matrix format
-		void convert_matrix_to_band_format(mat M, mat &Mbf, int KL, int KU);
+		void convert_matrix_to_band_format(const mat &M, mat &Mbf, int KL, int KU);
 		// define the hybrid spline matrix. Used by Kernel_G_fermions_grid_transf_2().
-		bool spline_matrix_grid_transf_G_part_2(vec x, uvec ind_xlims, vec xs, mat &M);
+		bool spline_matrix_grid_transf_G_part_2(const vec &x, const uvec &ind_xlims, const vec &xs, mat &M);
 		// compute values of the hybrid spline created using spline_matrix_G_part and a given spectrum. Used only during tests.
-		bool spline_val_grid_transf(vec x, vec x0, vec coeffs, vec &s);
+		bool spline_val_grid_transf(const vec &x, const vec &x0, const vec &coeffs, vec &s);
 		// compute the coefficients of hybrid spline for an even function F defined at points x. Used by set_default_model_chi().
-		bool spline_chi_part(vec x, uvec ind_xlims, vec xs, vec F, vec &coeffs);
+		bool spline_chi_part(const vec &x, const uvec &ind_xlims, const vec &xs, const vec &F, vec &coeffs);
 		// compute values of the spline defined by spline_chi_part(). Used by set_default_model_chi().
-		bool spline_val_chi_part(vec x, vec x0, uvec ind_xlims, vec xs, vec coeffs, vec &sv);
+		bool spline_val_chi_part(const vec &x, const vec &x0, const uvec &ind_xlims, const vec &xs, const vec &coeffs, vec &sv);
 		// compute a single value of the spline defined by spline_chi_part(). Used by KK_integ_chi() called from compute_Re_chi_omega().
-		double spline_val_chi_part(double x, vec x0, uvec ind_xlims, vec xs, vec coeffs);
+		double spline_val_chi_part(double x, const vec &x0, const uvec &ind_xlims, const vec &xs, const vec &coeffs);
 		// define the hybrid spline matrix for the even function cases. Used by kernel_chi().
-		bool spline_matrix_chi(vec x, uvec ind_xlims, vec xs, mat &M);
+		bool spline_matrix_chi(const vec &x, const uvec &ind_xlims, const vec &xs, mat &M);
 		// compute values of splines. Used during tests in Kernel_G_fermions_grid_transf() and other versions of the same function.
-		bool spline_val_G_part_grid_transf(vec x, vec x0, uvec ind_xlims, vec xs, vec coeffs, vec &sv);
+		bool spline_val_G_part_grid_transf(const vec &x, const vec &x0, const uvec &ind_xlims, const vec &xs, const vec &coeffs, vec &sv);
 		// compute values of splines. Used during tests in Kernel_G_fermions_grid_transf() and other versions of the same function.
-		bool spline_val_G_part_grid_transf_1(vec x, vec x0, uvec ind_xlims, vec xs, vec coeffs, vec &sv);
+		bool spline_val_G_part_grid_transf_1(const vec &x, const vec &x0, const uvec &ind_xlims, const vec &xs, const vec &coeffs, vec &sv);
 		// compute a single value of the hybrid spline. Used for tests in Kernel_G_fermions() and Kernel_G_bosons().
 		double spline_val_G_part_int(double x, void *par[]);
 		
@@ -467,15 +556,17 @@ extern "C++"
 		void set_Ntau_to_pow_2();
 		
 		// fit a circle arc to compute a curvature
-		bool fit_circle_arc(vec x, vec y, vec &arc_params);
+		bool fit_circle_arc(const vec &x, const vec &y, vec &arc_params);
 		
-		//The following functions were used to compute the classic and Bryan MaxEnt result, but are not currently used.
-		double integrate_spline(vec x, vec coeffs);
+		//The following functions compute the classic and Bryan MaxEnt results, if "compute classic and Bryan spectra" is set.
+		double integrate_spline(const vec &x, const vec &coeffs);
 		double diff_gaussian(double x, double par[]);
 		double S_i(double u, double c[]);
 		double P_A_alpha_val(double u, void*par[]);
 		void integrate_P_A_alpha();
 		double integrate_P_A_i_alpha(double alphaD_p);
+		// value of integrate_P_A_i_alpha() interpolated in the table computed once by integrate_P_A_alpha()
+		double P_A_i_alpha_table(double alphaD_p);
 		void normalize_P_alpha_G();
 		void compute_Bryan_spectrum(vec &Abr);
 		
@@ -485,32 +576,38 @@ extern "C++"
 		void minimize_increase_alpha();
 		
 		// plot data using data in vec (armadillo) format.
-		void plot(graph_2D &g, vec x, vec y, char *xl, char *yl, char *attr=NULL);
+		void plot(graph_2D &g, const vec &x, const vec &y, char *xl, char *yl, char *attr=NULL);
 		
 		// generate the default main input file OmegaMaxEnt_input_params.dat if it does not exist.
         bool create_default_input_params_file();
 		// generate the default internal parameters file OmegaMaxEnt_other_params.dat if it does not exist.
         bool create_default_other_params_file();
 		
-		//destroy the unwanted files created during the calculation
-		void remove_files();
+		//save the outputs in alpha_path between alpha_save_min and alpha_save_max, and at the last alpha, in one file per quantity, or in one file per quantity and per value of alpha if alpha_files is true, and remove the output files saved previously outside that range
+		void save_alpha_path();
+		//save the matrices M_kept, at the values alpha_kept, in the file of the quantity of the per-alpha file name format, with the value of alpha in the first column of each row
+		void save_alpha_path_file(const string &format, const vector<double> &alpha_kept, const vector<const mat*> &M_kept);
+		//set A_j to the spectrum at alpha_vec(j) in alpha_path. Returns false if it was not kept.
+		bool alpha_path_spectrum(int j, vec &A_j);
 		
 		// compute the real frequency Green function with a Pade approximant
-		void compute_G_with_Pade(vec wP, int NP, double eta);
+		void compute_G_with_Pade(const vec &wP, int NP, double eta);
 		//compute the Fourier transform of the spectrum A(t)=TF[A(w)]
-		void Fourier_transform_spectrum(vec wFt, vec AwFt, vec &t, cx_vec &At);
+		void Fourier_transform_spectrum(const vec &wFt, vec AwFt, vec &t, cx_vec &At);
 		//compute the real frequency Green function from A(t)
-		void compute_G_Re_omega_from_A_t(vec t, cx_vec At, cx_vec &G_Re_omega);
+		void compute_G_Re_omega_from_A_t(const vec &t, const cx_vec &At, cx_vec &G_Re_omega);
 		//compute the real part of the real-frequency Green function Re[G(omega)]
-		void compute_Re_G_omega(vec Ap);
+		void compute_Re_G_omega(const vec &Ap);
 		//compute the real part of the real-frequency correlation function Re[chi(omega)] that has the property chi(-omega)=chi*(omega)
 	//	void compute_Re_chi_omega(vec Ap);
-		//set the output (uniform) real frequency grid. extr_w(0) and extr_w(1) are the extrema of the grid used in the MaxEnt computation (for which the spectrum is defined)
-		void set_output_frequency_grid(vec extr_w);
+		//set the output real frequency grid, uniform or read from the output grid file. extr_w(0) and extr_w(1) are the extrema of the grid used in the MaxEnt computation (for which the spectrum is defined)
+		void set_output_frequency_grid(const vec &extr_w);
+		//save the real frequency Green function on the output grid, in text format and in armadillo binary format as the complex columns (w_out, G(w_out))
+		void save_G_Re_omega();
 		// perform the Kramers-Kronig integral 
-		void KK_integrate(vec w_KK, fctPtr1 Ptr, void *par[], double Rwdw, vec &G_tmp, vec tol, vec lims);
+		void KK_integrate(const vec &w_KK, fctPtr1 Ptr, void *par[], double Rwdw, vec &G_tmp, const vec &tol, const vec &lims);
 		// perform the Kramers-Kronig integral for even bosonic functions
-		void KK_integrate_chi(vec w_KK, fctPtr1 Ptr, void *par[], double Rwdw, vec &G_tmp, vec tol);
+		void KK_integrate_chi(const vec &w_KK, fctPtr1 Ptr, void *par[], double Rwdw, vec &G_tmp, const vec &tol);
 		//integrand in the Kramers-Kronig relation, fermionic case
 		double KK_integ(double x, void *par[]);
 		//integrand in the Kramers-Kronig relation, general bosonic case
@@ -527,10 +624,10 @@ extern "C++"
         //! internal computation parameters
 		int Nn_min, Nn_max, Nw_min, Nw_max, Nn_fit_max, Nn_fit_fin, Niter_dA_max, Nalpha_max_figs, Nwsamp, Nsmooth_errG;
 		
-        double f_w_range, f_SW_std_omega, f_width_grid_dens, tol_tem, tol_G_inf, tol_norm, tol_R_G0_Gbeta, tol_M1, tol_M2, tol_M3, default_error_G, err_norm, default_error_M, tol_mean_C1, tol_std_C1, tol_rdw, Rmin_Dw_dw, Rdw_max, RW_grid, RWD_grid, minDefM, f_alpha_init, R_width_ASmin, f_Smin, R_chi2_min, tol_int_dA, rc2H, pow_alpha_step_init, pow_alpha_step_min, chi2_alpha_smooth_range, f_scale_lalpha_lchi2, FNfitTauW, std_norm_peak_max, varM2_peak_max, peak_weight_min, RMAX_dlchi2_lalpha, f_alpha_min, save_alpha_range,  Rmin_SW_dw, R_peak_width_dw, R_wncutoff_wr, R_Dw_dw, R_SW_wr, R_wmax_wr_min, wgt_min_sm, R_SW_G_Re_w_range, R_dw_min_dw_dense, R_wKK_SW, R_sv_min;
+        double f_w_range, f_SW_std_omega, f_width_grid_dens, tol_tem, tol_G_inf, tol_norm, tol_R_G0_Gbeta, tol_M1, tol_M2, tol_M3, default_error_G, err_norm, default_error_M, tol_mean_C1, tol_std_C1, tol_rdw, Rmin_Dw_dw, Rdw_max, RW_grid, RWD_grid, minDefM, f_alpha_init, R_width_ASmin, f_Smin, R_chi2_min, tol_int_dA, rc2H, pow_alpha_step_init, pow_alpha_step_min, chi2_alpha_smooth_range, f_scale_lalpha_lchi2, FNfitTauW, std_norm_peak_max, varM2_peak_max, peak_weight_min, RMAX_dlchi2_lalpha, f_alpha_min, save_alpha_range,  Rmin_SW_dw, R_peak_width_dw, R_wncutoff_wr, R_Dw_dw, R_SW_wr, R_wmax_wr_min, wgt_min_sm, R_SW_G_Re_w_range, R_dw_min_dw_dense, R_wKK_SW, R_sv_min, R_cov_eig_min;
 		
 		//! input parameters
-		string input_dir_in, input_dir, data_file_name_in, data_file_name, boson_in, tau_GF_in, tem_in, M0_in, M1_in, errM1_in, M2_in, errM2_in, M3_in, errM3_in, omega_n_trunc_in, G_omega_inf_in, col_Gr_in, col_Gi_in, error_file_in, error_file, col_errGr_in, col_errGi_in, covar_re_re_file_in, covar_re_re_file, covar_im_im_file_in, covar_im_im_file, covar_re_im_file_in, covar_re_im_file, col_Gtau_in, col_errGtau_in, covar_tau_file_in, covar_tau_file, cutoff_wn_in, SW_in, SC_in, w_origin_in, step_omega_in, grid_omega_file_in, grid_omega_file, use_grid_params_in, omega_grid_params_in, eval_moments_in, maxM_in, def_model_file_in, def_model_file, init_spectr_func_file_in, init_spectr_func_file, default_model_center_in, default_model_width_in, default_model_shape_in, non_uniform_grid_in, Ginf_finite_in, noise_params_in, output_dir_in, output_dir, output_dir_fin, output_name_suffix, output_name_format, w_sample_in, Nalpha_in, alpha_min_in, alpha_init_in, alpha_opt_max_in, alpha_opt_min_in, alpha_save_max_in, alpha_save_min_in, A_ref_file, A_ref_file_in, def_model_output_file_name, A_opt_name_format, A_opt_err_name_format, output_G_format, output_error_format, auto_corr_error_G_format, output_G_opt_format, error_G_opt_format, auto_corr_error_G_opt_format, output_moments_format, output_moments_opt_format, chi2_vs_alpha_format, Asamp_vs_alpha_format, samp_freq_format, A_opt_name, A_opt_name_rm, A_opt_err_name_rm, A_alpha_min_name, output_G_opt_rm, error_G_opt_rm, auto_corr_error_G_opt_rm, output_moments_opt_rm, G_re_omega_name, Pade_G_re_omega_name, G_re_t_name, output_grid_params_in, compute_Pade_in, N_Pade_in, eta_Pade_in;
+		string input_dir_in, input_dir, data_file_name_in, data_file_name, boson_in, tau_GF_in, tem_in, M0_in, M1_in, errM1_in, M2_in, errM2_in, M3_in, errM3_in, omega_n_trunc_in, G_omega_inf_in, col_Gr_in, col_Gi_in, error_file_in, error_file, col_errGr_in, col_errGi_in, covar_re_re_file_in, covar_re_re_file, covar_im_im_file_in, covar_im_im_file, covar_re_im_file_in, covar_re_im_file, col_Gtau_in, col_errGtau_in, covar_tau_file_in, covar_tau_file, cutoff_wn_in, SW_in, SC_in, w_origin_in, step_omega_in, grid_omega_file_in, grid_omega_file, use_grid_params_in, omega_grid_params_in, eval_moments_in, maxM_in, def_model_file_in, def_model_file, init_spectr_func_file_in, init_spectr_func_file, default_model_center_in, default_model_width_in, default_model_shape_in, non_uniform_grid_in, Ginf_finite_in, noise_params_in, output_dir_in, output_dir, output_dir_fin, output_name_suffix, output_name_format, w_sample_in, Nalpha_in, alpha_min_in, alpha_init_in, alpha_opt_max_in, alpha_opt_min_in, alpha_save_max_in, alpha_save_min_in, A_ref_file, A_ref_file_in, def_model_output_file_name, A_opt_name_format, A_opt_err_name_format, output_G_format, output_error_format, auto_corr_error_G_format, output_G_opt_format, error_G_opt_format, auto_corr_error_G_opt_format, output_moments_format, output_moments_opt_format, chi2_vs_alpha_format, Asamp_vs_alpha_format, samp_freq_format, A_opt_name, A_opt_name_rm, A_opt_err_name_rm, A_alpha_min_name, output_G_opt_rm, error_G_opt_rm, auto_corr_error_G_opt_rm, output_moments_opt_rm, G_re_omega_name, G_re_omega_bin_name, Pade_G_re_omega_name, G_re_t_name, output_grid_params_in, output_grid_file_in, compute_Pade_in, N_Pade_in, eta_Pade_in, compute_P_alpha_G_in, A_cl_Br_name, P_alpha_G_name;
 		//interp_type, interp_type_in
 		
         bool data_file_loaded, use_grid_params, use_const_dw, use_exp_step, displ_prep_figs, displ_adv_prep_figs, print_other_params, boson, tau_GF, initialize, initialize_maxent, execute_maxent, save_spec_func, print_alpha, displ_optim_figs, cov_diag, moments_provided, eval_moments, covm_diag, wc_exists, w_exists, SW_set, SC_set, peak_exists, read_params, read_other_params, params_loaded, other_params_loaded, M1_set, M2_set, main_spectral_region_set, A_ref_change, show_optimal_alpha_figs, show_lowest_alpha_figs, show_alpha_curves, preproc_complete, Du_constant, non_uniform_grid, w_origin_set, interactive_mode, Ginf_finite, alpha_min_too_high, error_provided, compute_Pade, dG_dtau_computed;
@@ -544,14 +641,15 @@ extern "C++"
 		mat K, KGM, KGMw, invDw, KG_V, KM, KM_V, COV, CRR, CII, CRI, COVM, COVMfit, Ctau, Ctau_all, green_data, error_data, grid_w_data, def_data, Aw_data, Aref_data, Aprec, Aw_samp;
 		rowvec omega_grid_params, w_sample, noise_params, output_grid_params;
 		uvec w_sample_ind;
-		vec w_out, w_dense, Gr_Re_w, Gi_Re_w, Gr_Re_w_KK, Gi_Re_w_KK, Gi_Re_w_FFT, Gr, Gi, Gchi2, G_V, GM, wn, wn_all, errGr, errGi, errG, errGtau, M, M_V, errM, M_even, M_odd, Mfit, ws, A, A0, Amin, wc, w, wA, dwS, default_model, w_ref, A_ref, chi2_vec, alpha_vec, S_vec, M_ord, Gtau, tau, dlchi2_lalpha_1, curv_lchi2_lalpha_1, grid_dens, P_alpha_G, log_P_alpha_G, dG_tau, d2G_tau, d3G_tau, t_re, dG_w, A_Pade;
+		vec w_out, w_out_grid, w_dense, Gr_Re_w, Gi_Re_w, Gr_Re_w_KK, Gi_Re_w_KK, Gi_Re_w_FFT, Gr, Gi, Gchi2, G_V, GM, wn, wn_all, errGr, errGi, errG, errGtau, M, M_V, errM, M_even, M_odd, Mfit, ws, A, A0, Amin, wc, w, wA, dwS, default_model, w_ref, A_ref, chi2_vec, alpha_vec, S_vec, M_ord, Gtau, tau, dlchi2_lalpha_1, curv_lchi2_lalpha_1, grid_dens, P_alpha_G, log_P_alpha_G, dG_tau, d2G_tau, d3G_tau, t_re, dG_w, A_Pade;
 		cx_vec G, G_all, G_t_re, GR_Pade;
 		cx_mat Kcx;
 		uword ind_P_alpha_G_max;
-		vec integ_P_A_alpha, pow_alphaD_vec;
+		vec integ_P_A_alpha, pow_alphaD_vec, coeffs_l_integ_P_A_alpha;
 		
 		bool wn_sign_change, wn_inverted;
 		
+		//exit status returned by loop_run(): 0 if the optimal spectrum was found, 1 otherwise
 		int success;
 		
 		bool compute_P_alpha_G, uniform_grid, gaussian_grid_density;
@@ -560,6 +658,31 @@ extern "C++"
 		
 		mt19937 rnd_gen;
 		normal_distribution<double> normal_distr;
+		
+		// quiet mode (option -q): nothing is printed to the console
+		bool quiet_mode;
+		// option -e: the events (start, alpha values, errors, finish) are printed to stdout as JSON lines, also in quiet mode
+		bool print_events;
+		streambuf *cout_buf;
+		ostream *events_out;
+		// print the JSON line {"event": event, fields} if print_events is true. fields is a list of "key": value pairs separated by commas
+		void print_event(const char *event, const string &fields="");
+		
+		// run statistics, saved in run_stats_file_name at the end of the run if save_run_stats is true (option -s)
+		bool save_run_stats;
+		map<string,stage_stats> run_stages;
+		long nb_svd;
+		// number of Newton iterations for each value of alpha in newton_alpha
+		vector<double> newton_alpha;
+		vector<int> newton_iterations;
+		// armadillo's svd() with the calls counted in nb_svd
+		bool svd_count(mat &U, vec &s, mat &V, const mat &X, const char *method="dc");
+		void save_run_statistics();
+		
+		// outputs of the minimization at each value of alpha in alpha_vec, written by save_alpha_path()
+		vector<alpha_path_entry> alpha_path;
+		// if true, the outputs at each value of alpha are written in separate files, as in previous versions
+		bool alpha_files;
 
     };
     
@@ -20,6 +20,46 @@
 
 #include "OmegaMaxEnt_data.h"
 
+long nb_arma_alloc=0, nb_new_calls=0;
+
+//memory of the armadillo objects, aligned as required by armadillo
+void *arma_counted_malloc(const size_t n_bytes)
+{
+	void *ptr;
+	nb_arma_alloc++;
+	if (posix_memalign(&ptr, 16, n_bytes)) return NULL;
+	return ptr;
+}
+
+void arma_counted_free(void *ptr)
+{
+	free(ptr);
+}
+
+//operator new and delete of the program, with the calls of operator new counted in nb_new_calls
+void *operator new(size_t n_bytes)
+{
+	nb_new_calls++;
+	void *ptr=malloc(n_bytes ? n_bytes : 1);
+	if (!ptr) throw bad_alloc();
+	return ptr;
+}
+
+void *operator new[](size_t n_bytes)
+{
+	return operator new(n_bytes);
+}
+
+void operator delete(void *ptr) noexcept
+{
+	free(ptr);
+}
+
+void operator delete[](void *ptr) noexcept
+{
+	free(ptr);
+}
+
 int main(int arg_N, char *args[])
 {
 	OmegaMaxEnt_data maxent1(arg_N, args);
@@ -67,6 +67,15 @@
 // #define ARMA_USE_MKL_ALLOC
 //// Uncomment the above line if you want to use Intel MKL mkl_malloc() and mkl_free() instead of standard malloc() and free()
 
+// #define ARMA_ALIEN_MEM_ALLOC_FUNCTION aaa::my_special_malloc
+// #define ARMA_ALIEN_MEM_FREE_FUNCTION  aaa::my_special_free
+//// Uncomment the above lines if you wish to use your own custom memory allocator in place of malloc() and free().
+//// Make sure that your allocator provides memory with an alignment of at least 16 bytes.
+//// The signatures of the alloc and free functions must be:
+//// void* my_special_malloc(const size_t n_bytes);
+//// void  my_special_free  (void* ptr);
+//// (backported from later versions of armadillo)
+
 // #define ARMA_USE_ATLAS
 // #define ARMA_ATLAS_INCLUDE_DIR /usr/include/
 //// If you're using ATLAS and the compiler can't find cblas.h and/or clapack.h
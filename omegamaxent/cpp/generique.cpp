@@ -38,7 +38,7 @@ extern "C"
 	void zgbsv_(int *N, int *KL, int *KU, int *NRHS, dcomplex *AB, int *LDAB, int *IPIV, dcomplex *B, int *LDB, int *INFO );
 }
 
-double generique::simpson_integ(vec f, double dx)
+double generique::simpson_integ(const vec &f, double dx)
 {
 	int N=f.n_rows;
 	
@@ -160,8 +160,12 @@ dcomplex generique::cx_quadInteg1D(cx_fctPtr1 func, double lims[2], double tol,
 	stepVals[1]=y[1];
 	stepVals[2]=y[2];
 	
+	int nbEval0=nbEval[0];
+	
 	sum = cx_quadStep1D(func, stepLims, stepVals, tol, nbEval, hmin, params);
 	
+	nb_quad_eval+=nbEval[0]-nbEval0+nbPoints0;
+	
 	return sum;
 }
 
@@ -241,7 +245,7 @@ dcomplex generique::cx_quadStep1D(cx_fctPtr1 func,  double lims[2], dcomplex val
 
 
 //! compute the coefficients of a cubic spline using linear combinations of the first and second derivatives as the two mandatory additionnal constraints to the spline. x is the position vector, F the function vector, LC contains the two right-hand side values of the constraints, coeffs_LC(0) and coeffs_LC(1) are the coefficients of the first derivatives at the left and right boundary and coeffs_LC(2) and coeffs_LC(3) are the coefficients of the second derivatives at the same boundaries. coeffs has the form [a_1 b_1 c_1 d_1 ... a_N b_N c_N d_N] and the spline values are given by a_i*(x-x0_i)^3+b_i*(x-x0_i)^2+c_i*(x-x0_i)+d_i in the ith interval.
-void generique::spline_coeffs_LC(vec x0, vec F, vec LC, vec coeffs_LC, vec &coeffs)
+void generique::spline_coeffs_LC(const vec &x0, const vec &F, const vec &LC, const vec &coeffs_LC, vec &coeffs)
 {
 	int N0=x0.n_rows;
 	 
@@ -415,7 +419,7 @@ void generique::spline_coeffs_rel(double *x0, double *V, int N0, double *coeffs)
 
 //! calcule les coefficients du spline cubique pour V(x), la taille de coeffs doit etre 4*(N0-1), en entree,
 //coeffs[0] et coeffs[1] contiennent les derivees de V(x) a x_1 et x_N0, la taille de x0 et V est N0 et celle de coeffs est 4*(N0-1) 
-void generique::spline_coeffs(double *x0, double *V, int N0, double *coeffs)
+void generique::spline_coeffs(const double *x0, const double *V, int N0, double *coeffs)
 {
 	int j;
 	
@@ -1963,8 +1967,12 @@ double generique::quadInteg1D(fctPtr1 func, double lims[2], double tol, int nbEv
 	stepVals[1]=y[1];
 	stepVals[2]=y[2];
 	
+	int nbEval0=nbEval[0];
+	
 	sum = quadStep1D(func, stepLims, stepVals, tol, nbEval, hmin, params);
 	
+	nb_quad_eval+=nbEval[0]-nbEval0+nbPoints0;
+	
 	return sum;
 }
 
@@ -44,7 +44,7 @@ class generique
 						
 //@{
 //! Constructor
-	generique(){};
+	generique(): nb_quad_eval(0) {};
 //! Destructor
 	~generique(){};
 //@}
@@ -63,6 +63,9 @@ class generique
 	bool find_zero(fctPtr func, double init[], double params[], double root[], double lims[], double tol2);
 //@}
 	
+//! total number of function evaluations in quadInteg1D() and cx_quadInteg1D()
+	long nb_quad_eval;
+	
 //@{ Adaptive quadratic 1D and 2D integration routines
 //! 1D integation routine (also used by 2D routines). In direct use for 1D functions, last two arguments should be NULL
 	double quadInteg(fctPtr, double lims[2], double tol, int nbEval[], double params[], IntPtr, double limx[2]);
@@ -89,7 +92,7 @@ class generique
 	int solve_LU(vec &X, mat &A, vec &B);
 	
 	//! compute the coefficients of a cubic spline using linear combinations of the first and second derivatives as the two mandatory additionnal constraints to the spline. x0 is the position vector, F the function vector, LC contains the two right-hand side values of the constraints, coeffs_LC(0) and coeffs_LC(1) are the coefficients of the first derivatives at the left and right boundary and coeffs_LC(2) and coeffs_LC(3) are the coefficients of the second derivatives at the same boundaries.
-	void spline_coeffs_LC(vec x0, vec F, vec LC, vec coeffs_LC, vec &coeffs);
+	void spline_coeffs_LC(const vec &x0, const vec &F, const vec &LC, const vec &coeffs_LC, vec &coeffs);
 	
 	//! compute the coefficients of a clamped spline.
 	void spline_coefficients(double *vec_coeff,const double *xx,const double *yy,const double *fp,const int size);
@@ -109,7 +112,7 @@ class generique
 	
 	//! compute the coefficients of a cubic spline for V(x) of the form S_j(x)=a_j*x^3+b_j*x^2+c_j*x+d_j, where j is the interval's index
 	//coeffs[0] and coeffs[1] contains the derivatives of V(x) at x_1 et x_N0, the size of x0 and V is N0 and the size of coeffs is 4*(N0-1)
-	void spline_coeffs(double *x0, double *V, int N0, double *coeffs);
+	void spline_coeffs(const double *x0, const double *V, int N0, double *coeffs);
 	
 	//! return the value at x of the cubic spline computed with spline_coeffs()
 	double spline(double x, double *x0, double *V, int N0, double *coeffs);
@@ -150,7 +153,7 @@ class generique
 	void find_roots_4pol(dcomplex coef[], dcomplex roots[]);
 	
 	//! simpson integration
-	double simpson_integ(vec f, double dx);
+	double simpson_integ(const vec &f, double dx);
 
 	//! test if a vector contains NaN
 	bool contains_NaN(double *v, long int size)
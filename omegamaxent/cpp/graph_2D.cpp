@@ -20,11 +20,16 @@
 */
 
 #include "graph_2D.h"
+#include <sstream>
 
 FILE *graph_2D::plot_pipe=NULL;
 FILE *graph_2D::file_pipe=NULL;
 bool graph_2D::display_figures=true;
 bool graph_2D::print_to_file=true;
+bool graph_2D::print_to_bundle=false;
+FILE *graph_2D::bundle_file=NULL;
+int graph_2D::bundle_set=0;
+bool graph_2D::bundle_set_used=false;
 int graph_2D::ind_file=0;
 int graph_2D::fig_ind_max=0;
 char graph_2D::program_name[100];
@@ -172,6 +177,114 @@ graph_2D::~graph_2D()
 	close_pipe();
 }
 
+void graph_2D::reset_bundle()
+{
+	close_bundle();
+	if (!print_to_bundle) return;
+	bundle_file=fopen(figs_bundle_file_name.c_str(),"wb");
+	if (!bundle_file)
+	{
+		cout<<"graph_2D::reset_bundle(): file "<<figs_bundle_file_name<<" could not be opened\n";
+		return;
+	}
+	fputs("OMEFIGS1\n",bundle_file);
+	bundle_set=0;
+	bundle_set_used=false;
+}
+
+void graph_2D::close_bundle()
+{
+	if (bundle_file)
+	{
+		fclose(bundle_file);
+		bundle_file=NULL;
+	}
+}
+
+void graph_2D::write_bundle_record(const string &header, const double *data, size_t size)
+{
+	if (!bundle_file) return;
+	fputs(header.c_str(),bundle_file);
+	fputc('\n',bundle_file);
+	if (size) fwrite(data,sizeof(double),size,bundle_file);
+	bundle_set_used=true;
+}
+
+//figures recorded after this call are shown separately from the previous ones
+void graph_2D::end_bundle_set()
+{
+	if (!bundle_file || !bundle_set_used) return;
+	fflush(bundle_file);
+	bundle_set++;
+	bundle_set_used=false;
+}
+
+//str as a JSON string. The labels are written for Python double-quoted strings and their escape sequences (\\ and \") are kept.
+string graph_2D::json_string(const char *str)
+{
+	string js("\"");
+	char esc[8];
+	for (const char *c=str; *c; c++)
+	{
+		if (*c=='\\') js+="\\\\";
+		else if (*c=='"') js+="\\\"";
+		else if (*c=='\n') js+="\\n";
+		else if (*c=='\t') js+="\\t";
+		else if ((unsigned char)*c<0x20)
+		{
+			sprintf(esc,"\\u%04x",(unsigned char)*c);
+			js+=esc;
+		}
+		else js+=*c;
+	}
+	js+='"';
+	return js;
+}
+
+void graph_2D::save_to_bundle()
+{
+	ostringstream header;
+	header<<setprecision(17);
+	header<<"{\"set\": "<<bundle_set<<", \"fig\": "<<fig_ind<<", \"type\": \"curves\"";
+	header<<", \"title\": "<<json_string(title)<<", \"xlabel\": "<<json_string(xlabel)<<", \"ylabel\": "<<json_string(ylabel);
+	header<<", \"title_fontsize\": "<<title_fontsize<<", \"labels_fontsize\": "<<labels_fontsize<<", \"legend_fontsize\": "<<legend_fontsize<<", \"legend_loc\": "<<legend_loc;
+	header<<", \"xlims\": ["<<xlims[0]<<", "<<xlims[1]<<"], \"ylims\": ["<<ylims[0]<<", "<<ylims[1]<<"]";
+	header<<", \"curves\": [";
+	size_t size=0;
+	auto lgd_ptr=curves_names.begin();
+	auto attr_ptr=curves_attributes.begin();
+	for (auto list_ptr=list_curves.begin(); list_ptr!=list_curves.end(); list_ptr++)
+	{
+		if (list_ptr!=list_curves.begin()) header<<", ";
+		header<<"{\"size\": "<<list_ptr->size();
+		if (attr_ptr!=curves_attributes.end())
+		{
+			header<<", \"attr\": "<<json_string(attr_ptr->c_str());
+			attr_ptr++;
+		}
+		if (lgd_ptr!=curves_names.end())
+		{
+			header<<", \"legend\": "<<json_string(lgd_ptr->c_str());
+			lgd_ptr++;
+		}
+		header<<'}';
+		size+=2*list_ptr->size();
+	}
+	header<<"]}";
+	
+	vector<double> data(size);
+	size_t i=0;
+	for (auto list_ptr=list_curves.begin(); list_ptr!=list_curves.end(); list_ptr++)
+	{
+		for (auto &pt : *list_ptr)
+		{
+			data[i++]=pt[0];
+			data[i++]=pt[1];
+		}
+	}
+	write_bundle_record(header.str(),data.data(),size);
+}
+
 void graph_2D::set_axes_lims(double *xlims_par, double *ylims_par)
 {
     if (xlims_par)
@@ -217,6 +330,7 @@ void graph_2D::close_figures()
 
 void graph_2D::show_figures()
 {
+	end_bundle_set();
 	
     if (plot_pipe)
 	{
@@ -243,7 +357,7 @@ void graph_2D::show_figures()
 	}
 }
 
-void graph_2D::add_data(double *x, double *y, int size_data)
+void graph_2D::add_data(const double *x, const double *y, int size_data)
 {
     vector<point> vtmp(size_data);
     for (int i=0; i<size_data; i++)
@@ -321,11 +435,13 @@ void graph_2D::plot_with_pyplot(char *extra_commands, int fig_ind_p)
     
     sprintf(fig_command,fig_command_format,fig_ind);
 	
+	if (print_to_bundle) save_to_bundle();
+	
 	open_pipe();
 	
 	if (!plot_pipe && !file_pipe)
 	{
-		cout<<"plot_with_pyplot(): no pipe open\n";
+		if (!print_to_bundle) cout<<"plot_with_pyplot(): no pipe open\n";
 		return;
 	}
 
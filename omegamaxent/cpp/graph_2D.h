@@ -30,6 +30,14 @@
 #include <string>
 
 static string figs_ind_file_name("figs_ind.dat");
+/*
+ file of the figures data written with option -fb, instead of the scripts OmegaMaxEnt_figs_#.py and OmegaMaxEnt_surf_figs_#.py. It starts with the line "OMEFIGS1". Each figure is then
+ a line containing a JSON object describing the figure, followed by its data as native doubles:
+  - "type": "curves" (graph_2D), with, for each element of "curves", "size" pairs (x,y)
+  - "type": "surface" (graph_3D), with "x_size" values of x, "y_size" values of y and the "Z_rows"x"Z_cols" matrix Z in column-major order
+ "set" is the index of the group of figures shown together and "fig" is the figure number.
+*/
+static string figs_bundle_file_name("OmegaMaxEnt_figs_bundle.dat");
 
 extern "C++"
 {
@@ -43,7 +51,7 @@ extern "C++"
         graph_2D(plot_prog =PYPLOT, int =0);
         ~graph_2D();
         
-        void add_data(double*, double*, int);
+        void add_data(const double*, const double*, int);
         void print_data();
         void curve_plot(char* =NULL, int=0);
         void curve_plot(double*, double*, int, char* =NULL, int=0);
@@ -64,11 +72,22 @@ extern "C++"
         static void close_figures();
 		static void show_commands(bool show_comm){show_command=show_comm;}
 		static void reset_figs_ind_file(){if (figs_ind_file) figs_ind_file.close(); figs_ind_file.open(figs_ind_file_name); ind_file=0;}
+		//figures bundle, used if print_to_bundle is true
+		static void reset_bundle();
+		static void close_bundle();
+		static void write_bundle_record(const string &header, const double *data, size_t size);
+		static void end_bundle_set();
+		// JSON string literal of str, with all the backslashes, quotes and control characters escaped. The labels and legends are kept as they are written in the figure scripts, i.e. as the content of python string literals.
+		static string json_string(const char *str);
 		
         static FILE *plot_pipe;
 		static FILE *file_pipe;
 		static bool display_figures;
 		static bool print_to_file;
+		static bool print_to_bundle;
+		static FILE *bundle_file;
+		static int bundle_set;
+		static bool bundle_set_used;
         static int ind_file;
         static int fig_ind_max;
         static char program_name[100];
@@ -99,6 +118,7 @@ extern "C++"
     private:
         void plot_with_pyplot(char* =NULL, int=0);
         void plot_with_gnuplot(char* =NULL, int=0);
+		void save_to_bundle();
         
 //        char fig_name[100];
         char title[400];
@@ -20,6 +20,8 @@
 */
 
 #include "graph_3D.h"
+#include "graph_2D.h"
+#include <sstream>
 
 FILE *graph_3D::plot_pipe=NULL;
 FILE *graph_3D::file_pipe=NULL;
@@ -179,6 +181,7 @@ void graph_3D::set_axes_labels(const char *xlabel_par, const char *ylabel_par, c
 
 void graph_3D::show_figures()
 {
+	graph_2D::end_bundle_set();
 	
     if (plot_pipe)
 	{
@@ -211,7 +214,7 @@ void graph_3D::show_figures()
 	}
 }
 
-void graph_3D::add_data(vec xp, vec yp, mat Zp)
+void graph_3D::add_data(const vec &xp, const vec &yp, const mat &Zp)
 {
 	x=xp;
 	y=yp;
@@ -223,7 +226,27 @@ void graph_3D::add_title(const char *ttl)
 	strcpy(title,ttl);
 }
 
-void graph_3D::plot_surface(vec x, vec y, mat Z, map<string,string> extra_options, int fig_ind_p)
+void graph_3D::save_to_bundle(const options_list &options)
+{
+	ostringstream header;
+	header<<setprecision(17);
+	header<<"{\"set\": "<<graph_2D::bundle_set<<", \"fig\": "<<fig_ind<<", \"type\": \"surface\"";
+	header<<", \"title\": "<<graph_2D::json_string(title)<<", \"xlabel\": "<<graph_2D::json_string(xlabel)<<", \"ylabel\": "<<graph_2D::json_string(ylabel)<<", \"zlabel\": "<<graph_2D::json_string(zlabel);
+	header<<", \"title_fontsize\": "<<title_fontsize<<", \"labels_fontsize\": "<<labels_fontsize;
+	header<<", \"xlims\": ["<<xlims[0]<<", "<<xlims[1]<<"], \"ylims\": ["<<ylims[0]<<", "<<ylims[1]<<"], \"zlims\": ["<<zlims[0]<<", "<<zlims[1]<<"]";
+	header<<", \"options\": {";
+	for (auto it=options.begin(); it!=options.end(); it++)
+	{
+		if (it!=options.begin()) header<<", ";
+		header<<graph_2D::json_string(it->first.c_str())<<": "<<graph_2D::json_string(it->second.c_str());
+	}
+	header<<"}, \"x_size\": "<<x.n_rows<<", \"y_size\": "<<y.n_rows<<", \"Z_rows\": "<<Z.n_rows<<", \"Z_cols\": "<<Z.n_cols<<'}';
+	
+	vec data=join_vert(join_vert(x,y),vectorise(Z));
+	graph_2D::write_bundle_record(header.str(),data.memptr(),data.n_rows);
+}
+
+void graph_3D::plot_surface(const vec &x, const vec &y, const mat &Z, map<string,string> extra_options, int fig_ind_p)
 {
     add_data(x, y, Z);
     plot_surface(extra_options, fig_ind_p);
@@ -272,11 +295,16 @@ void graph_3D::plot_surface(map<string,string> extra_options, int fig_ind_p)
     
     sprintf(fig_command,fig_command_format,fig_ind);
 	
+	if (graph_2D::print_to_bundle) save_to_bundle(options);
+	
 	open_pipe();
 	
 	if (!plot_pipe && !file_pipe)
 	{
-		cout<<"plot_surface(): no pipe open\n";
+		if (graph_2D::print_to_bundle)
+			fig_ind++;
+		else
+			cout<<"plot_surface(): no pipe open\n";
 		return;
 	}
 
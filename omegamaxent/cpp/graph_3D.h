@@ -44,8 +44,8 @@ extern "C++"
         graph_3D(int =0);
         ~graph_3D();
         
-		void add_data(vec x, vec y, mat Z);
-		void plot_surface(vec x, vec y, mat Z, map<string,string> extra_options={}, int fig_ind_p=0);
+		void add_data(const vec &x, const vec &y, const mat &Z);
+		void plot_surface(const vec &x, const vec &y, const mat &Z, map<string,string> extra_options={}, int fig_ind_p=0);
 		void plot_surface(map<string,string> extra_options={}, int fig_ind_p=0);
 		void set_axes_lims(double *xlims_par, double *ylims_par, double *zlims_par);
         void set_axes_labels(const char*, const char*, const char*);
@@ -94,6 +94,8 @@ extern "C++"
 		static ofstream figs_ind_file;
         
     private:
+		void save_to_bundle(const options_list &options);
+		
         char title[400];
         char xlabel[100];
         char ylabel[100];
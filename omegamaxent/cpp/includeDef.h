@@ -37,6 +37,14 @@
 #include <sys/stat.h>
 #include <random>
 #include <gsl/gsl_linalg.h>
+
+//heap allocations of the program, counted for the run statistics: memory blocks of the armadillo objects, allocated with arma_counted_malloc(), and calls of operator new. Defined in OmegaMaxEnt_main.cpp
+extern long nb_arma_alloc, nb_new_calls;
+void *arma_counted_malloc(const size_t n_bytes);
+void arma_counted_free(void *ptr);
+#define ARMA_ALIEN_MEM_ALLOC_FUNCTION arma_counted_malloc
+#define ARMA_ALIEN_MEM_FREE_FUNCTION arma_counted_free
+
 #include "armadillo"
 
 #ifndef PI
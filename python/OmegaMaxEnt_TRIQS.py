@@ -21,18 +21,57 @@
 #
 ###################################################################################
 
-from OmegaMaxEnt_parameters import *
+# triqs, h5 and concurrent.futures are imported by the functions that use them, so that importing this module is fast
+from OmegaMaxEnt_parameters import OmegaMaxEnt_input_params, OmegaMaxEnt_other_params, Other_params_default_values, data_str, err_str, boson_str, time_str
+from OmegaMaxEnt_figures import figs_bundle_file_name, render_figures
 from math import pi
 import numpy as np
 import subprocess as sp
-from triqs.gf import *
-from h5 import HDFArchive as HA
 import os
+import sys
+import json
+import time
+import logging
+import threading
+import shutil
+import glob
+import re
+import hashlib
+import filecmp
 from os import path
 from collections.abc import Iterable
 
+class DefaultConsoleHandler(logging.StreamHandler):
+	"""
+	Handler printing the messages of the interface to stdout as long as the logging module is not configured, i.e. as
+	long as the root logger has no handler. Once it is, the messages are only passed to the handlers of the root logger.
+	"""
+	def __init__(self):
+		super().__init__(sys.stdout)
+		self.setFormatter(logging.Formatter("%(message)s"))
+
+	def emit(self, record):
+		if not logging.getLogger().handlers:
+			super().emit(record)
+
+# progress messages are logged at level INFO, the output of OmegaMaxEnt with quiet=True at level DEBUG
+logger = logging.getLogger("OmegaMaxEnt_TRIQS")
+if not logger.handlers:
+	logger.addHandler(DefaultConsoleHandler())
+if logger.level == logging.NOTSET:
+	logger.setLevel(logging.INFO)
+
 tol_Gi_tau = 1e-8
 
+# maximum relative norm of the off-diagonal part of G in the diagonal basis used with matrix_mode="rotated"
+tol_off_diag_rotated = 1e-3
+
+# maximum relative variation of the frequency step of an output_mesh used to build a GfReFreq
+tol_uniform_mesh = 1e-8
+
+# maximum difference between the output frequencies of OmegaMaxEnt and those of output_mesh, relative to the smallest step
+tol_output_mesh = 1e-6
+
 OME_cmd = "OmegaMaxEnt"
 
 # parameter file generated by compute_GfReFreq() that can also be modified during the calculation
@@ -41,8 +80,27 @@ other_params_file = "OmegaMaxEnt_other_params.dat"
 
 file_name = "G.dat"
 error_file_name = "error_G.dat"
+# covariance files computed from the bins parameter, in armadillo binary format
+covar_file_names = dict(cov_re_re="covar_ReRe_bins.bin", cov_im_im="covar_ImIm_bins.bin", cov_re_im="covar_ReIm_bins.bin", cov_tau="covar_tau_bins.bin")
+# error parameters compared, with the data, to detect equivalent blocks
+error_params = ['ERR', 'cov_re_re', 'cov_im_im', 'cov_re_im', 'cov_tau']
 FT_G_file_name = "Fourier_transformed_data/Fourier_transform_G_ascii.dat"
 result_file_name="OmegaMaxEnt_final_result/real_frequency_Green_function.dat"
+# frequencies of output_mesh, passed to OmegaMaxEnt
+output_grid_file_name = "grid_omega_out.dat"
+opt_spectrum_file_name="OmegaMaxEnt_final_result/optimal_spectral_function.dat"
+chi2_vs_alpha_pattern="chi2_vs_alpha*.dat"
+A_vs_alpha_pattern="Asamp_vs_alpha*.dat"
+sample_freq_pattern="sample_freq*.dat"
+A_opt_bounds_pattern="optimal_spectral_functions_*.dat"
+Pade_file_pattern="Pade_Green_function*.dat"
+A_classic_Bryan_pattern="classic_Bryan_spectral_functions*.dat"
+P_alpha_G_pattern="P_alpha_G*.dat"
+# suffix of the output directories of OmegaMaxEnt for each level of added noise
+noise_dir_suffix_format = "_err_{:1.1e}"
+# real frequency grid of the computation shared by the continuations of compute_GfReFreq_ensemble() and compute_GfReFreq_noise_sweep()
+ensemble_grid_file_name = "grid_omega.dat"
+run_stats_file_name = "OmegaMaxEnt_run_stats.json"
 
 
 def compute_GfReFreq(G, **kwa):
@@ -59,12 +117,31 @@ def compute_GfReFreq(G, **kwa):
 	ERR:	Optional real or complex numpy array.
 		Standard deviation if G is scalar or a 1x1 matrix.
 		ERR must have the same shape as the G.data.
+		If G is a BlockGf, ERR, as well as the covariance file parameters, can be a dictionary with the block names
+		as keys.
 		For a non-diagonal covariance, see the interface user guide or the OmegaMaxEnt user guide.
 
+	bins:	Optional 2D array-like object, for example a numpy array, a numpy memmap or an h5py dataset.
+		Monte Carlo bins of G if G is scalar or a 1x1 matrix, one bin per row, with the same number of columns as
+		there are points in the mesh of G. The data of G is replaced by the mean of the bins and the covariance of
+		the mean is passed to OmegaMaxEnt. ERR is then ignored.
+
+	rebin:	Optional integer. Default: 1
+		Number of consecutive bins averaged together before the mean and the covariance are computed.
+
+	bins_chunk:	Optional integer. Default: 1000
+			Maximum number of bins read at once. The memory used is that of the covariance matrix plus bins_chunk
+			bins.
+
 	output_grid_params:	Optional list of the form [w_min, w_step, w_max].
 			Defines the real frequency grid of the output Green function. If empty, the output grid is set by
 			OmegaMaxEnt.
 
+	output_mesh:	Optional MeshReFreq or array of increasing frequencies.
+			Uniform output grid, which can cover only a part of the spectrum. OmegaMaxEnt evaluates the result only
+			at those frequencies. Replaces output_grid_params. For a non-uniform grid, use compute_G_omega(). The
+			frequencies must be inside the range where the spectrum is defined, otherwise the continuation fails.
+
 	name:	Optional string. Default: "$G^R$"
 		Name parameter of the returned GfReFreq object
 
@@ -75,6 +152,12 @@ def compute_GfReFreq(G, **kwa):
 				Tells OmegaMaxEnt not to save figure files if set to False.
 				Set to False if G is a matrix or a BlockGf
 
+	figures_bundle:	Optional boolean. Default: False
+			If True, and save_figures_data is True, OmegaMaxEnt records the data of all the figures in the single file
+			OmegaMaxEnt_figs_bundle.dat instead of writing one python script per figure, and does not start python
+			to draw them. The figures are then drawn on demand by display_figures() or by
+			OmegaMaxEnt_figures.render_figures(), possibly in a separate process.
+
 	save_G:		Optional boolean.
 			By default, the result is save in hdf5 format in file G_Re_Freq.h5.
 
@@ -102,13 +185,82 @@ def compute_GfReFreq(G, **kwa):
 			i.e. G(tau)=G(-tau), i.e. G(beta-tau)=G(tau), set inv_sym_time=True. The MaxEnt calculation will then be
 			performed over positive real frequencies only.
 
+	sym_tol:	Optional float. Default: None.
+			If G is a matrix or a BlockGf, blocks, matrix elements and off-diagonal combinations whose data agree
+			within the relative tolerance sym_tol are continued only once and the result is copied to all of them.
+			For blocks, the errors ERR must also agree within sym_tol, and the covariance files must have the same
+			content. Use it for spin or orbital degenerate models. Automatic detection is disabled if sym_tol is None.
+
+	equiv_blocks:	Optional list of lists of block names.
+			If G is a BlockGf, each list defines a class of equivalent blocks. Only the first block of each class is
+			continued, and its result is copied to the other blocks of the class.
+
+	equiv_elements:	Optional list of lists of index pairs (l,m).
+			If G is a matrix, each list defines a class of equivalent matrix elements, either all diagonal or all
+			off-diagonal. Only the first element of each class is continued, and its result is copied to the
+			other elements of the class.
+
+	archive_file:	Optional string. Default: None.
+			If G is a matrix or a BlockGf, each element or block is appended to the HDF5 file archive_file as soon
+			as it is computed, in the groups "elements" and "blocks", respectively.
+
+	restart:	Optional boolean. Default: False.
+			If True, the elements and blocks already saved in archive_file are loaded instead of being computed.
+
+	low_memory:	Optional boolean. Default: False.
+			If G is a matrix, each off-diagonal element is assembled in the result as soon as the corresponding
+			auxiliary functions are continued, instead of keeping all continued auxiliary functions until the end.
+			The peak memory is then bounded by the result plus one element.
+
+	matrix_mode:	Optional string. Default: "elements".
+			If G is a matrix and matrix_mode="elements", the off-diagonal elements are obtained from auxiliary
+			functions, with N^2 scalar continuations. matrix_mode="rotated" is an approximation in which G is
+			continued in the basis that diagonalizes it jointly at all Matsubara frequencies, with N scalar
+			continuations, and the result is rotated back to the original basis. It is only valid if that basis
+			does not depend on frequency. Otherwise, i.e. if the relative norm of the off-diagonal part of G in that
+			basis exceeds tol_off_diag_rotated, the continuation fails. Both modes use the scalar solver of
+			OmegaMaxEnt. A joint continuation of the full matrix, with a matrix entropy and a single alpha path, is
+			not available, and matrix_mode="full" returns None with an error.
+
+	quiet:		Optional boolean. Default: False.
+			If True and interactive_mode is False, OmegaMaxEnt does not print anything to the console. Its progress
+			(start, values of alpha with Q, S and chi2, errors and end of the run) is passed instead to the logger
+			"OmegaMaxEnt_TRIQS" of the logging module. All the messages of the interface go through that logger.
+
+	on_event:	Optional callable. Default: None.
+			If provided, on_event(phase, duration, metadata) is called at the end of each phase of the calculation,
+			with the name of the phase, its duration in seconds and a dictionary of details. An instance of
+			PhaseProfiler can be used to collect the phase durations over all the elements and blocks and print a
+			summary table.
+
+	engine_stats:	Optional list. Default: None.
+			If provided, the run statistics of each call to OmegaMaxEnt are appended to engine_stats as a
+			dictionary with keys "stages" (wall time, CPU time and number of calls of each stage), "counters"
+			(number of SVDs, of adaptive quadrature evaluations, of heap allocations of armadillo objects and of
+			calls of operator new), "alpha" and "newton_iterations" (number of Newton iterations at each value of
+			alpha).
+
+	work_dir:	Optional string. Default: "."
+			Directory in which the input files of OmegaMaxEnt are written and OmegaMaxEnt is run. The input file
+			names passed as parameters, for example cov_re_re, are relative to work_dir.
+
+	full_result:	Optional boolean. Default: False.
+			If True and G is scalar or a 1x1 matrix, a ContinuationResult object is returned instead of the
+			GfReFreq object. It contains the continuation and gives access to chi2 and the spectral function along
+			the alpha path, the optimal alpha, the spectral functions on each side of the optimal alpha and the Pade
+			result. These are read from the output files of OmegaMaxEnt only when they are accessed.
+
 	The other parameters are defined in the dictionaries OmegaMaxEnt_input_params and OmegaMaxEnt_other_params
 	(defined in file OmegaMaxEnt_parameters.py) and are described in the OmegaMaxEnt user guide
-	(https://www.physique.usherbrooke.ca/MaxEnt/index.php/User_Guide).
+	(https://www.physique.usherbrooke.ca/MaxEnt/index.php/User_Guide). The parameters of OmegaMaxEnt_other_params
+	not passed as keyword arguments take the values of Other_params_default_values, and the file
+	OmegaMaxEnt_other_params.dat is rewritten whenever its content differs from those values.
 	"""
+	from triqs.gf import Gf, GfImFreq, GfImTime, GfReFreq, BlockGf
+	from h5 import HDFArchive as HA
 
 	if not isinstance(G, Gf) and not isinstance(G, GfImFreq) and not isinstance(G, GfImTime) and not isinstance(G, BlockGf):
-		print("compute_GfReFreq(): input type " + str(G.__class__) + " not accepted. Only objects of types Gf, GfImFreq, GfImTime or BlockGf are accepted.")
+		logger.error("compute_GfReFreq(): input type " + str(G.__class__) + " not accepted. Only objects of types Gf, GfImFreq, GfImTime or BlockGf are accepted.")
 		return None
 
 	save_G = True
@@ -116,63 +268,139 @@ def compute_GfReFreq(G, **kwa):
 		if isinstance(kwa['save_G'], bool):
 			save_G = kwa['save_G']
 		else:
-			print("compute_GfReFreq() warning: save_G parameter must be boolean")
+			logger.warning("compute_GfReFreq() warning: save_G parameter must be boolean")
 	name = "$G^R$"
 	if 'name' in kwa:
 		name = kwa['name']
 	output_grid_params = []
 	if 'output_grid_params' in kwa:
 		output_grid_params = kwa['output_grid_params']
+	on_event = None
+	if 'on_event' in kwa:
+		on_event = kwa['on_event']
+	full_result = False
+	if 'full_result' in kwa:
+		full_result = kwa['full_result']
+		del kwa['full_result']
+	# the parameters are validated and serialized once for all the elements and blocks
+	if 'param_set' not in kwa:
+		kwa.update(dict(param_set=ParameterSet(kwa)))
 
 	if not isinstance(G, BlockGf):
 		if len(G.target_shape)==2:
 			if G.target_shape[0]==1 and G.target_shape[1]==1:
 				Gtmp=compute_scalar_GfReFreq(G[0,0], **kwa)
 				if not isinstance(Gtmp, GfReFreq):
-					print("continuation failed")
+					logger.error("continuation failed")
 					return None
+				t0 = time.perf_counter()
 				n_freq = len(Gtmp.mesh)
 				GR=GfReFreq(target_shape=[1,1], window=(Gtmp.mesh.w_min,Gtmp.mesh.w_max), n_points=n_freq, name=name)
-				GR[0,0] = Gtmp
+				GR.data[:, 0, 0] = Gtmp.data
+				report_phase(on_event, "matrix assembly", t0, shape=G.target_shape)
 			elif G.target_shape[0]==G.target_shape[1]:
 				GR = compute_matrix_GfReFreq(G, **kwa)
 				if not isinstance(GR, GfReFreq):
-					print("continuation failed")
+					logger.error("continuation failed")
 					return None
 			else:
-				print("compute_GfReFreq() only treats Green functions with the same extent of both dimensions")
+				logger.error("compute_GfReFreq() only treats Green functions with the same extent of both dimensions")
 				return None
 		elif not len(G.target_shape):
 			GR = compute_scalar_GfReFreq(G, **kwa)
 			if not isinstance(GR, GfReFreq):
-				print("continuation failed")
+				logger.error("continuation failed")
 				return None
 		else:
-			print("compute_GfReFreq() only treats matrix or scalar Green functions")
+			logger.error("compute_GfReFreq() only treats matrix or scalar Green functions")
 			return None
 	else: #BlockGf
+		sym_tol = None
+		if 'sym_tol' in kwa:
+			sym_tol = kwa['sym_tol']
+		equiv_blocks = []
+		if 'equiv_blocks' in kwa:
+			equiv_blocks = kwa['equiv_blocks']
+			del kwa['equiv_blocks']
+		block_class = {}
+		for ind_cl, cl in enumerate(equiv_blocks):
+			for bl in cl:
+				block_class[bl] = ind_cl
+		archive_file = None
+		if 'archive_file' in kwa:
+			archive_file = kwa['archive_file']
+		archived_blocks = {}
+		if archive_file and 'restart' in kwa and kwa['restart']:
+			t0 = time.perf_counter()
+			archived_blocks = load_archived_results(archive_file, "blocks")
+			report_phase(on_event, "archive", t0, n_blocks=len(archived_blocks))
 		kwa.update(dict(name=''))
 		kwa.update(dict(save_G=False))
 		list_G = []
+		computed_blocks = {}
+		computed_errors = {}
+		class_results = {}
 		for bl,Gbl in G:
-			Gtmp = compute_GfReFreq(Gbl, **kwa)
-			if not isinstance(Gtmp, GfReFreq):
-				print("continuation failed")
-				return None
+			Gtmp = None
+			err_bl = block_error_params(kwa, bl)
+			if bl in archived_blocks:
+				Gtmp = archived_blocks[bl]
+				logger.info(f"block {bl} loaded from {archive_file}")
+			elif bl in block_class and block_class[bl] in class_results:
+				Gtmp = class_results[block_class[bl]].copy()
+				logger.info(f"block {bl} equivalent to a block already computed")
+			elif sym_tol is not None:
+				for bl_c, Gbl_c in computed_blocks.items():
+					if is_equivalent(Gbl.data, G[bl_c].data, sym_tol, err_bl, computed_errors[bl_c], kwa.get('work_dir', ".")):
+						Gtmp = Gbl_c.copy()
+						logger.info(f"block {bl} equivalent to block {bl_c}")
+						break
+			if Gtmp is None:
+				kwa.update(dict(archive_group=f"elements/{bl}"))
+				kwa_bl = {key: val for key, val in kwa.items() if key not in error_params}
+				kwa_bl.update(err_bl)
+				Gtmp = compute_GfReFreq(Gbl, **kwa_bl)
+				if not isinstance(Gtmp, GfReFreq):
+					logger.error("continuation failed")
+					return None
+				computed_blocks[bl] = Gtmp
+				computed_errors[bl] = err_bl
+				if bl in block_class:
+					class_results[block_class[bl]] = Gtmp
+			if archive_file and bl not in archived_blocks:
+				t0 = time.perf_counter()
+				archive_results(archive_file, "blocks", {bl: Gtmp})
+				report_phase(on_event, "archive", t0, block=bl)
 			list_G.append(Gtmp)
-			if len(output_grid_params) != 3:
+			if len(output_grid_params) != 3 and 'output_mesh' not in kwa:
 				n_freq = len(Gtmp.mesh)
 				step = (Gtmp.mesh.w_max - Gtmp.mesh.w_min) / (n_freq - 1)
 				output_grid_params = [Gtmp.mesh.w_min, step, Gtmp.mesh.w_max]
 				kwa.update(dict(output_grid_params=output_grid_params))
-		GR = BlockGf(name_list = list(G.indices), block_list = list_G, name=name)
+		t0 = time.perf_counter()
+		GR = BlockGf(name_list = list(G.indices), block_list = list_G, name=name, make_copies=False)
+		report_phase(on_event, "matrix assembly", t0, n_blocks=len(list_G))
+		del list_G, computed_blocks, computed_errors, class_results, archived_blocks
 
 
 	if save_G:
+		t0 = time.perf_counter()
 		with HA("G_Re_Freq.h5", 'w') as A:
 			A['G'] = GR
+		report_phase(on_event, "save hdf5", t0)
 
-	print("continuation done")
+	logger.info("continuation done")
+
+	if full_result:
+		if isinstance(G, BlockGf) or (len(G.target_shape) and G.target_shape[0]>1):
+			logger.warning("compute_GfReFreq() warning: full_result is only available if G is scalar or a 1x1 matrix")
+		else:
+			work_dir = "."
+			if 'work_dir' in kwa:
+				work_dir = kwa['work_dir']
+			error_provided = isinstance(kwa.get('ERR'), np.ndarray) or kwa.get('bins') is not None
+			result_dir = path.dirname(final_result_file(result_file_name, work_dir, kwa, error_provided))
+			return ContinuationResult(GR, result_dir, work_dir)
 
 	return GR
 
@@ -181,17 +409,18 @@ def compute_matrix_GfReFreq(G, **kwa):
 	"""
 	Used by compute_GfReFreq() to compute a matrix-valued GfReFreq from a matrix-valued Matsubara function G.
 	"""
+	from triqs.gf import Gf, GfImFreq, GfImTime, GfReFreq
 
 	if not isinstance(G,Gf) and not isinstance(G,GfImFreq) and not isinstance(G,GfImTime):
-		print("compute_matrix_GfReFreq(): input type " + str(G.__class__) + " not accepted. Only objects of types Gf, GfImFreq or GfImTime are accepted.")
+		logger.error("compute_matrix_GfReFreq(): input type " + str(G.__class__) + " not accepted. Only objects of types Gf, GfImFreq or GfImTime are accepted.")
 		return None
 
 	if len(G.target_shape)!=2:
-		print("compute_matrix_GfReFreq(): the Green function must be a matrix")
+		logger.error("compute_matrix_GfReFreq(): the Green function must be a matrix")
 		return None
 
 	if G.target_shape[0]<2 or G.target_shape[0]<2 or G.target_shape[0]!=G.target_shape[1]:
-		print("compute_matrix_GfReFreq(): the Green function must be a square matrix of dimension at least 2")
+		logger.error("compute_matrix_GfReFreq(): the Green function must be a square matrix of dimension at least 2")
 		return None
 
 	output_grid_params = []
@@ -199,13 +428,13 @@ def compute_matrix_GfReFreq(G, **kwa):
 		if len(kwa['output_grid_params'])==3:
 			output_grid_params = kwa['output_grid_params']
 		else:
-			print("compute_matrix_GfReFreq() warning: 'output_grid_params' parameter must contain three elements")
+			logger.warning("compute_matrix_GfReFreq() warning: 'output_grid_params' parameter must contain three elements")
 	inv_sym = False
 	if 'inv_sym' in kwa:
 		if isinstance(kwa['inv_sym'],bool):
 			inv_sym=kwa['inv_sym']
 		else:
-			print("compute_matrix_GfReFreq() warning: 'inv_sym' parameter must be boolean")
+			logger.warning("compute_matrix_GfReFreq() warning: 'inv_sym' parameter must be boolean")
 	mu = 1
 	if 'mu' in kwa:
 		mu=kwa['mu']
@@ -216,108 +445,331 @@ def compute_matrix_GfReFreq(G, **kwa):
 	if 'name' in kwa:
 		name=kwa['name']
 		kwa['name']=''
-	save_G = False
-	# if 'save_G' in kwa:
-	# 	save_G=kwa['save_G']
+	sym_tol = None
+	if 'sym_tol' in kwa:
+		sym_tol = kwa['sym_tol']
+	equiv_elements = []
+	if 'equiv_elements' in kwa:
+		equiv_elements = kwa['equiv_elements']
+		del kwa['equiv_elements']
+	low_memory = False
+	if 'low_memory' in kwa:
+		if isinstance(kwa['low_memory'],bool):
+			low_memory=kwa['low_memory']
+		else:
+			logger.warning("compute_matrix_GfReFreq() warning: 'low_memory' parameter must be boolean")
+	matrix_mode = "elements"
+	if 'matrix_mode' in kwa:
+		if kwa['matrix_mode'] in ["elements", "rotated"]:
+			matrix_mode = kwa['matrix_mode']
+		elif kwa['matrix_mode'] == "full":
+			logger.error("compute_matrix_GfReFreq(): matrix_mode=\"full\" is not available. OmegaMaxEnt has no joint matrix-valued solver. Use matrix_mode=\"elements\", or matrix_mode=\"rotated\" if G is diagonal in a frequency independent basis.")
+			return None
+		else:
+			logger.warning("compute_matrix_GfReFreq() warning: 'matrix_mode' parameter must be \"elements\" or \"rotated\"")
+		del kwa['matrix_mode']
+	archive_file = None
+	if 'archive_file' in kwa:
+		archive_file = kwa['archive_file']
+		del kwa['archive_file']
+	archive_group = "elements"
+	if 'archive_group' in kwa:
+		archive_group = kwa['archive_group']
+		del kwa['archive_group']
+	restart = False
+	if 'restart' in kwa:
+		restart = kwa['restart']
+		del kwa['restart']
+	on_event = None
+	if 'on_event' in kwa:
+		on_event = kwa['on_event']
 
 	kwa.update(dict(save_figures_data = False))
 
 	#remove all parameters that do not make sense for matrix-valued Green's function
 	if 'ERR' in kwa:
-		print("compute_matrix_GfReFreq() warning: 'ERR' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		logger.warning("compute_matrix_GfReFreq() warning: 'ERR' parameter is applicable only to scalar Green's functions. Parameter discarded.")
 		del kwa['ERR']
 	if 'norm' in kwa:
-		print("compute_matrix_GfReFreq() warning: 'norm' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		logger.warning("compute_matrix_GfReFreq() warning: 'norm' parameter is applicable only to scalar Green's functions. Parameter discarded.")
 		del kwa['norm']
 	if 'M1' in kwa:
-		print("compute_matrix_GfReFreq() warning: 'M1' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		logger.warning("compute_matrix_GfReFreq() warning: 'M1' parameter is applicable only to scalar Green's functions. Parameter discarded.")
 		del kwa['M1']
 	if 'M2' in kwa:
-		print("compute_matrix_GfReFreq() warning: 'M2' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		logger.warning("compute_matrix_GfReFreq() warning: 'M2' parameter is applicable only to scalar Green's functions. Parameter discarded.")
 		del kwa['M2']
 	if 'M3' in kwa:
-		print("compute_matrix_GfReFreq() warning: 'M3' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		logger.warning("compute_matrix_GfReFreq() warning: 'M3' parameter is applicable only to scalar Green's functions. Parameter discarded.")
 		del kwa['M3']
 	if 'error_file' in kwa:
-		print("compute_matrix_GfReFreq() warning: 'error_file' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		logger.warning("compute_matrix_GfReFreq() warning: 'error_file' parameter is applicable only to scalar Green's functions. Parameter discarded.")
 		del kwa['error_file']
 	if 'cov_re_re' in kwa:
-		print("compute_matrix_GfReFreq() warning: 'cov_re_re' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		logger.warning("compute_matrix_GfReFreq() warning: 'cov_re_re' parameter is applicable only to scalar Green's functions. Parameter discarded.")
 		del kwa['cov_re_re']
 	if 'cov_im_im' in kwa:
-		print("compute_matrix_GfReFreq() warning: 'cov_im_im' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		logger.warning("compute_matrix_GfReFreq() warning: 'cov_im_im' parameter is applicable only to scalar Green's functions. Parameter discarded.")
 		del kwa['cov_im_im']
 	if 'cov_re_im' in kwa:
-		print("compute_matrix_GfReFreq() warning: 'cov_re_im' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		logger.warning("compute_matrix_GfReFreq() warning: 'cov_re_im' parameter is applicable only to scalar Green's functions. Parameter discarded.")
 		del kwa['cov_re_im']
 	if 'cov_tau' in kwa:
-		print("compute_matrix_GfReFreq() warning: 'cov_tau' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		logger.warning("compute_matrix_GfReFreq() warning: 'cov_tau' parameter is applicable only to scalar Green's functions. Parameter discarded.")
 		del kwa['cov_tau']
+	if 'bins' in kwa:
+		logger.warning("compute_matrix_GfReFreq() warning: 'bins' parameter is applicable only to scalar Green's functions. Parameter discarded.")
+		del kwa['bins']
 
-	Gtmp=compute_scalar_GfReFreq(G[0,0], **kwa)
+	if matrix_mode == "rotated":
+		kwa.update(dict(name=name))
+		return compute_rotated_matrix_GfReFreq(G, **kwa)
 
-	if not isinstance(Gtmp, GfReFreq):
+	N = G.target_shape[0]
+
+	rep_element = representative_elements(equiv_elements)
+
+	continued = []
+
+	def continue_element(Gs):
+		if sym_tol is not None:
+			for data_c, GR_c in continued:
+				if is_equivalent(Gs.data, data_c, sym_tol):
+					return GR_c
+		GR_s = compute_scalar_GfReFreq(Gs, **kwa)
+		if isinstance(GR_s, GfReFreq) and sym_tol is not None:
+			continued.append((Gs.data, GR_s))
+		return GR_s
+
+	archived = {}
+	if archive_file and restart:
+		t0 = time.perf_counter()
+		archived = load_archived_results(archive_file, archive_group)
+		report_phase(on_event, "archive", t0, n_elements=len(archived))
+		if len(archived):
+			logger.info(f"{len(archived)} elements loaded from {archive_file}")
+
+	grid_set = (len(output_grid_params)==3 or 'output_mesh' in kwa)
+
+	if "0_0" in archived:
+		Gtmp = archived["0_0"]
+	else:
+		Gtmp=compute_scalar_GfReFreq(G[0,0], **kwa)
+
+	if not isinstance(Gtmp, Gf):
 		return None
 
+	if grid_set and sym_tol is not None:
+		continued.append((G[0,0].data, Gtmp))
+
 	n_freq = len(Gtmp.mesh)
 
-	if len(output_grid_params)!=3:
+	if not grid_set:
 		step=(Gtmp.mesh.w_max-Gtmp.mesh.w_min)/(n_freq-1)
 		output_grid_params = [Gtmp.mesh.w_min, step, Gtmp.mesh.w_max]
 		kwa.update(dict(output_grid_params=output_grid_params))
 
 	GM=GfReFreq(target_shape=G.target_shape, window = (Gtmp.mesh.w_min, Gtmp.mesh.w_max), n_points = n_freq, name=name)
 
-	N = G.target_shape[0]
-
 	for l in range(N):
-		Gtmp=compute_scalar_GfReFreq(G[l, l], **kwa)
-		if not isinstance(Gtmp, GfReFreq):
-			return None
-		GM[l, l]=Gtmp
-		print(f"G[{l}, {l}] computed")
-		if save_G:
-			with HA(f"G_Re_Freq_{l}_{l}.h5", 'w') as A:
-				A['G'] = GM[l, l]
-
+		if (l, l) in rep_element:
+			continue
+		if f"{l}_{l}" in archived:
+			GM.data[:, l, l] = archived[f"{l}_{l}"].data
+			logger.info(f"G[{l}, {l}] loaded")
+			continue
+		if l==0 and grid_set:
+			GM.data[:, 0, 0] = Gtmp.data
+		else:
+			Gtmp=continue_element(G[l, l])
+			if not isinstance(Gtmp, GfReFreq):
+				return None
+			GM.data[:, l, l] = Gtmp.data
+		logger.info(f"G[{l}, {l}] computed")
+		if archive_file:
+			t0 = time.perf_counter()
+			archive_results(archive_file, archive_group, {f"{l}_{l}": GM[l, l]})
+			report_phase(on_event, "archive", t0, element=(l, l))
+
+	for el, el0 in rep_element.items():
+		if el[0]==el[1]:
+			GM.data[:, el[0], el[0]] = GM.data[:, el0[0], el0[0]]
+			logger.info(f"G[{el[0]}, {el[0]}] copied from G[{el0[0]}, {el0[0]}]")
+
+	# upper triangle pairs (l,m) to compute
+	ind_l, ind_m = np.triu_indices(N, 1)
+	keep = np.array([(l, m) not in rep_element for l, m in zip(ind_l, ind_m)], dtype=bool)
+	for p in range(len(ind_l)):
+		l = ind_l[p]
+		m = ind_m[p]
+		if keep[p] and f"{l}_{m}" in archived and (inv_sym or f"{m}_{l}" in archived):
+			GM.data[:, l, m] = archived[f"{l}_{m}"].data
+			if inv_sym:
+				GM.data[:, m, l] = archived[f"{l}_{m}"].data
+			else:
+				GM.data[:, m, l] = archived[f"{m}_{l}"].data
+			logger.info(f"G[{l}, {m}] loaded")
+			keep[p] = False
+	del archived
+	ind_l = ind_l[keep]
+	ind_m = ind_m[keep]
+	N_pairs = len(ind_l)
+
+	# combinations of all pairs, with shape (N_pairs, number of Matsubara frequencies or times)
+	t0 = time.perf_counter()
+	G_ll = G.data[:, ind_l, ind_l].T
+	G_lm = G.data[:, ind_l, ind_m].T
+	G_ml = G.data[:, ind_m, ind_l].T
+	G_mm = G.data[:, ind_m, ind_m].T
 	if not inv_sym:
-		for l in range(N):
-			for m in range(l+1,N):
-				GO=G[l,l]+mu*G[l,m]+mu*G[m,l]+mu*mu*G[m,m]
-				Gtmp = compute_scalar_GfReFreq(GO, **kwa)
-				if not isinstance(Gtmp, GfReFreq):
-					return None
-				GOR = Gtmp
-				GP=G[l,l]-1j*nu*G[l,m]+1j*nu*G[m,l]+nu*nu*G[m,m]
-				Gtmp = compute_scalar_GfReFreq(GP, **kwa)
-				if not isinstance(Gtmp, GfReFreq):
+		GO_stack = G_ll + mu*G_lm + mu*G_ml + mu*mu*G_mm
+		GP_stack = G_ll - 1j*nu*G_lm + 1j*nu*G_ml + nu*nu*G_mm
+	else:
+		GO_stack = G_ll + 2*mu*G_lm + mu*mu*G_mm
+	del G_ll, G_lm, G_ml, G_mm
+	report_phase(on_event, "matrix assembly", t0, n_pairs=N_pairs)
+
+	if low_memory or archive_file:
+		# each pair is assembled directly into GM, so that only one continued combination is kept at a time
+		for p in range(N_pairs):
+			l = ind_l[p]
+			m = ind_m[p]
+			GOR = continue_element(scalar_Gf_from_data(G, GO_stack[p]))
+			if not isinstance(GOR, GfReFreq):
+				return None
+			if not inv_sym:
+				GPR = continue_element(scalar_Gf_from_data(G, GP_stack[p]))
+				if not isinstance(GPR, GfReFreq):
 					return None
-				GPR = Gtmp
-				R=GOR-GM[l,l]-mu*mu*GM[m,m]
-				S=GPR-GM[l,l]-nu*nu*GM[m, m]
-				GM[l,m]=(R/mu+1j*S/nu)/2
-				GM[m,l]=(R/mu-1j*S/nu)/2
-				print(f"G[{l}, {m}] computed")
-				print(f"G[{m}, {l}] computed")
-				if save_G:
-					with HA(f"G_Re_Freq_{l}_{m}.h5", 'w') as A:
-						A['G'] = GM[l, m]
-					with HA(f"G_Re_Freq_{m}_{l}.h5", 'w') as A:
-						A['G'] = GM[m, l]
+			t0 = time.perf_counter()
+			R = GOR.data - GM.data[:, l, l] - mu*mu*GM.data[:, m, m]
+			if not inv_sym:
+				S = GPR.data - GM.data[:, l, l] - nu*nu*GM.data[:, m, m]
+				GM.data[:, l, m] = (R/mu + 1j*S/nu)/2
+				GM.data[:, m, l] = (R/mu - 1j*S/nu)/2
+				del S, GPR
+			else:
+				GM.data[:, l, m] = R/(2*mu)
+				GM.data[:, m, l] = R/(2*mu)
+			del GOR, R
+			report_phase(on_event, "matrix assembly", t0, element=(l, m))
+			if archive_file:
+				t0 = time.perf_counter()
+				if inv_sym:
+					archive_results(archive_file, archive_group, {f"{l}_{m}": GM[l, m]})
+				else:
+					archive_results(archive_file, archive_group, {f"{l}_{m}": GM[l, m], f"{m}_{l}": GM[m, l]})
+				report_phase(on_event, "archive", t0, element=(l, m))
 	else:
-		for l in range(N):
-			for m in range(l+1,N):
-				GO=G[l,l]+2*mu*G[l,m]+mu*mu*G[m,m]
-				Gtmp = compute_scalar_GfReFreq(GO, **kwa)
+		GOR_stack = np.zeros((N_pairs, n_freq), dtype=complex)
+		if not inv_sym:
+			GPR_stack = np.zeros((N_pairs, n_freq), dtype=complex)
+
+		for p in range(N_pairs):
+			Gtmp = continue_element(scalar_Gf_from_data(G, GO_stack[p]))
+			if not isinstance(Gtmp, GfReFreq):
+				return None
+			GOR_stack[p] = Gtmp.data
+			if not inv_sym:
+				Gtmp = continue_element(scalar_Gf_from_data(G, GP_stack[p]))
 				if not isinstance(Gtmp, GfReFreq):
 					return None
-				GOR = Gtmp
-				GM[l,m]=(GOR-GM[l,l]-mu*mu*GM[m,m])/(2*mu)
-				GM[m,l]=GM[l, m]
-				print(f"G[{l}, {m}] computed")
-				if save_G:
-					with HA(f"G_Re_Freq_{l}_{m}.h5", 'w') as A:
-						A['G'] = GM[l,m]
+				GPR_stack[p] = Gtmp.data
+
+		# off-diagonal elements of all pairs, with shape (n_freq, N_pairs)
+		t0 = time.perf_counter()
+		R = GOR_stack.T - GM.data[:, ind_l, ind_l] - mu*mu*GM.data[:, ind_m, ind_m]
+		if not inv_sym:
+			S = GPR_stack.T - GM.data[:, ind_l, ind_l] - nu*nu*GM.data[:, ind_m, ind_m]
+			GM.data[:, ind_l, ind_m] = (R/mu + 1j*S/nu)/2
+			GM.data[:, ind_m, ind_l] = (R/mu - 1j*S/nu)/2
+		else:
+			GM.data[:, ind_l, ind_m] = R/(2*mu)
+			GM.data[:, ind_m, ind_l] = R/(2*mu)
+		report_phase(on_event, "matrix assembly", t0, n_pairs=N_pairs)
+
+	for l, m in zip(ind_l, ind_m):
+		logger.info(f"G[{l}, {m}] computed")
+		if not inv_sym:
+			logger.info(f"G[{m}, {l}] computed")
+
+	for el, el0 in rep_element.items():
+		if el[0]!=el[1]:
+			l, m = el
+			l0, m0 = el0
+			GM.data[:, l, m] = GM.data[:, l0, m0]
+			GM.data[:, m, l] = GM.data[:, m0, l0]
+			logger.info(f"G[{l}, {m}] copied from G[{l0}, {m0}]")
+			logger.info(f"G[{m}, {l}] copied from G[{m0}, {l0}]")
+
+	return GM
+
+
+def compute_rotated_matrix_GfReFreq(G, **kwa):
+	"""
+	Used by compute_matrix_GfReFreq() when matrix_mode="rotated". G is rotated to the eigenbasis of the hermitian matrix
+	sum_n G_n G_n^dagger, where G_n is the value of G at the n-th Matsubara frequency or time, and only the diagonal
+	elements in that basis are continued. The result is then rotated back to the original basis. This approximation
+	neglects the off-diagonal part of G in that basis, so that None is returned if its relative norm exceeds
+	tol_off_diag_rotated.
+	"""
+	from triqs.gf import GfReFreq
+
+	output_grid_params = []
+	if 'output_grid_params' in kwa:
+		output_grid_params = kwa['output_grid_params']
+	name = "$G^R$"
+	if 'name' in kwa:
+		name=kwa['name']
+		kwa['name']=''
+	on_event = None
+	if 'on_event' in kwa:
+		on_event = kwa['on_event']
+
+	N = G.target_shape[0]
+
+	t0 = time.perf_counter()
+	C = np.einsum('nij,nkj->ik', G.data, G.data.conj())
+	C = (C + C.conj().T)/2
+	eig_val, U = np.linalg.eigh(C)
+
+	G_rot = np.einsum('ki,nkl,lj->nij', U.conj(), G.data, U)
+
+	G_rot_diag = np.einsum('nii->ni', G_rot)
+	off_diag_norm = np.linalg.norm(G_rot - np.einsum('ni,ij->nij', G_rot_diag, np.eye(N)))
+	rel_off_diag = off_diag_norm/np.linalg.norm(G_rot)
+	del G_rot
+	if rel_off_diag > tol_off_diag_rotated:
+		logger.error(f"compute_rotated_matrix_GfReFreq(): G is not diagonal in a frequency independent basis. The relative norm of the off-diagonal part in that basis is {rel_off_diag:.2e}, larger than tol_off_diag_rotated={tol_off_diag_rotated:.1e}. Use matrix_mode=\"elements\".")
+		return None
+	report_phase(on_event, "matrix assembly", t0, shape=G.target_shape)
+
+	Gtmp = compute_scalar_GfReFreq(scalar_Gf_from_data(G, G_rot_diag[:, 0]), **kwa)
+	if not isinstance(Gtmp, GfReFreq):
+		return None
+
+	n_freq = len(Gtmp.mesh)
+
+	if len(output_grid_params)!=3 and 'output_mesh' not in kwa:
+		step=(Gtmp.mesh.w_max-Gtmp.mesh.w_min)/(n_freq-1)
+		output_grid_params = [Gtmp.mesh.w_min, step, Gtmp.mesh.w_max]
+		kwa.update(dict(output_grid_params=output_grid_params))
+
+	g_diag = np.zeros((n_freq, N), dtype=complex)
+	g_diag[:, 0] = Gtmp.data
+	logger.info("G[0, 0] computed in the diagonal basis")
+
+	for l in range(1,N):
+		Gtmp = compute_scalar_GfReFreq(scalar_Gf_from_data(G, G_rot_diag[:, l]), **kwa)
+		if not isinstance(Gtmp, GfReFreq):
+			return None
+		g_diag[:, l] = Gtmp.data
+		logger.info(f"G[{l}, {l}] computed in the diagonal basis")
+
+	t0 = time.perf_counter()
+	GM=GfReFreq(target_shape=G.target_shape, window = (Gtmp.mesh.w_min, Gtmp.mesh.w_max), n_points = n_freq, name=name)
+	GM.data[:] = np.einsum('ik,wk,jk->wij', U, g_diag, U.conj())
+	report_phase(on_event, "matrix assembly", t0, shape=G.target_shape)
 
 	return GM
 
@@ -326,15 +778,45 @@ def compute_scalar_GfReFreq(G, **kwa):
 	"""
 	Used by compute_GfReFreq() and compute_matrix_GfReFreq() to compute a scalar GfReFreq object from a scalar Matsubara function G.
 	"""
+	from triqs.gf import Gf, GfImFreq, GfImTime, GfReFreq, MeshImTime
 
 	if not isinstance(G,Gf) and not isinstance(G,GfImFreq) and not isinstance(G,GfImTime):
-		print("compute_scalar_GfReFreq(): input type " + str(G.__class__) + " not accepted. Only objects of types Gf, GfImFreq or GfImTime are accepted.")
+		logger.error("compute_scalar_GfReFreq(): input type " + str(G.__class__) + " not accepted. Only objects of types Gf, GfImFreq or GfImTime are accepted.")
 		return None
 
 	ERR = None
 	if 'ERR' in kwa:
 		ERR = kwa['ERR']
 
+	bins = None
+	if 'bins' in kwa:
+		bins = kwa['bins']
+		del kwa['bins']
+	rebin = 1
+	if 'rebin' in kwa:
+		rebin = kwa['rebin']
+	bins_chunk = 1000
+	if 'bins_chunk' in kwa:
+		bins_chunk = kwa['bins_chunk']
+
+	work_dir = "."
+	if 'work_dir' in kwa:
+		work_dir = kwa['work_dir']
+
+	output_mesh = None
+	if 'output_mesh' in kwa:
+		output_mesh = kwa['output_mesh']
+		del kwa['output_mesh']
+	as_array = False
+	if 'as_array' in kwa:
+		as_array = kwa['as_array']
+		del kwa['as_array']
+
+	if 'param_set' in kwa:
+		param_set = kwa['param_set']
+	else:
+		param_set = ParameterSet(kwa)
+
 	name = "$G^R$"
 	if 'name' in kwa:
 		name = kwa['name']
@@ -366,17 +848,42 @@ def compute_scalar_GfReFreq(G, **kwa):
 			kwa.update(dict(col_Gi=0))
 
 	if len(G.target_shape):
-		print("compute_scalar_GfReFreq(): the Green function must be scalar")
+		logger.error("compute_scalar_GfReFreq(): the Green function must be scalar")
 		return None
 
 	cmd = [OME_cmd]
 
 	if not save_figures_data:
 		cmd = cmd + ["-np"]
+	elif 'figures_bundle' in kwa and kwa['figures_bundle']:
+		cmd = cmd + ["-fb"]
+	elif path.exists(path.join(work_dir, figs_bundle_file_name)):
+		os.remove(path.join(work_dir, figs_bundle_file_name))
 
 	if not interactive_mode:
 		cmd = cmd + ["-ni"]
 
+	quiet = False
+	if 'quiet' in kwa and kwa['quiet']:
+		if interactive_mode:
+			logger.warning("compute_scalar_GfReFreq() warning: 'quiet' parameter is ignored in interactive mode")
+		else:
+			quiet = True
+	if quiet:
+		cmd = cmd + ["-q", "-e"]
+
+	on_event = None
+	if 'on_event' in kwa:
+		on_event = kwa['on_event']
+
+	engine_stats = None
+	if 'engine_stats' in kwa:
+		if isinstance(kwa['engine_stats'],list):
+			engine_stats = kwa['engine_stats']
+			cmd = cmd + ["-s"]
+		else:
+			logger.warning("compute_scalar_GfReFreq() warning: 'engine_stats' parameter must be a list")
+
 	# if not path.exists(params_file):
 	# 	create_params_file(False)
 	
@@ -390,15 +897,54 @@ def compute_scalar_GfReFreq(G, **kwa):
 
 	error_provided = isinstance(ERR, np.ndarray)
 
-	if not path.exists(other_params_file):
-		pf = open(other_params_file, "w")
-		for key, val in OmegaMaxEnt_other_params.items():
-			v=Other_params_default_values[key]
-			if key in kwa:
-				v=kwa[key]
-			str_tmp=val + " " + str(v)+'\n'
-			pf.write(str_tmp)
-		pf.close()
+	if bins is not None:
+		t0 = time.perf_counter()
+		if error_provided:
+			logger.warning("compute_scalar_GfReFreq() warning: 'ERR' parameter is ignored when 'bins' is provided")
+			error_provided = False
+		if len(bins.shape)!=2 or bins.shape[1]!=len(G.mesh):
+			logger.error("compute_scalar_GfReFreq(): the bins must be a 2D array with one bin per row and one column per point of the mesh of G.")
+			return None
+		if bins.shape[0]//rebin<2:
+			logger.error("compute_scalar_GfReFreq(): at least two bins are required after rebinning.")
+			return None
+		if bins.shape[0]%rebin:
+			logger.warning(f"compute_scalar_GfReFreq() warning: the last {bins.shape[0]%rebin} bins are discarded by the rebinning")
+		if im_t:
+			ind_cov = np.arange(len(G.mesh))
+		else:
+			ind_cov = np.flatnonzero(np.array([w.value.imag for w in G.mesh])>=0)
+		G_mean, cov, n_bins = bins_mean_covariance(bins, ind_cov, not im_t, rebin, bins_chunk)
+		if n_bins<=cov.shape[0]:
+			logger.warning(f"compute_scalar_GfReFreq() warning: the covariance estimated from {n_bins} bins has rank at most {n_bins-1}, smaller than its size {cov.shape[0]}. Set R_cov_eig_min (for example to 1e-12) to discard its zero eigenvalues.")
+		if im_t:
+			save_arma_binary(path.join(work_dir, covar_file_names['cov_tau']), cov)
+			kwa.update(dict(cov_tau=covar_file_names['cov_tau']))
+		else:
+			n = len(ind_cov)
+			save_arma_binary(path.join(work_dir, covar_file_names['cov_re_re']), cov[:n, :n])
+			save_arma_binary(path.join(work_dir, covar_file_names['cov_im_im']), cov[n:, n:])
+			save_arma_binary(path.join(work_dir, covar_file_names['cov_re_im']), cov[:n, n:])
+			kwa.update(dict(cov_re_re=covar_file_names['cov_re_re'], cov_im_im=covar_file_names['cov_im_im'], cov_re_im=covar_file_names['cov_re_im']))
+		G = scalar_Gf_from_data(G, G_mean)
+		report_phase(on_event, "bins statistics", t0, n_bins=n_bins, size=cov.shape[0])
+
+	omega_req = None
+	if output_mesh is not None:
+		omega_req = mesh_frequencies(output_mesh)
+		if not as_array and not is_uniform(omega_req):
+			logger.error("compute_scalar_GfReFreq(): output_mesh must be uniform to build a GfReFreq. Use compute_G_omega() for a non-uniform mesh.")
+			return None
+		msg = check_output_frequencies(omega_req, kwa.get('freq_grid'), work_dir)
+		if msg:
+			logger.error("compute_scalar_GfReFreq(): " + msg)
+			return None
+		np.savetxt(path.join(work_dir, output_grid_file_name), omega_req)
+		kwa.update(dict(output_grid_file=output_grid_file_name))
+
+	param_set.write_other_params(work_dir)
+
+	t0 = time.perf_counter()
 
 	Gr = G.data.real
 	Gi = G.data.imag
@@ -413,7 +959,7 @@ def compute_scalar_GfReFreq(G, **kwa):
 		data_array=np.concatenate((t_mesh,Gr,Gi),axis=1)
 	else:
 		if abs(Gi).max()/abs(Gr).max()>tol_Gi_tau:
-			print("compute_scalar_GfReFreq(): warning, only the real part of imaginary time data is used")
+			logger.warning("compute_scalar_GfReFreq(): warning, only the real part of imaginary time data is used")
 		t_mesh=np.array([[t.value for t in G.mesh]])
 		t_mesh=t_mesh.T
 		Gr = np.array([Gr])
@@ -422,12 +968,12 @@ def compute_scalar_GfReFreq(G, **kwa):
 
 	n_points=data_array.shape[0]
 
-	np.savetxt(file_name,data_array)
+	np.savetxt(path.join(work_dir, file_name),data_array)
 
 	if error_provided:
 		dim_ERR=np.array(ERR.shape)
 		if dim_ERR.max()!=n_points:
-			print("compute_scalar_GfReFreq(): provided error array does not have the same size as the data.")
+			logger.error("compute_scalar_GfReFreq(): provided error array does not have the same size as the data.")
 			return None
 		ERRtmp=ERR
 		if len(ERR.shape)==2:
@@ -444,69 +990,1155 @@ def compute_scalar_GfReFreq(G, **kwa):
 			ERRtmp=np.array([ERR.real,ERR.imag])
 			ERRtmp = ERRtmp.transpose()
 		error_array = np.concatenate((t_mesh, ERRtmp), axis=1)
-		np.savetxt(error_file_name,error_array)
+		np.savetxt(path.join(work_dir, error_file_name),error_array)
 
-	pf = open(params_file, "w")
 	str_tmp = data_str + file_name + '\n'
-	pf.write(str_tmp)
 	if bosonic:
-		str_tmp = boson_str + "yes" + '\n'
-		pf.write(str_tmp)
+		str_tmp = str_tmp + boson_str + "yes" + '\n'
 	if im_t:
-		str_tmp = time_str + "yes" + '\n'
-		pf.write(str_tmp)
+		str_tmp = str_tmp + time_str + "yes" + '\n'
 	if error_provided:
-		str_tmp = err_str + error_file_name + '\n'
-		pf.write(str_tmp)
-
-	for key, val in kwa.items():
-		if key in OmegaMaxEnt_input_params:
-			if isinstance(val, bool):
-				val_str = "no"
-				if val:
-					val_str = "yes"
-			elif isinstance(val, Iterable) and not isinstance(val,str):
-				val_str = ""
-				for elem in val:
-					val_str = val_str + " " + str(elem)
-			else:
-				val_str = str(val)
-			str_tmp = OmegaMaxEnt_input_params[key] + val_str + '\n'
-			pf.write(str_tmp)
-	pf.close()
+		str_tmp = str_tmp + err_str + error_file_name + '\n'
+	with open(path.join(work_dir, params_file), "wb") as pf:
+		pf.write(str_tmp.encode() + param_set.input_bytes(kwa))
+
+	report_phase(on_event, "write input", t0, n_points=n_points)
 
 	# call OmegaMaxEnt
-	rval=sp.call(cmd)
+	t0 = time.perf_counter()
+	if quiet:
+		rval = run_quiet(cmd, work_dir)
+	else:
+		rval = sp.call(cmd, cwd=work_dir)
+	report_phase(on_event, "engine", t0, returncode=rval)
+
+	stats_file = path.join(work_dir, run_stats_file_name)
+	if engine_stats is not None and os.path.exists(stats_file):
+		with open(stats_file) as f:
+			engine_stats.append(json.load(f))
+		os.remove(stats_file)
 
 	if rval:
 		return None
 
 	if im_t:
-		save_Fourier_transform_G_hdf5()
+		t0 = time.perf_counter()
+		save_Fourier_transform_G_hdf5(work_dir)
+		report_phase(on_event, "save Fourier transform", t0)
 
-	G_Re_w_data=None
+	t0 = time.perf_counter()
 	#retrieve the real frequency Green function
-	if os.path.exists(result_file_name):
-		result_file=open(result_file_name,"r")
-		G_Re_w_data=np.loadtxt(result_file)
-		result_file.close()
+	# OmegaMaxEnt adds the noise levels one after the other and the result of the last one is returned
+	G_Re_w_file = final_result_file(result_file_name, work_dir, kwa, error_provided or bins is not None)
+	omega_out, G_Re_w = load_G_Re_omega(G_Re_w_file)
 
-	if os.path.exists(file_name):
-		os.remove(file_name)
+	if os.path.exists(path.join(work_dir, file_name)):
+		os.remove(path.join(work_dir, file_name))
 	if error_provided:
-		if os.path.exists(error_file_name):
-			os.remove(error_file_name)
+		if os.path.exists(path.join(work_dir, error_file_name)):
+			os.remove(path.join(work_dir, error_file_name))
+	if bins is not None:
+		for f in covar_file_names.values():
+			if os.path.exists(path.join(work_dir, f)):
+				os.remove(path.join(work_dir, f))
+	if output_mesh is not None and os.path.exists(path.join(work_dir, output_grid_file_name)):
+		os.remove(path.join(work_dir, output_grid_file_name))
+
+	if G_Re_w is None:
+		return None
 
-	if not isinstance(G_Re_w_data,np.ndarray):
+	# OmegaMaxEnt uses its default output grid if the frequencies of output_mesh are outside the range of the spectrum
+	if omega_req is not None and not same_frequencies(omega_out, omega_req):
+		logger.error(f"compute_scalar_GfReFreq(): the frequencies of output_mesh, from {omega_req[0]} to {omega_req[-1]}, must be inside the range where the spectrum is defined. OmegaMaxEnt returned the result from {omega_out[0]} to {omega_out[-1]} instead.")
 		return None
 
-	GR_omega=GfReFreq(target_shape=(),window = (G_Re_w_data[0,0], G_Re_w_data[-1,0]), n_points = G_Re_w_data.shape[0], name = name)
+	report_phase(on_event, "read result", t0, n_freq=len(omega_out))
+
+	if as_array:
+		return G_Re_w
 
-	GR_omega.data.real = G_Re_w_data[:, 1]
-	GR_omega.data.imag = G_Re_w_data[:, 2]
+	t0 = time.perf_counter()
+	GR_omega=GfReFreq(target_shape=(),window = (omega_out[0], omega_out[-1]), n_points = len(omega_out), name = name)
+	GR_omega.data[:] = G_Re_w
+	report_phase(on_event, "GfReFreq construction", t0)
 
 	return GR_omega
 
+def compute_G_omega(G, omega, **kwa):
+	"""
+	Compute the retarded function of the scalar Matsubara function G at the real frequencies omega using the program
+	OmegaMaxEnt, and return it as a complex numpy array, or None if the continuation failed.
+
+	omega is a MeshReFreq or an increasing array of frequencies, which can be non-uniform and cover only a part of the
+	spectrum. OmegaMaxEnt evaluates the result only at those frequencies and the array is read from its binary output,
+	so that it can be assigned to the data of a Gf in one slice, for example
+	GR.data[:, l, l] = compute_G_omega(G[l, l], GR.mesh). The frequencies must be inside the range where the spectrum
+	is defined. Otherwise, None is returned.
+
+	The other parameters are the ones of compute_GfReFreq() for a scalar function.
+	"""
+	kwa.update(dict(output_mesh=omega, as_array=True))
+	return compute_scalar_GfReFreq(G, **kwa)
+
+def compute_GfReFreq_ensemble(G, bins, **kwa):
+	"""
+	Compute the continuations of an ensemble of resamples of the Monte Carlo bins of a scalar Matsubara function with
+	OmegaMaxEnt, several at a time, and return a ContinuationEnsemble object containing the continuation of the mean
+	of the bins, the mean spectral function of the resamples and its percentile bands.
+
+	The covariance of the mean is computed once from all the bins and used for all the resamples. The continuation of
+	the mean of all the bins is computed first, and its output grid and real frequency grid are used for all the
+	resamples. The other preprocessing steps, in particular the moments, the kernel and its singular value
+	decomposition, are still done by OmegaMaxEnt for each resample: the kernel in the basis of the covariance
+	eigenvectors includes the moments fitted from each resample and the signs of the projections of its data, and
+	nearly all the singular value decompositions are done in the minimization, at each Newton iteration, for the
+	current spectrum. Only the kernel on the shared grids is the same for all the resamples, and its computation is a
+	small part of a continuation (about 3% for the reference benchmark input). Each continuation runs in its own
+	subdirectory of ensemble_dir.
+
+	Parameters:
+	-----------
+	G:	Gf, GfImFreq or GfImTime scalar or 1x1 matrix object.
+		Defines the mesh of the data. Its data is not used.
+
+	bins:	2D array-like object, for example a numpy array, a numpy memmap or an h5py dataset.
+		Monte Carlo bins of G, one bin per row, with the same number of columns as there are points in the mesh of G.
+		The bins are read by chunks of bins_chunk bins, after averaging groups of rebin consecutive bins, as with the
+		bins parameter of compute_GfReFreq().
+
+	n_samples:	Optional integer. Default: 100
+			Number of resamples.
+
+	resampling:	Optional string. Default: "bootstrap"
+			If resampling="bootstrap", each bin enters a resample with a weight drawn from a Poisson distribution of
+			mean 1 (Poisson bootstrap), which allows to read the bins by chunks. If resampling="jackknife", the bins
+			are divided in n_samples blocks of consecutive bins and each resample leaves out one block.
+
+	n_jobs:		Optional integer. Default: number of CPUs
+			Number of continuations computed at the same time.
+
+	percentiles:	Optional list of floats. Default: [2.5, 16, 84, 97.5]
+			Percentiles of the spectral functions of the resamples computed at each frequency.
+
+	seed:		Optional integer. Default: None
+			Seed of the random generator used by the bootstrap.
+
+	ensemble_dir:	Optional string. Default: "OmegaMaxEnt_ensemble"
+			Directory in which the continuations are computed, relative to work_dir.
+
+	work_dir:	Optional string. Default: "."
+			Parent directory of ensemble_dir.
+
+	keep_ensemble_dir:	Optional boolean. Default: False
+				If False, ensemble_dir is removed at the end, and the directory of each resample as soon as
+				its continuation is done.
+
+	The other parameters are those of compute_GfReFreq() for a scalar G. interactive_mode is always False and quiet
+	is True by default. The input files parameters, such as freq_grid or def_model_file, are relative to the directory
+	of each continuation and should be absolute paths.
+	"""
+	from triqs.gf import Gf, GfImFreq, GfImTime, GfReFreq, MeshImTime
+	from concurrent.futures import ThreadPoolExecutor
+
+	if not isinstance(G,Gf) and not isinstance(G,GfImFreq) and not isinstance(G,GfImTime):
+		logger.error("compute_GfReFreq_ensemble(): input type " + str(G.__class__) + " not accepted. Only objects of types Gf, GfImFreq or GfImTime are accepted.")
+		return None
+
+	if len(G.target_shape)==2 and G.target_shape[0]==1 and G.target_shape[1]==1:
+		G = G[0, 0]
+	elif len(G.target_shape):
+		logger.error("compute_GfReFreq_ensemble(): the Green function must be scalar or a 1x1 matrix")
+		return None
+
+	n_samples = 100
+	if 'n_samples' in kwa:
+		n_samples = kwa['n_samples']
+		del kwa['n_samples']
+	resampling = "bootstrap"
+	if 'resampling' in kwa:
+		if kwa['resampling'] in ["bootstrap", "jackknife"]:
+			resampling = kwa['resampling']
+		else:
+			logger.warning("compute_GfReFreq_ensemble() warning: 'resampling' parameter must be \"bootstrap\" or \"jackknife\"")
+		del kwa['resampling']
+	n_jobs = os.cpu_count()
+	if 'n_jobs' in kwa:
+		n_jobs = kwa['n_jobs']
+		del kwa['n_jobs']
+	percentiles = [2.5, 16, 84, 97.5]
+	if 'percentiles' in kwa:
+		percentiles = kwa['percentiles']
+		del kwa['percentiles']
+	seed = None
+	if 'seed' in kwa:
+		seed = kwa['seed']
+		del kwa['seed']
+	work_dir = "."
+	if 'work_dir' in kwa:
+		work_dir = kwa['work_dir']
+		del kwa['work_dir']
+	ensemble_dir = "OmegaMaxEnt_ensemble"
+	if 'ensemble_dir' in kwa:
+		ensemble_dir = kwa['ensemble_dir']
+		del kwa['ensemble_dir']
+	ensemble_dir = path.abspath(path.join(work_dir, ensemble_dir))
+	keep_ensemble_dir = False
+	if 'keep_ensemble_dir' in kwa:
+		keep_ensemble_dir = kwa['keep_ensemble_dir']
+		del kwa['keep_ensemble_dir']
+	rebin = 1
+	if 'rebin' in kwa:
+		rebin = kwa['rebin']
+		del kwa['rebin']
+	bins_chunk = 1000
+	if 'bins_chunk' in kwa:
+		bins_chunk = kwa['bins_chunk']
+		del kwa['bins_chunk']
+	on_event = None
+	if 'on_event' in kwa:
+		on_event = kwa['on_event']
+
+	if 'ERR' in kwa:
+		logger.warning("compute_GfReFreq_ensemble() warning: the covariance is computed from the bins. 'ERR' parameter discarded.")
+		del kwa['ERR']
+	if 'bins' in kwa:
+		del kwa['bins']
+	if 'save_G' in kwa:
+		del kwa['save_G']
+
+	kwa.update(dict(interactive_mode=False, save_figures_data=False))
+	if 'quiet' not in kwa:
+		kwa.update(dict(quiet=True))
+
+	# the callbacks are called from several threads
+	if on_event is not None:
+		lock = threading.Lock()
+		def on_event_locked(phase, duration, metadata):
+			with lock:
+				on_event(phase, duration, metadata)
+		kwa.update(dict(on_event=on_event_locked))
+
+	im_t = isinstance(G.mesh, MeshImTime)
+
+	if len(bins.shape)!=2 or bins.shape[1]!=len(G.mesh):
+		logger.error("compute_GfReFreq_ensemble(): the bins must be a 2D array with one bin per row and one column per point of the mesh of G.")
+		return None
+	n_bins = bins.shape[0]//rebin
+	if resampling == "jackknife" and n_samples > n_bins:
+		logger.warning(f"compute_GfReFreq_ensemble() warning: the number of jackknife samples is limited to the number of bins, {n_bins}")
+		n_samples = n_bins
+	if n_bins<2 or n_samples<2:
+		logger.error("compute_GfReFreq_ensemble(): at least two bins and two samples are required.")
+		return None
+
+	if not path.exists(ensemble_dir):
+		os.makedirs(ensemble_dir)
+
+	t0 = time.perf_counter()
+	if im_t:
+		ind_cov = np.arange(len(G.mesh))
+	else:
+		ind_cov = np.flatnonzero(np.array([w.value.imag for w in G.mesh])>=0)
+	G_mean, cov, n_bins = bins_mean_covariance(bins, ind_cov, not im_t, rebin, bins_chunk)
+	if n_bins<=cov.shape[0] and 'R_cov_eig_min' not in kwa:
+		logger.warning(f"compute_GfReFreq_ensemble() warning: the covariance estimated from {n_bins} bins has rank at most {n_bins-1}, smaller than its size {cov.shape[0]}. Set R_cov_eig_min (for example to 1e-12) to discard its zero eigenvalues.")
+	if im_t:
+		cov_files = dict(cov_tau=cov)
+	else:
+		n = len(ind_cov)
+		cov_files = dict(cov_re_re=cov[:n, :n], cov_im_im=cov[n:, n:], cov_re_im=cov[:n, n:])
+	for key, M in cov_files.items():
+		f = path.join(ensemble_dir, covar_file_names[key])
+		save_arma_binary(f, M)
+		kwa[key] = f
+	del cov, cov_files
+	rng = np.random.default_rng(seed)
+	G_samples = bins_resample_means(bins, n_samples, resampling, rebin, bins_chunk, rng)
+	report_phase(on_event, "resampling", t0, n_bins=n_bins, n_samples=n_samples)
+
+	if 'param_set' not in kwa:
+		kwa.update(dict(param_set=ParameterSet(kwa)))
+
+	d = make_work_dir(ensemble_dir, "mean")
+	GR = compute_scalar_GfReFreq(scalar_Gf_from_data(G, G_mean), work_dir=d, **kwa)
+	if not isinstance(GR, GfReFreq):
+		logger.error("compute_GfReFreq_ensemble(): continuation of the mean failed")
+		return None
+
+	share_grids(GR, path.join(d, opt_spectrum_file_name), ensemble_dir, kwa)
+	if not keep_ensemble_dir:
+		shutil.rmtree(d)
+	kwa.update(dict(name=''))
+
+	def continue_sample(s):
+		d = make_work_dir(ensemble_dir, f"sample_{s}")
+		GR_s = compute_scalar_GfReFreq(scalar_Gf_from_data(G, G_samples[s]), work_dir=d, **kwa)
+		if not keep_ensemble_dir:
+			shutil.rmtree(d)
+		if not isinstance(GR_s, GfReFreq):
+			logger.warning(f"compute_GfReFreq_ensemble() warning: continuation of sample {s} failed")
+			return None
+		logger.info(f"sample {s} computed")
+		return -GR_s.data.imag/pi
+
+	with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+		A_list = list(executor.map(continue_sample, range(n_samples)))
+	A_list = [A for A in A_list if A is not None]
+
+	if not keep_ensemble_dir:
+		shutil.rmtree(ensemble_dir)
+
+	if len(A_list)<2:
+		logger.error("compute_GfReFreq_ensemble(): less than two samples were computed")
+		return None
+
+	t0 = time.perf_counter()
+	A_samples = np.array(A_list)
+	del A_list
+	if resampling == "jackknife":
+		# the spread of the rescaled samples is the jackknife estimate of the error
+		A_mean = A_samples.mean(axis=0)
+		A_samples = A_mean + np.sqrt(A_samples.shape[0] - 1)*(A_samples - A_mean)
+	ens = ContinuationEnsemble(GR, A_samples, percentiles)
+	report_phase(on_event, "ensemble statistics", t0, n_samples=A_samples.shape[0])
+
+	logger.info("ensemble continuation done")
+
+	return ens
+
+def compute_GfReFreq_noise_sweep(G, added_noise, **kwa):
+	"""
+	Compute the continuations of a scalar Matsubara function with several levels of added noise with OmegaMaxEnt,
+	several at a time, and return a NoiseSweep object containing the continuation for each level.
+
+	This replaces the sequential loop over the levels done by OmegaMaxEnt when the parameter added_noise of
+	compute_GfReFreq() contains several values. The first level is continued first, and its output grid and real
+	frequency grid are used for all the other levels, which are then independent. The kernel and its singular value
+	decompositions are computed by OmegaMaxEnt for each level, since the kernel used in the minimization is divided by
+	the errors, which depend on the level, and the singular value decompositions are done at each Newton iteration of
+	the minimization, for the current spectrum. Each level runs in its own subdirectory of sweep_dir.
+
+	Parameters:
+	-----------
+	G:	Gf, GfImFreq or GfImTime scalar or 1x1 matrix object.
+
+	added_noise:	list of floats.
+			Relative errors added to G, one continuation per value.
+
+	n_jobs:		Optional integer. Default: number of CPUs
+			Number of continuations computed at the same time.
+
+	sweep_dir:	Optional string. Default: "OmegaMaxEnt_noise_sweep"
+			Directory in which the continuations are computed, relative to work_dir.
+
+	work_dir:	Optional string. Default: "."
+			Parent directory of sweep_dir.
+
+	keep_sweep_dir:	Optional boolean. Default: False
+			If False, sweep_dir is removed at the end. Otherwise, the results of the level s are kept in the
+			directories OmegaMaxEnt_final_result_err_<s> of sweep_dir/noise_<i>, with i the index of s in added_noise,
+			as with a single run of OmegaMaxEnt.
+
+	The other parameters are those of compute_GfReFreq() for a scalar G. interactive_mode is always False and quiet
+	is True by default. The input files parameters, such as freq_grid or def_model_file, are relative to the directory
+	of each continuation and should be absolute paths.
+	"""
+	from triqs.gf import Gf, GfImFreq, GfImTime, GfReFreq
+	from concurrent.futures import ThreadPoolExecutor
+
+	if not isinstance(G,Gf) and not isinstance(G,GfImFreq) and not isinstance(G,GfImTime):
+		logger.error("compute_GfReFreq_noise_sweep(): input type " + str(G.__class__) + " not accepted. Only objects of types Gf, GfImFreq or GfImTime are accepted.")
+		return None
+
+	if len(G.target_shape)==2 and G.target_shape[0]==1 and G.target_shape[1]==1:
+		G = G[0, 0]
+	elif len(G.target_shape):
+		logger.error("compute_GfReFreq_noise_sweep(): the Green function must be scalar or a 1x1 matrix")
+		return None
+
+	noise_levels = [float(s) for s in np.atleast_1d(added_noise)]
+	if not len(noise_levels) or min(noise_levels)<=0:
+		logger.error("compute_GfReFreq_noise_sweep(): the levels of added noise must be positive")
+		return None
+
+	n_jobs = os.cpu_count()
+	if 'n_jobs' in kwa:
+		n_jobs = kwa['n_jobs']
+		del kwa['n_jobs']
+	work_dir = "."
+	if 'work_dir' in kwa:
+		work_dir = kwa['work_dir']
+		del kwa['work_dir']
+	sweep_dir = "OmegaMaxEnt_noise_sweep"
+	if 'sweep_dir' in kwa:
+		sweep_dir = kwa['sweep_dir']
+		del kwa['sweep_dir']
+	sweep_dir = path.abspath(path.join(work_dir, sweep_dir))
+	keep_sweep_dir = False
+	if 'keep_sweep_dir' in kwa:
+		keep_sweep_dir = kwa['keep_sweep_dir']
+		del kwa['keep_sweep_dir']
+	on_event = None
+	if 'on_event' in kwa:
+		on_event = kwa['on_event']
+
+	# the noise is not added if the errors are provided
+	for key in ['ERR', 'bins', 'cov_re_re', 'cov_im_im', 'cov_re_im', 'cov_tau']:
+		if key in kwa:
+			logger.warning(f"compute_GfReFreq_noise_sweep() warning: the errors are given by the added noise. '{key}' parameter discarded.")
+			del kwa[key]
+	if 'save_G' in kwa:
+		del kwa['save_G']
+
+	kwa.update(dict(interactive_mode=False, save_figures_data=False))
+	if 'quiet' not in kwa:
+		kwa.update(dict(quiet=True))
+
+	# the callbacks are called from several threads
+	if on_event is not None:
+		lock = threading.Lock()
+		def on_event_locked(phase, duration, metadata):
+			with lock:
+				on_event(phase, duration, metadata)
+		kwa.update(dict(on_event=on_event_locked))
+
+	if 'param_set' not in kwa:
+		kwa.update(dict(param_set=ParameterSet(kwa)))
+
+	if not path.exists(sweep_dir):
+		os.makedirs(sweep_dir)
+
+	def continue_level(i, kwa):
+		d = make_work_dir(sweep_dir, f"noise_{i}")
+		GR_i = compute_scalar_GfReFreq(G, work_dir=d, added_noise=noise_levels[i], **kwa)
+		if not isinstance(GR_i, GfReFreq):
+			logger.warning(f"compute_GfReFreq_noise_sweep() warning: continuation with added noise {noise_levels[i]} failed")
+			return None, d
+		logger.info(f"added noise {noise_levels[i]} computed")
+		return GR_i, d
+
+	GR_0, d = continue_level(0, dict(kwa))
+	if GR_0 is None:
+		if not keep_sweep_dir:
+			shutil.rmtree(sweep_dir)
+		return None
+	share_grids(GR_0, path.join(d, noise_level_file(opt_spectrum_file_name, noise_levels[0])), sweep_dir, kwa)
+
+	with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+		GR_list = [GR_0] + [GR_i for GR_i, d in executor.map(lambda i: continue_level(i, kwa), range(1, len(noise_levels)))]
+
+	if not keep_sweep_dir:
+		shutil.rmtree(sweep_dir)
+
+	logger.info("noise sweep done")
+
+	return NoiseSweep(noise_levels, GR_list)
+
+def make_work_dir(parent_dir, sub_dir):
+	"""
+	Used by compute_GfReFreq_ensemble() and compute_GfReFreq_noise_sweep() to create the directory of a continuation in
+	parent_dir. Return its path.
+	"""
+	d = path.join(parent_dir, sub_dir)
+	if not path.exists(d):
+		os.mkdir(d)
+	return d
+
+def share_grids(GR, opt_spectrum_file, shared_dir, kwa):
+	"""
+	Used by compute_GfReFreq_ensemble() and compute_GfReFreq_noise_sweep() to set in the parameters kwa the output grid
+	of the continuation GR and the real frequency grid of its optimal spectrum opt_spectrum_file, saved in shared_dir,
+	so that the following continuations use the same grids and skip the construction of the grid. The kernel is still
+	computed by each continuation.
+	"""
+	if 'output_grid_params' not in kwa or len(kwa['output_grid_params'])!=3:
+		n_freq = len(GR.mesh)
+		step = (GR.mesh.w_max - GR.mesh.w_min)/(n_freq - 1)
+		kwa.update(dict(output_grid_params=[GR.mesh.w_min, step, GR.mesh.w_max]))
+	grid_free = 'freq_grid' not in kwa and 'initial_spectrum' not in kwa and not kwa.get('use_parameterized_grid', False)
+	if grid_free and path.exists(opt_spectrum_file):
+		grid = np.loadtxt(opt_spectrum_file)[:, 0]
+		f = path.join(shared_dir, ensemble_grid_file_name)
+		np.savetxt(f, grid)
+		kwa.update(dict(freq_grid=f))
+
+def noise_level_file(file_name, noise_level):
+	"""
+	Used by compute_scalar_GfReFreq() and compute_GfReFreq_noise_sweep() to get the path of the output file file_name
+	of OmegaMaxEnt for the level of added noise noise_level, in the directory with the suffix of that level.
+	"""
+	res_dir, res_file = path.split(file_name)
+	return path.join(res_dir + noise_dir_suffix_format.format(noise_level), res_file)
+
+def mesh_frequencies(mesh):
+	"""
+	Used by compute_scalar_GfReFreq() to get the frequencies of output_mesh, a MeshReFreq or an array of frequencies.
+	"""
+	from triqs.gf import MeshReFreq
+	if isinstance(mesh, MeshReFreq):
+		return np.array([w.value for w in mesh])
+	return np.asarray(mesh, dtype=float)
+
+def is_uniform(omega):
+	"""
+	Used by compute_scalar_GfReFreq() to check that the frequencies omega form a uniform grid.
+	"""
+	if len(omega)<2:
+		return False
+	step = np.diff(omega)
+	return np.abs(step - step[0]).max() <= tol_uniform_mesh*abs(step[0])
+
+def check_output_frequencies(omega, freq_grid=None, work_dir="."):
+	"""
+	Used by compute_scalar_GfReFreq() to check the frequencies omega of output_mesh before OmegaMaxEnt is called. They
+	must be finite and increasing and, if the real frequency grid of the computation is given in the file freq_grid,
+	relative to work_dir, strictly inside that grid. Otherwise, the range of the spectrum is only known to OmegaMaxEnt,
+	and the frequencies of its result are compared to omega with same_frequencies(). Return an error message, or None.
+	"""
+	if omega.ndim!=1 or len(omega)<2:
+		return "output_mesh must contain at least two frequencies"
+	if not np.isfinite(omega).all():
+		return "the frequencies of output_mesh must be finite"
+	if (np.diff(omega)<=0).any():
+		return "the frequencies of output_mesh must be increasing"
+	if freq_grid is not None and path.exists(path.join(work_dir, freq_grid)):
+		grid = np.loadtxt(path.join(work_dir, freq_grid), ndmin=2)[:, 0]
+		# the grid of a symmetric spectrum can contain only the positive frequencies
+		w_min = grid[0] if grid[0]<0 else -grid[-1]
+		if omega[0]<=w_min or omega[-1]>=grid[-1]:
+			return f"the frequencies of output_mesh, from {omega[0]} to {omega[-1]}, must be inside the range of the real frequency grid {freq_grid}, from {w_min} to {grid[-1]}"
+	return None
+
+def same_frequencies(omega_out, omega):
+	"""
+	Used by compute_scalar_GfReFreq() to check that the frequencies omega_out of the result of OmegaMaxEnt are those of
+	output_mesh, omega, within tol_output_mesh times the smallest step of omega.
+	"""
+	if omega_out is None or len(omega_out)!=len(omega):
+		return False
+	return np.abs(omega_out - omega).max() <= tol_output_mesh*np.diff(omega).min()
+
+def load_G_Re_omega(result_file):
+	"""
+	Used by compute_scalar_GfReFreq() to read the real frequency Green function written by OmegaMaxEnt in result_file.
+	Its copy in armadillo binary format is read if it exists and is not older than result_file, since OmegaMaxEnt
+	writes it after result_file and an older copy comes from a previous run. Return the frequencies and the complex
+	values, or None, None if there is no result.
+	"""
+	bin_file = path.splitext(result_file)[0] + ".bin"
+	if path.exists(bin_file) and (not path.exists(result_file) or path.getmtime(bin_file) >= path.getmtime(result_file)):
+		G_save = load_arma_binary(bin_file)
+		return G_save[:, 0].real, G_save[:, 1]
+	if path.exists(result_file):
+		data = np.loadtxt(result_file)
+		return data[:, 0], data[:, 1] + 1j*data[:, 2]
+	return None, None
+
+def run_quiet(cmd, work_dir="."):
+	"""
+	Used by compute_scalar_GfReFreq() to run OmegaMaxEnt in quiet mode in the directory work_dir and pass the events it prints as JSON lines to
+	the logger, with the event dictionary in the attribute "event" of the log record. The alpha values are logged at
+	level DEBUG, the start and end of the run at level INFO and the errors at level ERROR. Return the exit status.
+	"""
+	proc = sp.Popen(cmd, stdout=sp.PIPE, universal_newlines=True, cwd=work_dir)
+	for line in proc.stdout:
+		line = line.strip()
+		try:
+			ev = json.loads(line)
+		except ValueError:
+			if line:
+				logger.debug(line)
+			continue
+		if not (isinstance(ev, dict) and 'event' in ev):
+			# a printed number or list is also valid JSON
+			logger.debug(line)
+			continue
+		if ev['event'] == "alpha":
+			logger.debug(f"alpha {ev['index']}: {ev['alpha']:.4e}, Q: {ev['Q']:.4e}, S: {ev['S']:.4e}, chi2: {ev['chi2']:.4e}", extra=dict(event=ev))
+		elif ev['event'] == "error":
+			logger.error(f"OmegaMaxEnt error: {ev['message']}", extra=dict(event=ev))
+		elif ev['event'] == "start":
+			logger.info("OmegaMaxEnt started", extra=dict(event=ev))
+		elif ev['event'] == "finish":
+			logger.info(f"OmegaMaxEnt finished, {ev['n_alpha']} values of alpha computed", extra=dict(event=ev))
+		else:
+			logger.debug(line, extra=dict(event=ev))
+	return proc.wait()
+
+def report_phase(on_event, phase, t0, **metadata):
+	"""
+	Used by compute_GfReFreq() and the functions it calls to report the duration of the phase started at time t0 (from
+	time.perf_counter()) to the callback on_event, if it is not None.
+	"""
+	if on_event is not None:
+		on_event(phase, time.perf_counter() - t0, metadata)
+
+class PhaseProfiler:
+	"""
+	Collector of the phase durations reported by compute_GfReFreq(). Pass an instance as on_event=profiler to one or
+	several calls to compute_GfReFreq(), then print profiler.summary().
+
+	The phases are "bins statistics", "write input", "engine" (call to OmegaMaxEnt), "save Fourier transform",
+	"read result", "GfReFreq construction", "matrix assembly" (off-diagonal combinations and assembly of matrix-valued
+	results), "archive" and "save hdf5", and "resampling" and "ensemble statistics" with compute_GfReFreq_ensemble().
+	They do not overlap, except for the phases of the continuations of compute_GfReFreq_ensemble() that run at the
+	same time.
+	"""
+	def __init__(self):
+		self.stats = {}
+
+	def __call__(self, phase, duration, metadata):
+		if phase not in self.stats:
+			self.stats[phase] = dict(calls=0, total=0.0, max=0.0)
+		st = self.stats[phase]
+		st['calls'] = st['calls'] + 1
+		st['total'] = st['total'] + duration
+		st['max'] = max(st['max'], duration)
+
+	def total(self):
+		"""
+		Return the sum of the durations of all the phases.
+		"""
+		return sum(st['total'] for st in self.stats.values())
+
+	def overhead_share(self):
+		"""
+		Return the fraction of the total time spent outside of OmegaMaxEnt.
+		"""
+		total = self.total()
+		if not total:
+			return 0.0
+		return 1 - self.stats.get("engine", dict(total=0.0))['total']/total
+
+	def summary(self):
+		"""
+		Return a table of the number of calls, total, mean and maximum duration, and share of the total time of each
+		phase.
+		"""
+		total = self.total()
+		lines = [f"{'phase':25s} {'calls':>7s} {'total (s)':>11s} {'mean (s)':>11s} {'max (s)':>11s} {'share':>7s}"]
+		for phase, st in sorted(self.stats.items(), key=lambda item: -item[1]['total']):
+			share = st['total']/total if total else 0.0
+			lines.append(f"{phase:25s} {st['calls']:7d} {st['total']:11.4f} {st['total']/st['calls']:11.4f} {st['max']:11.4f} {share:7.1%}")
+		lines.append(f"{'total':25s} {'':7s} {total:11.4f} {'':11s} {'':11s} {'':7s}")
+		lines.append(f"python overhead: {self.overhead_share():.1%}")
+		return "\n".join(lines)
+
+def archive_group_path(A, group, create=True):
+	"""
+	Used by archive_results() and load_archived_results() to access the group of path group (subgroups separated by
+	'/') in the HDF5 archive A. The missing subgroups are created if create is True. Otherwise, None is returned.
+	"""
+	for g in group.split('/'):
+		if g not in A:
+			if not create:
+				return None
+			A.create_group(g)
+		A = A[g]
+	return A
+
+def archive_results(archive_file, group, results):
+	"""
+	Used by compute_GfReFreq() and compute_matrix_GfReFreq() to append the finished elements or blocks in the dictionary
+	results to the HDF5 file archive_file, in the given group.
+	"""
+	from h5 import HDFArchive as HA
+	with HA(archive_file, 'a') as A:
+		Ag = archive_group_path(A, group)
+		for key, val in results.items():
+			Ag[key] = val
+
+def load_archived_results(archive_file, group):
+	"""
+	Used by compute_GfReFreq() and compute_matrix_GfReFreq() to load the elements or blocks already saved in the given
+	group of the HDF5 file archive_file, when restarting a calculation. The file is opened read-only.
+	"""
+	from triqs.gf import Gf
+	from h5 import HDFArchive as HA
+	results = {}
+	if not path.exists(archive_file):
+		return results
+	with HA(archive_file, 'r') as A:
+		Ag = archive_group_path(A, group, create=False)
+		if Ag is None:
+			return results
+		for key in Ag.keys():
+			val = Ag[key]
+			if isinstance(val, Gf):
+				results[key] = val
+	return results
+
+def representative_elements(equiv_elements):
+	"""
+	Used by compute_matrix_GfReFreq() to map each element of the classes of equivalent elements equiv_elements, except
+	the first one of each class, to that first element, its representative. Off-diagonal elements are stored in the
+	upper triangle, with their representative transposed if the element was declared in the lower triangle, so that
+	G[l,m] is copied from the representative and G[m,l] from its transpose.
+	"""
+	rep_element = {}
+	for cl in equiv_elements:
+		cl = [tuple(el) for el in cl]
+		diag = [el[0]==el[1] for el in cl]
+		if any(diag) and not all(diag):
+			logger.warning("compute_matrix_GfReFreq() warning: classes in 'equiv_elements' must contain only diagonal or only off-diagonal elements. Class discarded.")
+			continue
+		el0 = cl[0]
+		for el in cl[1:]:
+			el_rep = el0
+			if el[0] > el[1]:
+				el = (el[1], el[0])
+				el_rep = (el0[1], el0[0])
+			if set(el) != set(el0):
+				rep_element[el] = el_rep
+	return rep_element
+
+def scalar_Gf_from_data(G, data):
+	"""
+	Used by compute_matrix_GfReFreq() to create a scalar Green function on the mesh of G from the array data.
+	"""
+	from triqs.gf import Gf
+	Gs = Gf(mesh=G.mesh, target_shape=[])
+	Gs.data[:] = data
+	return Gs
+
+def is_equivalent(data1, data2, tol, err1=None, err2=None, work_dir="."):
+	"""
+	Used by compute_GfReFreq() and compute_matrix_GfReFreq() to decide if two data arrays are identical within the
+	relative tolerance tol, in which case they are continued only once. If given, the dictionaries of error parameters
+	err1 and err2 must also agree: the error arrays within tol and the covariance files, relative to work_dir, by
+	content.
+	"""
+	if data1.shape != data2.shape:
+		return False
+	scale = max(np.abs(data1).max(), np.abs(data2).max())
+	if np.abs(data1 - data2).max() > tol*scale:
+		return False
+	if not err1 and not err2:
+		return True
+	if err1 is None or err2 is None or set(err1) != set(err2):
+		return False
+	for key, e1 in err1.items():
+		e2 = err2[key]
+		if isinstance(e1, np.ndarray) or isinstance(e2, np.ndarray):
+			if not is_equivalent(np.asarray(e1), np.asarray(e2), tol):
+				return False
+		elif e1 != e2:
+			try:
+				if not filecmp.cmp(path.join(work_dir, e1), path.join(work_dir, e2), shallow=False):
+					return False
+			except OSError:
+				return False
+	return True
+
+def block_error_params(kwa, bl):
+	"""
+	Used by compute_GfReFreq() to get the error parameters of block bl. The parameters given as dictionaries with the
+	block names as keys are replaced by the entry of bl.
+	"""
+	err = {}
+	for key in error_params:
+		if key in kwa:
+			if isinstance(kwa[key], dict):
+				if bl in kwa[key]:
+					err[key] = kwa[key][bl]
+			else:
+				err[key] = kwa[key]
+	return err
+
+class CovarianceAccumulator:
+	"""
+	Mean and covariance of samples of a real vector of size n, accumulated by batches of samples with the pairwise
+	generalization of Welford's algorithm, which is numerically stable. Only the mean and the sum of the squared
+	deviations are stored.
+	"""
+
+	def __init__(self, n):
+		self.count = 0
+		self.mean = np.zeros(n)
+		self.M2 = np.zeros((n, n))
+
+	def add(self, X):
+		"""
+		Add the samples in the rows of the 2D array X.
+		"""
+		nb = X.shape[0]
+		if not nb:
+			return
+		mean_b = X.mean(axis=0)
+		D = X - mean_b
+		delta = mean_b - self.mean
+		count = self.count + nb
+		self.M2 += D.T @ D + np.outer(delta, delta) * (self.count * nb / count)
+		self.mean += delta * (nb / count)
+		self.count = count
+
+	def covariance(self):
+		"""
+		Unbiased estimate of the covariance of the samples.
+		"""
+		return self.M2 / (self.count - 1)
+
+def bins_mean_covariance(bins, ind_cov, complex_data, rebin=1, bins_chunk=1000):
+	"""
+	Used by compute_scalar_GfReFreq() to compute the mean of the bins (one bin per row of bins) and the covariance of
+	that mean for the columns ind_cov, reading at most bins_chunk bins at once. Groups of rebin consecutive bins are
+	averaged first. If complex_data is True, the covariance is the one of the real parts of the columns ind_cov
+	followed by their imaginary parts. Return the mean, the covariance and the number of bins after rebinning.
+	"""
+	n_bins = bins.shape[0] // rebin
+	chunk = max(1, bins_chunk // rebin) * rebin
+	total = 0
+	acc = None
+	for i0 in range(0, n_bins * rebin, chunk):
+		X = np.asarray(bins[i0:min(i0 + chunk, n_bins * rebin)])
+		X = X.reshape(-1, rebin, X.shape[1]).mean(axis=1)
+		total = total + X.sum(axis=0)
+		Xc = X[:, ind_cov]
+		if complex_data:
+			Xc = np.concatenate((Xc.real, Xc.imag), axis=1)
+		else:
+			Xc = np.ascontiguousarray(Xc.real, dtype=float)
+		if acc is None:
+			acc = CovarianceAccumulator(Xc.shape[1])
+		acc.add(Xc)
+	return total / n_bins, acc.covariance() / n_bins, n_bins
+
+def bins_resample_means(bins, n_samples, resampling, rebin=1, bins_chunk=1000, rng=None):
+	"""
+	Used by compute_GfReFreq_ensemble() to compute the means of n_samples bootstrap or jackknife resamples of the bins
+	(one bin per row of bins), reading at most bins_chunk bins at once. Groups of rebin consecutive bins are averaged
+	first. With resampling="bootstrap", the weights of the bins are drawn from a Poisson distribution of mean 1 with the
+	numpy random generator rng. With resampling="jackknife", the i-th resample leaves out the i-th of n_samples blocks
+	of consecutive bins. Return the means, one resample per row.
+	"""
+	if rng is None:
+		rng = np.random.default_rng()
+	n_bins = bins.shape[0] // rebin
+	chunk = max(1, bins_chunk // rebin) * rebin
+	sums = np.zeros((n_samples, bins.shape[1]), dtype=np.result_type(bins.dtype, float))
+	weights = np.zeros(n_samples)
+	for i0 in range(0, n_bins * rebin, chunk):
+		X = np.asarray(bins[i0:min(i0 + chunk, n_bins * rebin)])
+		X = X.reshape(-1, rebin, X.shape[1]).mean(axis=1)
+		if resampling == "bootstrap":
+			W = rng.poisson(1.0, size=(n_samples, X.shape[0]))
+			sums += W @ X
+			weights += W.sum(axis=1)
+		else:
+			ind_block = (np.arange(X.shape[0]) + i0 // rebin) * n_samples // n_bins
+			np.add.at(sums, ind_block, X)
+			weights += np.bincount(ind_block, minlength=n_samples)
+	if resampling == "bootstrap":
+		return sums / np.maximum(weights, 1)[:, None]
+	return (sums.sum(axis=0) - sums) / (n_bins - weights)[:, None]
+
+class ContinuationEnsemble:
+	"""
+	Result of compute_GfReFreq_ensemble().
+
+	GR:		GfReFreq object, continuation of the mean of all the bins.
+	omega:		frequencies of the output grid.
+	A_samples:	spectral functions -Im(G)/pi of the resamples, one per row. For the jackknife, their deviations from
+			their mean are multiplied by sqrt(n_samples-1), so that their spread estimates the error.
+	A_mean:		mean of A_samples.
+	A_std:		standard deviation of A_samples.
+	bands:		dictionary of the percentiles of A_samples at each frequency, with the percentiles as keys.
+	"""
+
+	def __init__(self, GR, A_samples, percentiles):
+		self.GR = GR
+		self.omega = np.array([w.value for w in GR.mesh])
+		self.A_samples = A_samples
+		self.A_mean = A_samples.mean(axis=0)
+		self.A_std = A_samples.std(axis=0, ddof=1)
+		self.bands = dict(zip(percentiles, np.percentile(A_samples, percentiles, axis=0)))
+
+	def band(self, p_low, p_high):
+		"""
+		Return the percentiles p_low and p_high of A_samples at each frequency.
+		"""
+		return np.percentile(self.A_samples, [p_low, p_high], axis=0)
+
+class NoiseSweep:
+	"""
+	Result of compute_GfReFreq_noise_sweep().
+
+	noise_levels:	levels of added noise, in the order of the parameter added_noise.
+	GR:		list of the GfReFreq continuations, one per level, None for a failed continuation.
+	omega:		frequencies of the output grid, common to all the levels.
+	A:		spectral functions -Im(G)/pi, one row per level, NaN for a failed continuation.
+	"""
+
+	def __init__(self, noise_levels, GR):
+		self.noise_levels = noise_levels
+		self.GR = GR
+		self.omega = np.array([w.value for w in GR[0].mesh])
+		self.A = np.full((len(GR), len(self.omega)), np.nan)
+		for i, GR_i in enumerate(GR):
+			if GR_i is not None:
+				self.A[i] = -GR_i.data.imag/pi
+
+	def __getitem__(self, noise_level):
+		"""
+		Return the continuation with the level of added noise noise_level.
+		"""
+		return self.GR[self.noise_levels.index(noise_level)]
+
+class ParameterSet:
+	"""
+	Parameters of OmegaMaxEnt passed as keyword arguments kwa. A single ParameterSet is created by compute_GfReFreq()
+	and shared by all the continuations of a matrix, a BlockGf, an ensemble or a noise sweep.
+
+	The parameters of OmegaMaxEnt_other_params are validated and serialized once, with the default values of the
+	others. OmegaMaxEnt_other_params.dat is rewritten only if its content differs, according to its hash, so that
+	stale parameters from a previous call are not kept. The line of each parameter of OmegaMaxEnt_input_params is
+	serialized once per value.
+
+	other_params:	content of OmegaMaxEnt_other_params.dat, as bytes.
+	other_hash:	SHA-1 hash of other_params.
+	"""
+
+	def __init__(self, kwa):
+		lines = []
+		for key, val in OmegaMaxEnt_other_params.items():
+			v = Other_params_default_values[key]
+			if key in kwa:
+				if isinstance(kwa[key], (int, float, np.integer, np.floating)) and not isinstance(kwa[key], bool):
+					v = kwa[key]
+				else:
+					logger.warning(f"compute_GfReFreq() warning: '{key}' parameter must be a number. Default value {v} used.")
+			lines.append(val + " " + str(v) + '\n')
+		self.other_params = "".join(lines).encode()
+		self.other_hash = hashlib.sha1(self.other_params).hexdigest()
+		self.input_lines = {}
+		self.written = {}
+
+	def input_bytes(self, kwa):
+		"""
+		Return the lines of OmegaMaxEnt_input_params.dat for the parameters in kwa, as bytes. The line of a parameter is
+		only formatted again if its value differs from the one of the previous call. The values are compared by content,
+		so that a list modified in place is formatted again.
+		"""
+		lines = []
+		for key, val in kwa.items():
+			if key not in OmegaMaxEnt_input_params:
+				continue
+			val_key = input_param_key(val)
+			cached = self.input_lines.get(key)
+			if cached is None or cached[0] != val_key:
+				cached = (val_key, input_param_line(key, val))
+				self.input_lines[key] = cached
+			lines.append(cached[1])
+		return b"".join(lines)
+
+	def write_other_params(self, work_dir="."):
+		"""
+		Write OmegaMaxEnt_other_params.dat in work_dir, unless its hash is already other_hash. The file is only read to
+		compute its hash if it was modified since it was last checked. Return True if the file was written.
+		"""
+		f = path.join(work_dir, other_params_file)
+		if path.exists(f):
+			st = os.stat(f)
+			if self.written.get(f) == (st.st_mtime_ns, st.st_size):
+				return False
+			with open(f, "rb") as pf:
+				if hashlib.sha1(pf.read()).hexdigest() == self.other_hash:
+					self.written[f] = (st.st_mtime_ns, st.st_size)
+					return False
+		with open(f, "wb") as pf:
+			pf.write(self.other_params)
+		st = os.stat(f)
+		self.written[f] = (st.st_mtime_ns, st.st_size)
+		return True
+
+def input_param_key(val):
+	"""
+	Used by ParameterSet to compare the values of a parameter of OmegaMaxEnt_input_params. Return a copy of the content
+	of val, with the type of each element, since values that are equal, like 1 and 1.0, can be formatted differently.
+	"""
+	if isinstance(val, Iterable) and not isinstance(val,str):
+		return tuple((type(elem), elem) for elem in val)
+	return (type(val), val)
+
+def input_param_line(key, val):
+	"""
+	Used by ParameterSet to format the line of the parameter key with value val in OmegaMaxEnt_input_params.dat.
+	"""
+	if isinstance(val, bool):
+		val_str = "no"
+		if val:
+			val_str = "yes"
+	elif isinstance(val, Iterable) and not isinstance(val,str):
+		val_str = ""
+		for elem in val:
+			val_str = val_str + " " + str(elem)
+	else:
+		val_str = str(val)
+	return (OmegaMaxEnt_input_params[key] + val_str + '\n').encode()
+
+class ContinuationResult:
+	"""
+	Result of compute_GfReFreq() with full_result=True. The diagnostics of the alpha path are read from the output
+	files of OmegaMaxEnt only when they are accessed, and are then kept. Each text file is converted once to a .npy file
+	next to it, which is memory-mapped, so that later accesses, also from other scripts, do not parse it again.
+
+	GR:		GfReFreq object, the continuation.
+	result_dir:	directory of the final result of OmegaMaxEnt.
+	alpha:		values of alpha along the path.
+	chi2:		chi2 at each value of alpha.
+	sample_freq:	frequencies at which the spectral function is followed along the path.
+	A_vs_alpha:	spectral function at the frequencies sample_freq, one row per value of alpha.
+	alpha_opt:	optimal value of alpha.
+	alpha_bounds:	values of alpha (alpha_l, alpha_r) on each side of alpha_opt, used to estimate the error.
+	omega_opt:	frequency grid of the optimal spectral function.
+	A_opt:		optimal spectral function, on the grid omega_opt.
+	A_bounds:	spectral functions at alpha_l and alpha_r, one per row, on the grid omega_opt.
+	GR_Pade:	array of columns omega, Re(G) and Im(G) of the Pade continuation, None if compute_Pade was not set.
+	P_alpha_G:	array of columns alpha and P(alpha|G), None if compute_classic_Bryan was not set.
+	A_classic:	spectral function of the classic method, on the grid omega_opt.
+	A_Bryan:	spectral function of Bryan's method, on the grid omega_opt.
+	"""
+
+	def __init__(self, GR, result_dir, work_dir="."):
+		self.GR = GR
+		self.result_dir = result_dir
+		self.work_dir = work_dir
+		self.cache = {}
+
+	def array(self, pattern, d=None):
+		"""
+		Return the memory-mapped content of the most recent output file of OmegaMaxEnt matching pattern in directory d
+		(result_dir by default), or None if there is none.
+		"""
+		if d is None:
+			d = self.result_dir
+		key = path.join(d, pattern)
+		if key not in self.cache:
+			files = glob.glob(key)
+			self.cache[key] = load_mapped(max(files, key=path.getmtime)) if files else None
+		return self.cache[key]
+
+	def columns(self, pattern, cols, d=None):
+		"""
+		Return the columns cols of the array returned by array(pattern, d), or None if there is no such file.
+		"""
+		a = self.array(pattern, d)
+		if a is None:
+			return None
+		return a[:, cols]
+
+	@property
+	def alpha(self):
+		return self.columns(chi2_vs_alpha_pattern, 0)
+
+	@property
+	def chi2(self):
+		return self.columns(chi2_vs_alpha_pattern, 1)
+
+	@property
+	def sample_freq(self):
+		return self.columns(sample_freq_pattern, 0)
+
+	@property
+	def A_vs_alpha(self):
+		return self.columns(A_vs_alpha_pattern, slice(1, None))
+
+	@property
+	def alpha_opt(self):
+		return self.alpha_values()[1]
+
+	@property
+	def alpha_bounds(self):
+		a = self.alpha_values()
+		return a[0], a[2]
+
+	@property
+	def omega_opt(self):
+		return self.columns(A_opt_bounds_pattern, 0)
+
+	@property
+	def A_opt(self):
+		return self.columns(A_opt_bounds_pattern, 2)
+
+	@property
+	def A_bounds(self):
+		A = self.columns(A_opt_bounds_pattern, [1, 3])
+		if A is None:
+			return None
+		return A.T
+
+	@property
+	def GR_Pade(self):
+		return self.array(Pade_file_pattern, self.work_dir)
+
+	@property
+	def P_alpha_G(self):
+		return self.array(P_alpha_G_pattern)
+
+	@property
+	def A_classic(self):
+		return self.columns(A_classic_Bryan_pattern, 1)
+
+	@property
+	def A_Bryan(self):
+		return self.columns(A_classic_Bryan_pattern, 2)
+
+	def alpha_values(self):
+		"""
+		Return the values of alpha (alpha_l, alpha_opt, alpha_r) from the name of the file of the optimal spectral
+		function and its bounds.
+		"""
+		files = glob.glob(path.join(self.result_dir, A_opt_bounds_pattern))
+		if not files:
+			return None, None, None
+		name = path.basename(max(files, key=path.getmtime))
+		return tuple(float(a) for a in re.search(r"alpha([^_]+)_([^_]+)_([^_]+)\.dat$", name).groups())
+
+def load_mapped(file_name):
+	"""
+	Used by ContinuationResult to load the text file file_name as a memory-mapped 2D array. The array is saved in
+	file_name.npy the first time, and that file is used as long as it is not older than file_name.
+	"""
+	npy_file = file_name + ".npy"
+	if not path.exists(npy_file) or path.getmtime(npy_file) < path.getmtime(file_name):
+		np.save(npy_file, np.loadtxt(file_name, ndmin=2))
+	return np.load(npy_file, mmap_mode='r')
+
+def final_result_file(file_name, work_dir, kwa, error_provided):
+	"""
+	Used by compute_GfReFreq() and compute_scalar_GfReFreq() to get the path of the output file file_name of
+	OmegaMaxEnt in work_dir. If OmegaMaxEnt adds noise to G, that is if added_noise is set and no error is provided,
+	the file of the last level of noise is returned.
+	"""
+	if 'added_noise' in kwa and not error_provided and 'cov_re_re' not in kwa and 'cov_tau' not in kwa:
+		noise_levels = np.atleast_1d(kwa['added_noise'])
+		if len(noise_levels) and noise_levels[-1]>0:
+			return path.join(work_dir, noise_level_file(file_name, noise_levels[-1]))
+	return path.join(work_dir, file_name)
+
+def save_arma_binary(file_name, M):
+	"""
+	Used by compute_scalar_GfReFreq() to save the real matrix M in the binary format of armadillo, which OmegaMaxEnt
+	reads without parsing.
+	"""
+	M = np.asarray(M, dtype=np.float64)
+	with open(file_name, "wb") as f:
+		f.write(f"ARMA_MAT_BIN_FN008\n{M.shape[0]} {M.shape[1]}\n".encode())
+		f.write(M.tobytes(order='F'))
+
+def load_arma_binary(file_name):
+	"""
+	Used by load_G_Re_omega() to read a real or complex matrix saved by OmegaMaxEnt in the binary format of armadillo.
+	The data is read directly into the array, in column-major order, so that its columns are contiguous.
+	"""
+	with open(file_name, "rb") as f:
+		header = f.readline().decode().strip()
+		n_rows, n_cols = (int(n) for n in f.readline().split())
+		offset = f.tell()
+	dtype = {"ARMA_MAT_BIN_FN008": np.float64, "ARMA_MAT_BIN_FC016": np.complex128}[header]
+	M = np.fromfile(file_name, dtype=dtype, count=n_rows*n_cols, offset=offset)
+	return M.reshape((n_rows, n_cols), order='F')
+
 def create_params_file(overwrite=True):
 	"""
 	create the parameter files OmegaMaxEnt_input_params.dat and OmegaMaxEnt_other_params.dat used by OmegaMaxEnt.
@@ -525,11 +2157,16 @@ def create_params_file(overwrite=True):
 			os.remove(other_params_file)
 		sp.call(cmd)
 
-def display_figures():
+def display_figures(background=False):
 	"""
 	Display the figures showing the result after compute_GfReFreq() was called with save_figures_data=True (default). The figures are the ones displayed
 	if interactive_mode=True (default).
+
+	If the figures were recorded in the bundle OmegaMaxEnt_figs_bundle.dat (figures_bundle=True), they are drawn from it. In that case, if
+	background=True, the figures are displayed by a separate python process and the subprocess.Popen object of that process is returned.
 	"""
+	if path.exists(figs_bundle_file_name):
+		return render_figures(figs_bundle_file_name, show=True, background=background)
 	figs_ind=np.int_(np.loadtxt("figs_ind.dat"))
 	if not isinstance(figs_ind,np.ndarray):
 		figs_ind=np.array([figs_ind])
@@ -540,11 +2177,13 @@ def display_figures():
 			fig_cmd=fig_file.read()
 			exec(fig_cmd)
 
-def save_Fourier_transform_G_hdf5():
+def save_Fourier_transform_G_hdf5(work_dir="."):
 	"""
 	Called by compute_scalar_GfReFreq() to save the Fourier transform of a scalar GfImTime object as a GfImFreq in hdf5 format
 	"""
-	data_file = open(FT_G_file_name, "r")
+	from triqs.gf import GfImFreq
+	from h5 import HDFArchive as HA
+	data_file = open(path.join(work_dir, FT_G_file_name), "r")
 	G_data = np.loadtxt(data_file)
 	data_file.close()
 
@@ -581,5 +2220,5 @@ def save_Fourier_transform_G_hdf5():
 	Gwn.data.real = Gr
 	Gwn.data.imag = Gi
 
-	A = HA("G_im_freq.h5", "w")
+	A = HA(path.join(work_dir, "G_im_freq.h5"), "w")
 	A['G'] = Gwn
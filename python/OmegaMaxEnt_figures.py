@@ -0,0 +1,232 @@
+###################################################################################
+#
+# TRIQS interface for the analytic continuation program OmegaMaxEnt
+#
+# Copyright (C) Simons Foundation
+#
+# TRIQS is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TRIQS is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TRIQS. If not, see <http://www.gnu.org/licenses/>.
+#
+###################################################################################
+
+# Reader and renderer of the figures bundle written by OmegaMaxEnt with option -fb. This module does not import TRIQS,
+# so that the figures can be drawn in a separate process:
+#
+# usage: python OmegaMaxEnt_figures.py [bundle_file] [--output-dir dir] [--format png] [--show]
+
+import argparse
+import json
+import os
+import re
+import subprocess as sp
+import sys
+import numpy as np
+
+figs_bundle_file_name = "OmegaMaxEnt_figs_bundle.dat"
+bundle_header = b"OMEFIGS1\n"
+
+
+class FigureBundle:
+	"""
+	Figures of a bundle file written by OmegaMaxEnt with option -fb. Only the description of the figures is read when
+	the object is created. The data of a figure is read when it is drawn.
+
+	figures:	list of the figure descriptions (dictionaries), in the order they were recorded. figure['set'] is the
+			index of the group of figures that OmegaMaxEnt shows together and figure['fig'] the figure number.
+	"""
+
+	def __init__(self, file_name=figs_bundle_file_name):
+		self.file_name = file_name
+		self.figures = []
+		self.offsets = []
+		with open(file_name, "rb") as f:
+			if f.readline() != bundle_header:
+				raise ValueError(f"{file_name} is not an OmegaMaxEnt figures bundle")
+			line = f.readline()
+			while line:
+				fig = json.loads(line)
+				self.figures.append(fig)
+				self.offsets.append(f.tell())
+				f.seek(8 * data_size(fig), os.SEEK_CUR)
+				line = f.readline()
+
+	def sets(self):
+		"""
+		Return the sorted indices of the groups of figures.
+		"""
+		return sorted(set(fig['set'] for fig in self.figures))
+
+	def data(self, i):
+		"""
+		Return the data of the i-th figure as a 1D array.
+		"""
+		return np.fromfile(self.file_name, dtype=np.float64, count=data_size(self.figures[i]), offset=self.offsets[i])
+
+	def draw(self, i, fig):
+		"""
+		Draw the i-th figure in the matplotlib figure fig.
+		"""
+		desc = self.figures[i]
+		if desc['type'] == "surface":
+			draw_surface(desc, self.data(i), fig)
+		else:
+			draw_curves(desc, self.data(i), fig)
+
+
+def data_size(fig):
+	"""
+	Used by FigureBundle to get the number of values in the data of the figure described by fig.
+	"""
+	if fig['type'] == "surface":
+		return fig['x_size'] + fig['y_size'] + fig['Z_rows'] * fig['Z_cols']
+	return sum(2 * c['size'] for c in fig['curves'])
+
+
+def plot_args(attr):
+	"""
+	Used by draw_curves() to convert the plot attributes written by OmegaMaxEnt, for example "'o-', color='k'", to the
+	positional and keyword arguments of plot().
+	"""
+	if not attr:
+		return (), {}
+	return eval("(lambda *args, **kwargs: (args, kwargs))(" + attr + ")", {'__builtins__': {}})
+
+
+def label_text(label):
+	"""
+	Used by draw_curves() and draw_surface() to get the text of a title, label or legend written by OmegaMaxEnt, which
+	is the content of a python string literal in the figure scripts. The escaped backslashes and quotes are unescaped and
+	the other backslashes, as in "$\\omega$", are kept.
+	"""
+	return re.sub(r'\\([\\"\'])', r'\1', label)
+
+
+def draw_curves(desc, data, fig):
+	"""
+	Used by FigureBundle.draw() to draw the curves described by desc, with data the pairs (x,y) of all the curves.
+	"""
+	ax = fig.add_subplot(1, 1, 1)
+	i0 = 0
+	legend = []
+	for c in desc['curves']:
+		xy = data[i0:i0 + 2 * c['size']].reshape(-1, 2)
+		i0 = i0 + 2 * c['size']
+		args, kwargs = plot_args(c.get('attr'))
+		ax.plot(xy[:, 0], xy[:, 1], *args, **kwargs)
+		if 'legend' in c:
+			legend.append(label_text(c['legend']))
+	if legend:
+		ax.legend(legend, loc=desc['legend_loc'])
+	if desc['title']:
+		ax.set_title(label_text(desc['title']), fontsize=desc['title_fontsize'])
+	if desc['xlabel']:
+		ax.set_xlabel(label_text(desc['xlabel']), fontsize=desc['labels_fontsize'])
+	if desc['ylabel']:
+		ax.set_ylabel(label_text(desc['ylabel']), fontsize=desc['labels_fontsize'])
+	if desc['xlims'][0] != desc['xlims'][1]:
+		ax.set_xlim(*desc['xlims'])
+	if desc['ylims'][0] != desc['ylims'][1]:
+		ax.set_ylim(*desc['ylims'])
+
+
+def draw_surface(desc, data, fig):
+	"""
+	Used by FigureBundle.draw() to draw the surface described by desc, with data the values of x and y followed by Z.
+	"""
+	from matplotlib import cm
+	import mpl_toolkits.mplot3d
+	nx = desc['x_size']
+	ny = desc['y_size']
+	x = data[:nx]
+	y = data[nx:nx + ny]
+	Z = data[nx + ny:].reshape((desc['Z_rows'], desc['Z_cols']), order='F')
+	X, Y = np.meshgrid(x, y)
+	options = {key: eval(val, {'__builtins__': {}, 'cm': cm}) for key, val in desc['options'].items()}
+	ax = fig.add_subplot(1, 1, 1, projection='3d')
+	ax.plot_surface(X, Y, Z, **options)
+	if desc['title']:
+		ax.set_title(label_text(desc['title']), fontsize=desc['title_fontsize'])
+	for label, set_label in [('xlabel', ax.set_xlabel), ('ylabel', ax.set_ylabel), ('zlabel', ax.set_zlabel)]:
+		if desc[label]:
+			set_label(label_text(desc[label]), fontsize=desc['labels_fontsize'])
+	for lims, set_lims in [('xlims', ax.set_xlim), ('ylims', ax.set_ylim), ('zlims', ax.set_zlim)]:
+		if desc[lims][0] != desc[lims][1]:
+			set_lims(*desc[lims])
+
+
+def render_figures(file_name=figs_bundle_file_name, output_dir=None, fmt="png", show=False, background=False):
+	"""
+	Draw the figures of the bundle file_name written by OmegaMaxEnt with option -fb (parameter figures_bundle=True of
+	compute_GfReFreq()).
+
+	parameters:
+	----------
+	file_name:	optional string. Default: "OmegaMaxEnt_figs_bundle.dat"
+	output_dir:	optional string. Default: None
+			If provided, each figure is saved in output_dir as fig_<set>_<fig>.<fmt>.
+	fmt:		optional string. Default: "png"
+	show:		optional boolean. Default: False
+			If True, the figures are displayed with pyplot, one group at a time, as in the interactive mode.
+	background:	optional boolean. Default: False
+			If True, the figures are drawn by a separate Python process and the subprocess.Popen object of that
+			process is returned immediately.
+
+	Return the list of the saved files, or the Popen object if background is True.
+	"""
+	if background:
+		cmd = [sys.executable, os.path.abspath(__file__), file_name, "--format", fmt]
+		if output_dir:
+			cmd = cmd + ["--output-dir", output_dir]
+		if show:
+			cmd = cmd + ["--show"]
+		return sp.Popen(cmd)
+
+	bundle = FigureBundle(file_name)
+	saved = []
+	if output_dir and not os.path.exists(output_dir):
+		os.makedirs(output_dir)
+	if show:
+		from matplotlib import pyplot
+	else:
+		from matplotlib.figure import Figure
+	for s in bundle.sets():
+		for i, desc in enumerate(bundle.figures):
+			if desc['set'] != s:
+				continue
+			if show:
+				fig = pyplot.figure(desc['fig'])
+			else:
+				fig = Figure()
+			bundle.draw(i, fig)
+			if output_dir:
+				f = os.path.join(output_dir, f"fig_{s}_{desc['fig']}.{fmt}")
+				fig.savefig(f)
+				saved.append(f)
+		if show:
+			pyplot.show()
+	return saved
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Draw the figures of an OmegaMaxEnt figures bundle.")
+	parser.add_argument('file_name', nargs='?', default=figs_bundle_file_name, help="bundle file")
+	parser.add_argument('--output-dir', default=None, help="directory where the figures are saved")
+	parser.add_argument('--format', default="png", help="format of the saved figures")
+	parser.add_argument('--show', action='store_true', help="display the figures")
+	args = parser.parse_args()
+	render_figures(args.file_name, args.output_dir, args.format, args.show)
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -40,6 +40,7 @@ OmegaMaxEnt_input_params = dict(
     use_parameterized_grid="use parameterized real frequency grid (yes/[no]):",
     parameterized_grid_params="grid parameters (w_0 dw_0 w_1 dw_1 ... w_{N-1} dw_{N-1} w_N):",
     output_grid_params="output real frequency grid parameters (w_min dw w_max):",
+    output_grid_file="output real frequency grid file:",
 # COMPUTATION OPTIONS
     eval_moments="evaluate moments (yes/[no]):",
     maximum_moment="maximum moment:",
@@ -63,11 +64,13 @@ OmegaMaxEnt_input_params = dict(
     alpha_max_saved="maximum alpha for which results are saved:",
     alpha_min_saved="minimum alpha for which results are saved:",
     spectrum_sample_freq="spectral function sample frequencies (w_1 w_2 ... w_N):",
+    files_per_alpha="one output file per value of alpha (yes/[no]):",
 # COMPUTATION PARAMETERS
     alpha_init="initial value of alpha:",
     alpha_min="minimum value of alpha:",
     alpha_opt_max="maximum optimal alpha:",
     alpha_opt_min="minimum optimal alpha:",
+    compute_classic_Bryan="compute classic and Bryan spectra (yes/[no]):",
 # MINIMIZATION EXECUTION OPTIONS
     n_alpha_values="number of values of alpha computed in one execution:",
     init_maxent="initialize maxent (yes/[no]):",
@@ -139,7 +142,8 @@ OmegaMaxEnt_other_params = dict(
     R_SW_G_Re_w_range="R_SW_G_Re_w_range, ratio of total frequency range and main spectral region for the real part of G:",
     R_dw_min_dw_dense="R_dw_min_dw_dense, default ratio of the minimal step in the computation grid and the step in the output grid:",
     R_wKK_SW="R_wKK_SW, frequency region around zero where Re[G] is computed with Kramers-Kronig, divided by the spectral function width:",
-    R_sv_min="R_sv_min, minimum ratio of matrix singular values in the moments computation in tau:")
+    R_sv_min="R_sv_min, minimum ratio of matrix singular values in the moments computation in tau:",
+    R_cov_eig_min="R_cov_eig_min, covariance eigenvalues smaller than R_cov_eig_min times the trace are discarded (0: none):")
 
 Other_params_default_values = dict(
     Nn_min=20,
@@ -198,4 +202,5 @@ Other_params_default_values = dict(
     R_SW_G_Re_w_range=10,
     R_dw_min_dw_dense=5,
     R_wKK_SW=0.01,
-    R_sv_min=1e-10)
+    R_sv_min=1e-10,
+    R_cov_eig_min=0)
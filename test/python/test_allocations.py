@@ -0,0 +1,97 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+from math import ceil, sqrt, pi
+import warnings
+from triqs.gf import *
+import numpy as np
+import os
+import shutil as su
+from scipy.integrate import trapezoid
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+test_dir_name="test_dir_allocations"
+
+statistic='Boson'
+
+np.random.seed(0)
+
+# heap allocation counts reported by the engine for this input: 34569 armadillo allocations (77604 when the vectors
+# and matrices were passed by value to the minimization functions) and about 1700 calls of operator new
+max_arma_alloc=50000
+max_new_calls=5000
+
+err=1e-5
+beta=50.0
+
+R_iw_W=5
+
+W=4
+cw=[-2, 2]
+sd=[1, 1]
+wgt=[1, 1]
+Npks=len(cw)
+
+wmin=-10.0
+wmax=10.0
+dw_integ=0.002
+
+wl=-7
+wr=7
+dw=0.01
+
+wnmax=W*R_iw_W
+nmax=int(ceil(beta*wnmax/(2*pi)))
+n_iwn=nmax+1
+
+n=np.array(list(range(0,n_iwn)))
+
+wn=2*n*pi/beta
+
+def sum_gaussians(w):
+    W = sum(wgt)
+    v = 0
+    for i in range(0, Npks):
+        v = v + (wgt[i] / sd[i]) * np.exp(-(w - cw[i]) * (w - cw[i]) / (2 * sd[i] * sd[i]))
+
+    return v / (W * sqrt(2 * pi))
+
+w_integ=np.arange(wmin, wmax+dw_integ/2, dw_integ)
+g_integ=sum_gaussians(w_integ)
+
+class OmegaMaxEnt_test_allocations(ut.TestCase):
+
+    def runTest(self):
+
+        Gr=np.zeros(n_iwn)
+        Gr[0]=-trapezoid(g_integ, w_integ)
+        for i in range(1,n_iwn):
+            Gr[i]=-trapezoid(w_integ*w_integ*g_integ/(wn[i]*wn[i]+w_integ*w_integ), w_integ)
+
+        Gr=np.concatenate((np.flipud(Gr[1:]),Gr))
+
+        G = GfImFreq(target_shape=(), beta=beta, n_points=n_iwn, statistic=statistic)
+        G.data.real=Gr+err*np.random.randn(len(Gr))
+        G.data.imag=0
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        os.chdir(test_dir_name)
+
+        engine_stats = []
+
+        GR=OT.compute_GfReFreq(G, inv_sym_time=True, interactive_mode=False, save_figures_data=False, save_G=False, output_grid_params=[wl, dw, wr], engine_stats=engine_stats)
+
+        os.chdir("..")
+        su.rmtree(test_dir_name)
+
+        self.assertTrue(isinstance(GR, GfReFreq))
+
+        self.assertEqual(len(engine_stats), 1)
+        counters = engine_stats[0]['counters']
+        print(counters)
+        self.assertGreater(counters['armadillo_allocations'], 0)
+        self.assertLess(counters['armadillo_allocations'], max_arma_alloc)
+        self.assertLess(counters['operator_new_calls'], max_new_calls)
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,112 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+from math import ceil, exp, sqrt, pi
+from triqs.dos import HilbertTransform, DOSFromFunction
+import warnings
+from triqs.gf import *
+import numpy as np
+import os
+import shutil as su
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+test_dir_name="test_dir_bins"
+
+np.random.seed(1)
+
+tol_int_diffA=0.05
+tol_cov=1e-10
+
+Npts_dos=1000
+
+inter_mode=False
+save_figs=False
+
+err=1e-4
+N_bins=1000
+rebin=2
+beta=50
+
+R_iw_W=5
+
+W=4
+cw=[-2, 1]
+sd=[1, 0.7]
+wgt=[1, 1]
+Npks=len(cw)
+
+wmin=-10.0
+wmax=10.0
+
+wl=-7
+wr=7
+dw=0.01
+
+wnmax=W*R_iw_W
+nmax=int(ceil(beta*wnmax/(2*pi)))
+n_iwn=nmax+1
+
+def spectr_val(w):
+    W = np.sum(wgt)
+    v = 0
+    for i in range(0,Npks):
+        v = v + (wgt[i] / sd[i]) * exp(-(w - cw[i]) * (w - cw[i]) / (2 * sd[i] * sd[i]))
+
+    return v / (W * sqrt(2 * pi))
+
+Nw=int((wr-wl)/dw)+1
+w=dw*np.array(list(range(0,Nw)))+wl
+
+Aw=np.zeros(Nw)
+
+for i in range(0,Nw):
+    Aw[i]=spectr_val(w[i])
+
+class OmegaMaxEnt_test_bins(ut.TestCase):
+
+    def test_mean_covariance(self):
+        bins = np.random.randn(N_bins+1, 6) + 1j * np.random.randn(N_bins+1, 6)
+        ind_cov = np.array([3, 4, 5])
+        mean, cov, n_bins = OT.bins_mean_covariance(bins, ind_cov, True, rebin, bins_chunk=99)
+
+        rebinned = bins[:N_bins].reshape(-1, rebin, 6).mean(axis=1)
+        X = np.concatenate((rebinned[:, ind_cov].real, rebinned[:, ind_cov].imag), axis=1)
+        self.assertEqual(n_bins, N_bins // rebin)
+        self.assertLess(np.abs(mean - rebinned.mean(axis=0)).max(), tol_cov)
+        self.assertLess(np.abs(cov - np.cov(X, rowvar=False) / n_bins).max(), tol_cov)
+
+    def test_continuation(self):
+
+        d = DOSFromFunction(spectr_val, wmin, wmax, Npts_dos)
+        G = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0.zero()
+        G << HilbertTransform(d)(Sigma=Sigma0, mu=0.)
+
+        G = G[0, 0]
+
+        bins = G.data[None, :] + err * (np.random.randn(N_bins, 2*n_iwn) + 1j * np.random.randn(N_bins, 2*n_iwn))
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        os.chdir(test_dir_name)
+
+        profiler = OT.PhaseProfiler()
+
+        GR=OT.compute_GfReFreq(G, bins=bins, rebin=rebin, bins_chunk=128, interactive_mode=inter_mode, save_figures_data=save_figs, output_grid_params=[wl, dw, wr], name="$G_{ME}$", on_event=profiler)
+
+        for f in OT.covar_file_names.values():
+            self.assertFalse(os.path.exists(f))
+
+        os.chdir("..")
+        su.rmtree(test_dir_name)
+
+        self.assertTrue(isinstance(GR, GfReFreq))
+        self.assertEqual(profiler.stats["bins statistics"]['calls'], 1)
+
+        Aw_me = -GR.data.imag / pi
+        int_diffA = dw * sum(np.absolute(Aw_me - Aw))
+        print(int_diffA)
+        self.assertLess(int_diffA, tol_int_diffA)
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,115 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+from math import ceil, exp, sqrt, pi
+from triqs.dos import HilbertTransform, DOSFromFunction
+import warnings
+from triqs.gf import *
+import numpy as np
+import os
+import shutil as su
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+test_dir_name="test_dir_ensemble"
+
+np.random.seed(1)
+
+tol_int_diffA=0.05
+tol_mean=1e-10
+tol_std=0.2
+
+Npts_dos=1000
+
+err=1e-4
+N_bins=400
+N_samples=8
+N_jobs=4
+beta=50
+
+R_iw_W=5
+
+W=4
+cw=[-2, 1]
+sd=[1, 0.7]
+wgt=[1, 1]
+Npks=len(cw)
+
+wmin=-10.0
+wmax=10.0
+
+wl=-7
+wr=7
+dw=0.01
+
+wnmax=W*R_iw_W
+nmax=int(ceil(beta*wnmax/(2*pi)))
+n_iwn=nmax+1
+
+def spectr_val(w):
+    W = np.sum(wgt)
+    v = 0
+    for i in range(0,Npks):
+        v = v + (wgt[i] / sd[i]) * exp(-(w - cw[i]) * (w - cw[i]) / (2 * sd[i] * sd[i]))
+
+    return v / (W * sqrt(2 * pi))
+
+Nw=int((wr-wl)/dw)+1
+w=dw*np.array(list(range(0,Nw)))+wl
+
+Aw=np.zeros(Nw)
+
+for i in range(0,Nw):
+    Aw[i]=spectr_val(w[i])
+
+class OmegaMaxEnt_test_ensemble(ut.TestCase):
+
+    def test_resample_means(self):
+        bins = np.random.randn(N_bins, 4) + 1j * np.random.randn(N_bins, 4)
+        mean = bins.mean(axis=0)
+
+        jk = OT.bins_resample_means(bins, 10, "jackknife", bins_chunk=33)
+        self.assertEqual(jk.shape, (10, 4))
+        self.assertLess(np.abs(jk.mean(axis=0) - mean).max(), tol_mean)
+        self.assertLess(np.abs(jk[0] - bins[N_bins//10:].mean(axis=0)).max(), tol_mean)
+
+        bs = OT.bins_resample_means(bins, 1000, "bootstrap", rebin=2, bins_chunk=33, rng=np.random.default_rng(1))
+        std_mean = bins.reshape(-1, 2, 4).mean(axis=1).real.std(axis=0) / sqrt(N_bins // 2)
+        self.assertLess(np.abs(bs.real.std(axis=0) / std_mean - 1).max(), tol_std)
+
+    def test_continuation(self):
+
+        d = DOSFromFunction(spectr_val, wmin, wmax, Npts_dos)
+        G = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0.zero()
+        G << HilbertTransform(d)(Sigma=Sigma0, mu=0.)
+
+        bins = G.data[None, :, 0, 0] + err * (np.random.randn(N_bins, 2*n_iwn) + 1j * np.random.randn(N_bins, 2*n_iwn))
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+
+        profiler = OT.PhaseProfiler()
+
+        # the continuations are computed in work_dir/OmegaMaxEnt_ensemble
+        ens = OT.compute_GfReFreq_ensemble(G, bins, n_samples=N_samples, n_jobs=N_jobs, seed=1, R_cov_eig_min=1e-12, output_grid_params=[wl, dw, wr], on_event=profiler, work_dir=test_dir_name)
+
+        self.assertFalse(os.path.exists(os.path.join(test_dir_name, "OmegaMaxEnt_ensemble")))
+        self.assertFalse(os.path.exists("OmegaMaxEnt_ensemble"))
+
+        su.rmtree(test_dir_name)
+
+        self.assertTrue(isinstance(ens, OT.ContinuationEnsemble))
+        self.assertEqual(ens.A_samples.shape, (N_samples, Nw))
+        self.assertEqual(profiler.stats["engine"]['calls'], N_samples + 1)
+        self.assertTrue((ens.bands[16] <= ens.bands[84]).all())
+
+        int_diffA = dw * sum(np.absolute(ens.A_mean - Aw))
+        print(int_diffA)
+        self.assertLess(int_diffA, tol_int_diffA)
+
+        int_diffA = dw * sum(np.absolute(-ens.GR.data.imag / pi - Aw))
+        print(int_diffA)
+        self.assertLess(int_diffA, tol_int_diffA)
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,58 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+import numpy as np
+import os
+import shutil as su
+
+test_dir_name="test_dir_equivalence"
+
+class OmegaMaxEnt_test_equivalence(ut.TestCase):
+
+    def runTest(self):
+
+        # each element keeps its declared orientation
+        rep = OT.representative_elements([[(0, 0), (2, 2)], [(0, 1), (2, 1), (1, 0)], [(1, 2), (3, 2)]])
+        self.assertEqual(rep, {(2, 2): (0, 0), (1, 2): (1, 0), (2, 3): (2, 1)})
+
+        # the representative is copied to the element and its transpose to the transposed element
+        N = 4
+        M = np.random.rand(2, N, N)
+        for (l, m), (l0, m0) in rep.items():
+            M[:, l, m] = M[:, l0, m0]
+            M[:, m, l] = M[:, m0, l0]
+        self.assertTrue(np.array_equal(M[:, 2, 1], M[:, 0, 1]))
+        self.assertTrue(np.array_equal(M[:, 1, 2], M[:, 1, 0]))
+
+        # mixed classes are discarded
+        self.assertEqual(OT.representative_elements([[(0, 0), (0, 1)]]), {})
+
+        data = np.random.rand(10) + 1j*np.random.rand(10)
+        err = 1e-3*np.ones(10)
+        tol = 1e-8
+        self.assertTrue(OT.is_equivalent(data, data*(1 + 1e-10), tol))
+        self.assertFalse(OT.is_equivalent(data, data*(1 + 1e-6), tol))
+
+        # the errors must also agree
+        self.assertTrue(OT.is_equivalent(data, data, tol, dict(ERR=err), dict(ERR=err.copy())))
+        self.assertFalse(OT.is_equivalent(data, data, tol, dict(ERR=err), dict(ERR=2*err)))
+        self.assertFalse(OT.is_equivalent(data, data, tol, dict(ERR=err), {}))
+
+        # covariance files are compared by content
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        cov = np.eye(10)
+        OT.save_arma_binary(os.path.join(test_dir_name, "cov1.bin"), cov)
+        OT.save_arma_binary(os.path.join(test_dir_name, "cov2.bin"), cov)
+        OT.save_arma_binary(os.path.join(test_dir_name, "cov3.bin"), 2*cov)
+        self.assertTrue(OT.is_equivalent(data, data, tol, dict(cov_tau="cov1.bin"), dict(cov_tau="cov2.bin"), test_dir_name))
+        self.assertFalse(OT.is_equivalent(data, data, tol, dict(cov_tau="cov1.bin"), dict(cov_tau="cov3.bin"), test_dir_name))
+        su.rmtree(test_dir_name)
+
+        # parameters given per block
+        kwa = dict(ERR=dict(up=err, dn=2*err), cov_tau="cov1.bin", sym_tol=tol)
+        self.assertTrue(OT.block_error_params(kwa, 'up')['ERR'] is err)
+        self.assertEqual(OT.block_error_params(kwa, 'dn')['cov_tau'], "cov1.bin")
+        self.assertEqual(OT.block_error_params(kwa, 'other'), dict(cov_tau="cov1.bin"))
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,121 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+import OmegaMaxEnt_figures as OF
+import matplotlib
+matplotlib.use("Agg")
+from math import ceil, exp, sqrt, pi
+from triqs.dos import HilbertTransform, DOSFromFunction
+import warnings
+from triqs.gf import *
+import numpy as np
+import os
+import shutil as su
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+test_dir_name="test_dir_figures"
+
+np.random.seed(1)
+
+tol_int_diffA=0.05
+
+Npts_dos=1000
+
+inter_mode=False
+save_figs=True
+
+err=1e-5
+beta=50
+
+R_iw_W=5
+
+W=4
+cw=[-2, 1]
+sd=[1, 0.7]
+wgt=[1, 1]
+Npks=len(cw)
+
+wmin=-10.0
+wmax=10.0
+
+wl=-7
+wr=7
+dw=0.01
+
+wnmax=W*R_iw_W
+nmax=int(ceil(beta*wnmax/(2*pi)))
+n_iwn=nmax+1
+
+def spectr_val(w):
+    W = np.sum(wgt)
+    v = 0
+    for i in range(0,Npks):
+        v = v + (wgt[i] / sd[i]) * exp(-(w - cw[i]) * (w - cw[i]) / (2 * sd[i] * sd[i]))
+
+    return v / (W * sqrt(2 * pi))
+
+Nw=int((wr-wl)/dw)+1
+w=dw*np.array(list(range(0,Nw)))+wl
+
+Aw=np.zeros(Nw)
+
+for i in range(0,Nw):
+    Aw[i]=spectr_val(w[i])
+
+class OmegaMaxEnt_test_figures(ut.TestCase):
+
+    def runTest(self):
+
+        d = DOSFromFunction(spectr_val, wmin, wmax, Npts_dos)
+        G = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0.zero()
+        G << HilbertTransform(d)(Sigma=Sigma0, mu=0.)
+
+        G = G[0, 0]
+
+        G.data.real = G.data.real + err * np.random.randn(2*n_iwn)
+        G.data.imag = G.data.imag + err * np.random.randn(2*n_iwn)
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        os.chdir(test_dir_name)
+
+        GR=OT.compute_GfReFreq(G, interactive_mode=inter_mode, save_figures_data=save_figs, figures_bundle=True, output_grid_params=[wl, dw, wr], name="$G_{ME}$")
+
+        self.assertTrue(os.path.exists(OF.figs_bundle_file_name))
+        figs_scripts = [f for f in os.listdir(".") if f.startswith("OmegaMaxEnt_figs_") and f.endswith(".py")]
+        self.assertEqual(len(figs_scripts), 0)
+
+        bundle = OF.FigureBundle(OF.figs_bundle_file_name)
+        n_figs = len(bundle.figures)
+        self.assertGreater(n_figs, 0)
+        for i in range(n_figs):
+            self.assertEqual(bundle.data(i).shape[0], OF.data_size(bundle.figures[i]))
+
+        # the labels written by the engine, such as "$\\omega$", contain backslashes and are decoded as in the figure scripts
+        labels = [fig[k] for fig in bundle.figures for k in ['title', 'xlabel', 'ylabel'] if fig.get(k)]
+        labels = [OF.label_text(l) for l in labels]
+        self.assertTrue("$\\omega$" in labels)
+        self.assertFalse(any("\\\\" in l for l in labels))
+
+        saved = OF.render_figures(OF.figs_bundle_file_name, output_dir="figures")
+        self.assertEqual(len(saved), n_figs)
+        for f in saved:
+            self.assertTrue(os.path.exists(f))
+
+        proc = OF.render_figures(OF.figs_bundle_file_name, output_dir="figures_bg", background=True)
+        self.assertEqual(proc.wait(), 0)
+        self.assertEqual(len(os.listdir("figures_bg")), n_figs)
+
+        os.chdir("..")
+        su.rmtree(test_dir_name)
+
+        self.assertTrue(isinstance(GR, GfReFreq))
+
+        Aw_me = -GR.data.imag / pi
+        int_diffA = dw * sum(np.absolute(Aw_me - Aw))
+        print(int_diffA)
+        self.assertLess(int_diffA, tol_int_diffA)
+
+if __name__ == '__main__':
+    ut.main()
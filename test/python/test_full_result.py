@@ -0,0 +1,110 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+from math import ceil, exp, sqrt, pi
+from triqs.dos import HilbertTransform, DOSFromFunction
+import warnings
+from triqs.gf import *
+import numpy as np
+import os
+import shutil as su
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+test_dir_name="test_dir_full_result"
+
+np.random.seed(1)
+
+tol_int_diffA=0.05
+
+Npts_dos=1000
+
+err=1e-5
+beta=50
+
+R_iw_W=5
+
+W=4
+cw=[-2, 1]
+sd=[1, 0.7]
+wgt=[1, 1]
+Npks=len(cw)
+
+wmin=-10.0
+wmax=10.0
+
+wl=-7
+wr=7
+dw=0.01
+
+wnmax=W*R_iw_W
+nmax=int(ceil(beta*wnmax/(2*pi)))
+n_iwn=nmax+1
+
+def spectr_val(w):
+    W = np.sum(wgt)
+    v = 0
+    for i in range(0,Npks):
+        v = v + (wgt[i] / sd[i]) * exp(-(w - cw[i]) * (w - cw[i]) / (2 * sd[i] * sd[i]))
+
+    return v / (W * sqrt(2 * pi))
+
+Nw=int((wr-wl)/dw)+1
+w=dw*np.array(list(range(0,Nw)))+wl
+
+Aw=np.zeros(Nw)
+
+for i in range(0,Nw):
+    Aw[i]=spectr_val(w[i])
+
+class OmegaMaxEnt_test_full_result(ut.TestCase):
+
+    def runTest(self):
+
+        d = DOSFromFunction(spectr_val, wmin, wmax, Npts_dos)
+        G = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0.zero()
+        G << HilbertTransform(d)(Sigma=Sigma0, mu=0.)
+
+        G = G[0, 0]
+        G.data.real = G.data.real + err * np.random.randn(*G.data.shape)
+        G.data.imag = G.data.imag + err * np.random.randn(*G.data.shape)
+        ERRG = err * (1 + 1j) * np.ones(G.data.shape)
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        os.chdir(test_dir_name)
+
+        res = OT.compute_GfReFreq(G, ERR=ERRG, interactive_mode=False, save_figures_data=False, output_grid_params=[wl, dw, wr], compute_Pade=True, compute_classic_Bryan=True, full_result=True)
+
+        self.assertTrue(isinstance(res, OT.ContinuationResult))
+        self.assertTrue(isinstance(res.GR, GfReFreq))
+        self.assertEqual(len(res.cache), 0)
+
+        self.assertEqual(res.alpha.shape, res.chi2.shape)
+        self.assertEqual(res.A_vs_alpha.shape, (len(res.alpha), len(res.sample_freq)))
+        self.assertTrue(os.path.exists(res.result_dir))
+        self.assertLess(min(res.alpha_bounds), res.alpha_opt)
+        self.assertLess(res.alpha_opt, max(res.alpha_bounds))
+        self.assertEqual(res.A_bounds.shape, (2, len(res.omega_opt)))
+        self.assertEqual(res.GR_Pade.shape[1], 3)
+        self.assertEqual(res.P_alpha_G.shape, (len(res.alpha), 2))
+        self.assertTrue((res.P_alpha_G[:, 1] >= 0).all())
+        self.assertEqual(res.A_classic.shape, res.omega_opt.shape)
+        self.assertEqual(res.A_Bryan.shape, res.omega_opt.shape)
+        self.assertTrue(isinstance(res.chi2, np.memmap))
+
+        A_opt = np.array(res.A_opt)
+        A_GR = -res.GR.data.imag / pi
+
+        res2 = OT.ContinuationResult(res.GR, res.result_dir)
+        self.assertTrue(np.array_equal(res2.A_opt, A_opt))
+
+        os.chdir("..")
+        su.rmtree(test_dir_name)
+
+        int_diffA = dw * sum(np.absolute(A_GR - Aw))
+        print(int_diffA)
+        self.assertLess(int_diffA, tol_int_diffA)
+
+if __name__ == '__main__':
+    ut.main()
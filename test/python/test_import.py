@@ -0,0 +1,30 @@
+import unittest as ut
+import subprocess as sp
+import sys
+import json
+
+# modules that the interface only imports when they are used
+lazy_modules = ["triqs", "h5", "matplotlib", "concurrent.futures"]
+
+check_imports = """
+import sys, json
+import OmegaMaxEnt_TRIQS
+print(json.dumps([m for m in %s if m in sys.modules]))
+""" % repr(lazy_modules)
+
+class OmegaMaxEnt_test_import(ut.TestCase):
+
+    def runTest(self):
+
+        # a new interpreter, since the tests may already have imported those modules
+        out = sp.check_output([sys.executable, "-c", check_imports])
+        loaded = json.loads(out.decode().strip().splitlines()[-1])
+        self.assertEqual(loaded, [])
+
+        import OmegaMaxEnt_TRIQS as OT
+        for f in ["compute_GfReFreq", "compute_G_omega", "compute_GfReFreq_ensemble", "compute_GfReFreq_noise_sweep"]:
+            self.assertTrue(callable(getattr(OT, f)))
+        self.assertTrue("output_grid_params" in OT.OmegaMaxEnt_input_params)
+
+if __name__ == '__main__':
+    ut.main()
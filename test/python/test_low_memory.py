@@ -0,0 +1,104 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+from math import cos, sin, ceil, exp, sqrt, pi
+from triqs.dos import HilbertTransform, DOSFromFunction
+import warnings
+from triqs.gf import *
+import numpy as np
+import os
+import shutil as su
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+test_dir_name="test_dir_low_memory"
+
+np.random.seed(6)
+
+# both assembly modes continue the same auxiliary functions, so the results must agree to rounding
+tol_diff=1e-10
+
+Npts_dos=1000
+
+theta = pi / 6
+phi = pi / 5
+
+inter_mode=False
+save_figs=False
+inv_sym=False
+
+err=1e-5
+beta=50
+
+R_iw_W=5
+
+W=4
+cw=[[-2, 1], [-1.5, 0, 2], [-1, 0.2, 1.7]]
+sd=[[1, 0.7], [0.8, 0.5, 1.2], [0.6, 0.5, 1]]
+
+wmin=-10.0
+wmax=10.0
+
+wl=-7
+wr=7
+dw=0.01
+
+wnmax=W*R_iw_W
+
+nmax=int(ceil(beta*wnmax/(2*pi)))
+
+n_iwn=nmax
+
+def spectr_func(cw_l, sd_l):
+    def spectr_val(w):
+        v = 0
+        for i in range(0,len(cw_l)):
+            v = v + exp(-(w - cw_l[i]) * (w - cw_l[i]) / (2 * sd_l[i] * sd_l[i])) / sd_l[i]
+        return v / (len(cw_l) * sqrt(2 * pi))
+    return spectr_val
+
+R1 = np.array([[cos(theta), -sin(theta), 0], [sin(theta), cos(theta), 0], [0, 0, 1]])
+R2 = np.array([[1, 0, 0], [0, cos(phi), -sin(phi)], [0, sin(phi), cos(phi)]])
+R = R1.dot(R2)
+Rt = R.transpose()
+
+class OmegaMaxEnt_test_low_memory(ut.TestCase):
+
+    def runTest(self):
+
+        G = GfImFreq(target_shape=[3,3], beta=beta, n_points=n_iwn)
+        Sigma0 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0.zero()
+        for l in range(3):
+            d = DOSFromFunction(spectr_func(cw[l], sd[l]), wmin, wmax, Npts_dos)
+            Gl = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+            Gl << HilbertTransform(d)(Sigma=Sigma0, mu=0.)
+            G[l, l] = Gl[0, 0]
+
+        G_rot = GfImFreq(target_shape=[3,3], beta=beta, n_points=n_iwn)
+        G_rot.from_L_G_R(R, G, Rt)
+
+        G_rot.data.real = G_rot.data.real + err * np.reshape(np.random.randn(np.size(G_rot.data.real)),np.shape(G_rot.data.real))
+        G_rot.data.imag = G_rot.data.imag + err * np.reshape(np.random.randn(np.size(G_rot.data.real)),np.shape(G_rot.data.real))
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        os.chdir(test_dir_name)
+
+        GR = OT.compute_GfReFreq(G_rot, interactive_mode=inter_mode, save_figures_data=save_figs, inv_sym=inv_sym,
+                                 output_grid_params=[wl, dw, wr], save_G=False)
+        GR_low = OT.compute_GfReFreq(G_rot, interactive_mode=inter_mode, save_figures_data=save_figs, inv_sym=inv_sym,
+                                     output_grid_params=[wl, dw, wr], save_G=False, low_memory=True)
+
+        os.chdir("..")
+        su.rmtree(test_dir_name)
+
+        self.assertTrue(isinstance(GR, GfReFreq) and isinstance(GR_low, GfReFreq))
+        self.assertEqual(GR.data.shape, GR_low.data.shape)
+        scale = np.abs(GR.data).max()
+        for l in range(3):
+            for m in range(3):
+                diff = np.abs(GR_low.data[:, l, m] - GR.data[:, l, m]).max()
+                print(l, m, diff)
+                self.assertTrue(diff <= tol_diff*scale)
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,96 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+from math import ceil, exp, sqrt, pi
+from triqs.dos import HilbertTransform, DOSFromFunction
+import warnings
+from triqs.gf import *
+import numpy as np
+import os
+import shutil as su
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+test_dir_name="test_dir_noise_sweep"
+
+np.random.seed(1)
+
+tol_int_diffA=0.05
+
+Npts_dos=1000
+
+noise_levels=[1e-4, 3e-4, 1e-3]
+N_jobs=2
+beta=50
+
+R_iw_W=5
+
+W=4
+cw=[-2, 1]
+sd=[1, 0.7]
+wgt=[1, 1]
+Npks=len(cw)
+
+wmin=-10.0
+wmax=10.0
+
+wl=-7
+wr=7
+dw=0.01
+
+wnmax=W*R_iw_W
+nmax=int(ceil(beta*wnmax/(2*pi)))
+n_iwn=nmax+1
+
+def spectr_val(w):
+    W = np.sum(wgt)
+    v = 0
+    for i in range(0,Npks):
+        v = v + (wgt[i] / sd[i]) * exp(-(w - cw[i]) * (w - cw[i]) / (2 * sd[i] * sd[i]))
+
+    return v / (W * sqrt(2 * pi))
+
+Nw=int((wr-wl)/dw)+1
+w=dw*np.array(list(range(0,Nw)))+wl
+
+Aw=np.zeros(Nw)
+
+for i in range(0,Nw):
+    Aw[i]=spectr_val(w[i])
+
+class OmegaMaxEnt_test_noise_sweep(ut.TestCase):
+
+    def runTest(self):
+
+        d = DOSFromFunction(spectr_val, wmin, wmax, Npts_dos)
+        G = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0.zero()
+        G << HilbertTransform(d)(Sigma=Sigma0, mu=0.)
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+
+        profiler = OT.PhaseProfiler()
+
+        # the continuations are computed in work_dir/OmegaMaxEnt_noise_sweep
+        sweep = OT.compute_GfReFreq_noise_sweep(G, noise_levels, n_jobs=N_jobs, output_grid_params=[wl, dw, wr], on_event=profiler, work_dir=test_dir_name)
+
+        self.assertFalse(os.path.exists(os.path.join(test_dir_name, "OmegaMaxEnt_noise_sweep")))
+        self.assertFalse(os.path.exists("OmegaMaxEnt_noise_sweep"))
+
+        su.rmtree(test_dir_name)
+
+        self.assertTrue(isinstance(sweep, OT.NoiseSweep))
+        self.assertEqual(sweep.noise_levels, noise_levels)
+        self.assertEqual(sweep.A.shape, (len(noise_levels), Nw))
+        self.assertEqual(profiler.stats["engine"]['calls'], len(noise_levels))
+        self.assertFalse(np.isnan(sweep.A).any())
+
+        for s in noise_levels:
+            self.assertTrue(isinstance(sweep[s], GfReFreq))
+
+        int_diffA = dw * sum(np.absolute(sweep.A[0] - Aw))
+        print(int_diffA)
+        self.assertLess(int_diffA, tol_int_diffA)
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,146 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+from math import ceil, exp, sqrt, pi
+from triqs.dos import HilbertTransform, DOSFromFunction
+import warnings
+from triqs.gf import *
+import numpy as np
+import os
+import shutil as su
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+test_dir_name="test_dir_output_mesh"
+
+np.random.seed(1)
+
+tol_int_diffA=0.05
+
+Npts_dos=1000
+
+tol_G_interp=1e-3
+beta=50
+
+R_iw_W=5
+
+W=4
+cw=[-2, 1]
+sd=[1, 0.7]
+wgt=[1, 1]
+Npks=len(cw)
+
+wmin=-10.0
+wmax=10.0
+
+wl=-7
+wr=7
+dw=0.01
+
+wnmax=W*R_iw_W
+nmax=int(ceil(beta*wnmax/(2*pi)))
+n_iwn=nmax+1
+
+def spectr_val(w):
+    W = np.sum(wgt)
+    v = 0
+    for i in range(0,Npks):
+        v = v + (wgt[i] / sd[i]) * exp(-(w - cw[i]) * (w - cw[i]) / (2 * sd[i] * sd[i]))
+
+    return v / (W * sqrt(2 * pi))
+
+Nw=int((wr-wl)/dw)+1
+w=dw*np.array(list(range(0,Nw)))+wl
+
+Aw=np.zeros(Nw)
+
+for i in range(0,Nw):
+    Aw[i]=spectr_val(w[i])
+
+class OmegaMaxEnt_test_output_mesh(ut.TestCase):
+
+    def runTest(self):
+
+        d = DOSFromFunction(spectr_val, wmin, wmax, Npts_dos)
+        G = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0.zero()
+        G << HilbertTransform(d)(Sigma=Sigma0, mu=0.)
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        os.chdir(test_dir_name)
+
+        GR = OT.compute_GfReFreq(G, interactive_mode=False, save_figures_data=False, output_grid_params=[wl, dw, wr])
+        self.assertTrue(isinstance(GR, GfReFreq))
+
+        # uniform mesh covering a part of the spectrum
+        w_sub = w[(w >= 0.5) & (w <= 3)]
+        mesh_sub = MeshReFreq(window=(w_sub[0], w_sub[-1]), n_points=len(w_sub))
+        GR_sub = OT.compute_GfReFreq(G[0, 0], interactive_mode=False, save_figures_data=False, output_mesh=mesh_sub)
+
+        # non-uniform mesh
+        w_nu = np.sort(np.concatenate((np.linspace(-3, -1, 15), np.linspace(-0.5, 0.5, 101), np.linspace(1, 4, 20))))
+        G_nu = OT.compute_G_omega(G[0, 0], w_nu, interactive_mode=False, save_figures_data=False)
+
+        # mesh outside the range of the spectrum and decreasing frequencies
+        G_out = OT.compute_G_omega(G[0, 0], np.linspace(-1000, 1000, 11), interactive_mode=False, save_figures_data=False)
+        G_dec = OT.compute_G_omega(G[0, 0], w_nu[::-1], interactive_mode=False, save_figures_data=False)
+
+        os.chdir("..")
+        su.rmtree(test_dir_name)
+
+        self.assertTrue(isinstance(GR_sub, GfReFreq))
+        self.assertEqual(len(GR_sub.mesh), len(w_sub))
+        self.assertAlmostEqual(GR_sub.mesh.w_min, w_sub[0])
+        self.assertAlmostEqual(GR_sub.mesh.w_max, w_sub[-1])
+
+        self.assertTrue(G_out is None)
+        self.assertTrue(G_dec is None)
+
+        self.assertTrue(isinstance(G_nu, np.ndarray))
+        self.assertEqual(G_nu.dtype, np.complex128)
+        self.assertEqual(G_nu.shape, w_nu.shape)
+
+        A = -GR.data[:, 0, 0].imag / pi
+        A_nu = -G_nu.imag / pi
+        self.assertLess(np.abs(A_nu - np.interp(w_nu, w, A)).max(), tol_G_interp)
+
+        A_sub = -GR_sub.data.imag / pi
+        int_diffA = dw * sum(np.absolute(A_sub - Aw[(w >= 0.5) & (w <= 3)]))
+        print(int_diffA)
+        self.assertLess(int_diffA, tol_int_diffA)
+
+class OmegaMaxEnt_test_stale_binary_result(ut.TestCase):
+
+    def runTest(self):
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        result_file = os.path.join(test_dir_name, "real_frequency_Green_function.dat")
+        bin_file = os.path.join(test_dir_name, "real_frequency_Green_function.bin")
+
+        w_r = np.array([-1., 0., 1.])
+        G_dat = np.array([0.1-0.2j, 0.3-0.4j, 0.5-0.6j])
+        G_bin = np.array([1.-2.j, 3.-4.j, 5.-6.j])
+        np.savetxt(result_file, np.array([w_r, G_dat.real, G_dat.imag]).transpose())
+        with open(bin_file, "wb") as f:
+            f.write(b"ARMA_MAT_BIN_FC016\n3 2\n")
+            f.write(np.array([w_r + 0j, G_bin]).transpose().tobytes(order='F'))
+
+        # binary copy left by a previous run
+        t_dat = os.path.getmtime(result_file)
+        os.utime(bin_file, (t_dat - 10, t_dat - 10))
+        w_old, G_old = OT.load_G_Re_omega(result_file)
+
+        # binary copy written after the text file
+        os.utime(bin_file, (t_dat + 10, t_dat + 10))
+        w_new, G_new = OT.load_G_Re_omega(result_file)
+
+        su.rmtree(test_dir_name)
+
+        self.assertTrue(np.allclose(w_old, w_r))
+        self.assertTrue(np.allclose(G_old, G_dat))
+        self.assertTrue(np.allclose(w_new, w_r))
+        self.assertTrue(np.allclose(G_new, G_bin))
+
+if __name__ == '__main__':
+    ut.main()
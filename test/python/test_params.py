@@ -0,0 +1,66 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+import os
+import shutil as su
+
+test_dir_name="test_dir_params"
+
+class OmegaMaxEnt_test_params(ut.TestCase):
+
+    def runTest(self):
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        os.chdir(test_dir_name)
+
+        f = OT.other_params_file
+
+        # stale parameters of a previous call are replaced
+        with open(f, "w") as pf:
+            pf.write("stale parameters\n")
+
+        ps = OT.ParameterSet(dict(Nw_max=1000, R_cov_eig_min=1e-12, name="G"))
+        self.assertTrue(ps.write_other_params())
+        with open(f, "rb") as pf:
+            content = pf.read()
+        self.assertEqual(content, ps.other_params)
+        self.assertTrue(b" 1000\n" in content)
+        self.assertFalse(ps.write_other_params())
+
+        # same content, written by another parameter set
+        ps2 = OT.ParameterSet(dict(Nw_max=1000, R_cov_eig_min=1e-12))
+        self.assertEqual(ps2.other_hash, ps.other_hash)
+        self.assertFalse(ps2.write_other_params())
+
+        # different content
+        ps3 = OT.ParameterSet(dict(Nw_max="1000"))
+        self.assertNotEqual(ps3.other_hash, ps.other_hash)
+        self.assertTrue(ps3.write_other_params())
+        self.assertTrue(ps.write_other_params())
+
+        # input parameters
+        grid = [-5, 0.01, 5]
+        kwa = dict(output_grid_params=grid, interactive_mode=False, name="G")
+        lines = ps.input_bytes(kwa)
+        self.assertEqual(lines, (OT.OmegaMaxEnt_input_params['output_grid_params'] + " -5 0.01 5\n" + OT.OmegaMaxEnt_input_params['interactive_mode'] + "no\n").encode())
+        self.assertEqual(ps.input_lines['output_grid_params'][0], OT.input_param_key(grid))
+        kwa.update(dict(output_grid_params=[-4, 0.01, 4]))
+        self.assertTrue(b" -4 0.01 4\n" in ps.input_bytes(kwa))
+
+        # a list modified in place is formatted again
+        grid[0] = -6
+        grid[2] = 6
+        kwa.update(dict(output_grid_params=grid))
+        self.assertTrue(b" -5 0.01 5\n" not in ps.input_bytes(kwa))
+        self.assertTrue(b" -6 0.01 6\n" in ps.input_bytes(kwa))
+        grid[2] = 7
+        self.assertTrue(b" -6 0.01 7\n" in ps.input_bytes(kwa))
+        # same value, different type
+        kwa.update(dict(output_grid_params=[-6, 0.01, 7.0]))
+        self.assertTrue(b" -6 0.01 7.0\n" in ps.input_bytes(kwa))
+
+        os.chdir("..")
+        su.rmtree(test_dir_name)
+
+if __name__ == '__main__':
+    ut.main()
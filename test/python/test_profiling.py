@@ -0,0 +1,134 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+from math import ceil, exp, sqrt, pi
+from triqs.dos import HilbertTransform, DOSFromFunction
+import warnings
+from triqs.gf import *
+import numpy as np
+import os
+import shutil as su
+import sys
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+test_dir_name="test_dir_profiling"
+
+np.random.seed(1)
+
+tol_int_diffA=0.05
+
+Npts_dos=1000
+
+inter_mode=False
+save_figs=False
+
+err=1e-5
+beta=50
+
+R_iw_W=5
+
+W=4
+cw=[-2, 1]
+sd=[1, 0.7]
+wgt=[1, 1]
+Npks=len(cw)
+
+wmin=-10.0
+wmax=10.0
+
+wl=-7
+wr=7
+dw=0.01
+
+wnmax=W*R_iw_W
+nmax=int(ceil(beta*wnmax/(2*pi)))
+n_iwn=nmax+1
+
+def spectr_val(w):
+    W = np.sum(wgt)
+    v = 0
+    for i in range(0,Npks):
+        v = v + (wgt[i] / sd[i]) * exp(-(w - cw[i]) * (w - cw[i]) / (2 * sd[i] * sd[i]))
+
+    return v / (W * sqrt(2 * pi))
+
+Nw=int((wr-wl)/dw)+1
+w=dw*np.array(list(range(0,Nw)))+wl
+
+Aw=np.zeros(Nw)
+
+for i in range(0,Nw):
+    Aw[i]=spectr_val(w[i])
+
+class OmegaMaxEnt_test_profiling(ut.TestCase):
+
+    def runTest(self):
+
+        d = DOSFromFunction(spectr_val, wmin, wmax, Npts_dos)
+        G = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0.zero()
+        G << HilbertTransform(d)(Sigma=Sigma0, mu=0.)
+
+        G = G[0, 0]
+
+        G.data.real = G.data.real + err * np.random.randn(2*n_iwn)
+        G.data.imag = G.data.imag + err * np.random.randn(2*n_iwn)
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        os.chdir(test_dir_name)
+
+        profiler = OT.PhaseProfiler()
+        engine_stats = []
+
+        with self.assertLogs("OmegaMaxEnt_TRIQS", level="DEBUG") as logs:
+            GR=OT.compute_GfReFreq(G, interactive_mode=inter_mode, save_figures_data=save_figs, output_grid_params=[wl, dw, wr], name="$G_{ME}$", on_event=profiler, engine_stats=engine_stats, quiet=True)
+
+        os.chdir("..")
+        su.rmtree(test_dir_name)
+
+        self.assertTrue(isinstance(GR, GfReFreq))
+
+        Aw_me = -GR.data.imag / pi
+        int_diffA = dw * sum(np.absolute(Aw_me - Aw))
+        print(int_diffA)
+        self.assertLess(int_diffA, tol_int_diffA)
+
+        print(profiler.summary())
+        for phase in ["write input", "engine", "read result", "GfReFreq construction", "save hdf5"]:
+            self.assertEqual(profiler.stats[phase]['calls'], 1)
+        self.assertGreater(profiler.stats["engine"]['total'], 0)
+        self.assertLess(profiler.overhead_share(), 1)
+
+        self.assertEqual(len(engine_stats), 1)
+        stats = engine_stats[0]
+        for stage in ["preproc", "minimize"]:
+            self.assertGreater(stats['stages'][stage]['calls'], 0)
+        self.assertGreater(stats['counters']['svd'], 0)
+        self.assertGreater(len(stats['newton_iterations']), 0)
+        self.assertEqual(len(stats['alpha']), len(stats['newton_iterations']))
+
+        events = [r.event for r in logs.records if hasattr(r, 'event')]
+        self.assertEqual(events[0]['event'], "start")
+        self.assertEqual(events[-1]['event'], "finish")
+        self.assertTrue(events[-1]['success'])
+        alpha_events = [ev for ev in events if ev['event'] == "alpha"]
+        self.assertGreater(len(alpha_events), 0)
+        self.assertGreater(events[-1]['n_alpha'], 0)
+
+class OmegaMaxEnt_test_run_quiet(ut.TestCase):
+
+    def runTest(self):
+
+        # lines that are valid JSON but not event dictionaries are logged as plain text
+        cmd = [sys.executable, "-c", "print(3.5); print('[1, 2]'); print('{\"a\": 1}'); print('{\"event\": \"start\"}')"]
+        with self.assertLogs("OmegaMaxEnt_TRIQS", level="DEBUG") as logs:
+            status = OT.run_quiet(cmd)
+
+        self.assertEqual(status, 0)
+        self.assertEqual(len(logs.records), 4)
+        events = [r.event for r in logs.records if hasattr(r, 'event')]
+        self.assertEqual(events, [{"event": "start"}])
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,150 @@
+import unittest as ut
+import OmegaMaxEnt_TRIQS as OT
+from math import cos, sin, ceil, exp, sqrt, pi
+from triqs.dos import HilbertTransform, DOSFromFunction
+import warnings
+from triqs.gf import *
+from h5 import HDFArchive
+import numpy as np
+import os
+import shutil as su
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+test_dir_name="test_dir_restart"
+
+np.random.seed(7)
+
+tol_int_diffA=0.05
+
+Npts_dos=1000
+
+theta = pi / 6
+
+inter_mode=False
+save_figs=False
+inv_sym=True
+
+err=1e-5
+beta=50
+
+R_iw_W=5
+
+W=4
+cw1=[-2, 1]
+sd1=[1, 0.7]
+cw2=[-1.5, 0, 2]
+sd2=[0.8, 0.5, 1.2]
+
+wmin=-10.0
+wmax=10.0
+
+wl=-7
+wr=7
+dw=0.01
+
+wnmax=W*R_iw_W
+
+nmax=int(ceil(beta*wnmax/(2*pi)))
+
+n_iwn=nmax
+
+archive_file="G_archive.h5"
+
+# number of archived elements after which the first calculation is interrupted
+n_archived_interrupt=2
+
+def spectr_val1(w):
+    v = 0
+    for i in range(0,len(cw1)):
+        v = v + exp(-(w - cw1[i]) * (w - cw1[i]) / (2 * sd1[i] * sd1[i])) / sd1[i]
+    return v / (len(cw1) * sqrt(2 * pi))
+
+def spectr_val2(w):
+    v = 0
+    for i in range(0,len(cw2)):
+        v = v + exp(-(w - cw2[i]) * (w - cw2[i]) / (2 * sd2[i] * sd2[i])) / sd2[i]
+    return v / (len(cw2) * sqrt(2 * pi))
+
+Nw=int((wr-wl)/dw)+1
+w=dw*np.array(list(range(0,Nw)))+wl
+
+Aw1=np.array([spectr_val1(x) for x in w])
+Aw2=np.array([spectr_val2(x) for x in w])
+
+R = np.array([[cos(theta), -sin(theta)], [sin(theta), cos(theta)]])
+Rt=R.transpose()
+
+A01=R[0,0]*Aw1*Rt[0,1]+R[0,1]*Aw2*Rt[1,1]
+
+class Interrupted(Exception):
+    pass
+
+class OmegaMaxEnt_test_restart(ut.TestCase):
+
+    def runTest(self):
+
+        G = GfImFreq(target_shape=[2,2], beta=beta, n_points=n_iwn)
+        Sigma0 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        Sigma0.zero()
+        G1 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        G1 << HilbertTransform(DOSFromFunction(spectr_val1, wmin, wmax, Npts_dos))(Sigma=Sigma0, mu=0.)
+        G2 = GfImFreq(target_shape=[1,1], beta=beta, n_points=n_iwn)
+        G2 << HilbertTransform(DOSFromFunction(spectr_val2, wmin, wmax, Npts_dos))(Sigma=Sigma0, mu=0.)
+        G[0,0]=G1[0,0]
+        G[1,1]=G2[0,0]
+
+        G_rot = GfImFreq(target_shape=[2,2], beta=beta, n_points=n_iwn)
+        G_rot.from_L_G_R(R, G, Rt)
+
+        G_rot.data.real = G_rot.data.real + err * np.reshape(np.random.randn(np.size(G_rot.data.real)),np.shape(G_rot.data.real))
+        G_rot.data.imag = G_rot.data.imag + err * np.reshape(np.random.randn(np.size(G_rot.data.real)),np.shape(G_rot.data.real))
+
+        if not os.path.exists(test_dir_name):
+            os.mkdir(test_dir_name)
+        os.chdir(test_dir_name)
+
+        # the diagonal elements are archived, then the calculation is interrupted
+        archived = []
+        def interrupt(phase, duration, metadata):
+            if phase == "archive" and 'element' in metadata:
+                archived.append(metadata['element'])
+                if len(archived) == n_archived_interrupt:
+                    raise Interrupted()
+
+        with self.assertRaises(Interrupted):
+            OT.compute_GfReFreq(G_rot, interactive_mode=inter_mode, save_figures_data=save_figs, inv_sym=inv_sym,
+                                output_grid_params=[wl, dw, wr], save_G=False, archive_file=archive_file, on_event=interrupt)
+        self.assertEqual(archived, [(0, 0), (1, 1)])
+
+        with HDFArchive(archive_file, 'r') as A:
+            G00_archived = A['elements']['0_0'].data.copy()
+            G11_archived = A['elements']['1_1'].data.copy()
+
+        # only the element that was not archived is computed
+        engine_runs = []
+        def count_runs(phase, duration, metadata):
+            if phase == "engine":
+                engine_runs.append(metadata)
+
+        GR = OT.compute_GfReFreq(G_rot, interactive_mode=inter_mode, save_figures_data=save_figs, inv_sym=inv_sym,
+                                 output_grid_params=[wl, dw, wr], save_G=False, archive_file=archive_file, restart=True,
+                                 on_event=count_runs)
+
+        self.assertEqual(len(engine_runs), 1)
+        with HDFArchive(archive_file, 'r') as A:
+            self.assertTrue('0_1' in A['elements'])
+
+        os.chdir("..")
+        su.rmtree(test_dir_name)
+
+        self.assertTrue(isinstance(GR, GfReFreq))
+        self.assertTrue(np.array_equal(GR.data[:, 0, 0], G00_archived))
+        self.assertTrue(np.array_equal(GR.data[:, 1, 1], G11_archived))
+
+        A01_me = -GR[0,1].data.imag/pi
+        int_diff_A01 = dw*sum(np.absolute(A01_me-A01))
+        print(int_diff_A01)
+        self.assertTrue(int_diff_A01 < tol_int_diffA)
+
+if __name__ == '__main__':
+    ut.main()